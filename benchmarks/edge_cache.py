@@ -0,0 +1,88 @@
+"""
+English: Measures requests per second on the cache-hit path of a cached JSON route, through the full App
+         middleware stack (Router cache hit) and through App(edge_cache=True) (ASGI replay). Needs DEBUG=false,
+         since route caching is disabled in debug. Run from the repository root:
+             DEBUG=false python benchmarks/edge_cache.py
+Español: Mide peticiones por segundo en el camino de acierto de caché de una ruta JSON cacheada, pasando por toda
+         la pila de middlewares de App (acierto en la caché del Router) y con App(edge_cache=True) (repetición ASGI).
+         Requiere DEBUG=false, ya que la caché de rutas se desactiva en debug. Ejecutar desde la raíz del repositorio:
+             DEBUG=false python benchmarks/edge_cache.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.join(ROOT, "lila"))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "lila"))
+
+from lila.core.app import App  # noqa: E402
+from lila.core.routing import Router  # noqa: E402
+from lila.core.responses import JSONResponse  # noqa: E402
+from app.config import DEBUG  # noqa: E402
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "5000"))
+
+
+def build_app(edge_cache: bool) -> App:
+    router = Router()
+
+    @router.get("/catalog", cache_ttl=300)
+    async def catalog(request):
+        return JSONResponse({"items": [{"id": i, "name": f"item {i}"} for i in range(200)]})
+
+    return App(routes=router.get_routes(), edge_cache=edge_cache)
+
+
+async def run(app) -> tuple[float, str]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/catalog",
+        "raw_path": b"/catalog",
+        "root_path": "",
+        "query_string": b"page=1",
+        "headers": [(b"host", b"localhost"), (b"accept-encoding", b"gzip, deflate, br"), (b"cookie", b"lang=en")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("localhost", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    state = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["cache"] = dict(message["headers"]).get(b"x-lila-cache", b"").decode()
+
+    for _ in range(50):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    return ITERATIONS / elapsed, state.get("cache", "")
+
+
+async def main() -> None:
+    if DEBUG:
+        print("Route caching is disabled with DEBUG=true; run with DEBUG=false.")
+        return
+    rows = [
+        ("App + Router cache", *await run(build_app(edge_cache=False))),
+        ("App(edge_cache=True)", *await run(build_app(edge_cache=True))),
+    ]
+    width = max(len(name) for name, _, _ in rows)
+    print(f"{'hit path'.ljust(width)}  {'req/s':>9}  X-Lila-Cache")
+    for name, rps, cache in rows:
+        print(f"{name.ljust(width)}  {rps:>9.0f}  {cache}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
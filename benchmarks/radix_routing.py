@@ -0,0 +1,87 @@
+"""
+English: Compares Starlette's linear route scan with lila.core.radix.RadixRouter for 50, 500 and 5000
+         routes shaped like rest_crud_generate + @locales output. Every request is also checked to
+         resolve to the same endpoint on both routers. Run from the repository root:
+             python benchmarks/radix_routing.py
+Español: Compara el recorrido lineal de Starlette con lila.core.radix.RadixRouter para 50, 500 y 5000
+         rutas con la forma de rest_crud_generate + @locales. Además se comprueba que cada petición
+         resuelva al mismo endpoint en ambos routers. Ejecutar desde la raíz del repositorio:
+             python benchmarks/radix_routing.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starlette.routing import Router, Route, Mount  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from lila.core.radix import RadixRouter  # noqa: E402
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "3000"))
+
+
+def build_routes(total: int) -> list:
+    routes = []
+    models = max(1, total // 8)
+    for i in range(models):
+        name = f"/api/model{i}"
+
+        def endpoint(request, _tag=name):
+            return PlainTextResponse(_tag)
+
+        routes += [
+            Route(name, endpoint, methods=["GET"]),
+            Route(name, endpoint, methods=["POST"]),
+            Route(name + "/{id:int}", endpoint, methods=["GET"]),
+            Route(name + "/{id:int}", endpoint, methods=["PUT"]),
+            Route(name + "/{id:int}", endpoint, methods=["DELETE"]),
+            Route(f"/page{i}", endpoint, methods=["GET"]),
+            Route(f"/es/page{i}", endpoint, methods=["GET"]),
+            Route(f"/en/page{i}", endpoint, methods=["GET"]),
+        ]
+    routes.append(Mount("/", app=PlainTextResponse("static"), name="public"))
+    return routes[: total] + [routes[-1]]
+
+
+async def run(router, paths: list[tuple[str, str]]) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sent.append(message["body"])
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for method, path in paths:
+            scope = {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"", "headers": []}
+            await router(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    return elapsed / (ITERATIONS * len(paths)) * 1e6, sent
+
+
+async def main() -> None:
+    print(f"{'routes':>6}  {'starlette µs':>12}  {'radix µs':>9}  {'speedup':>7}")
+    for total in (50, 500, 5000):
+        routes = build_routes(total)
+        last = (total // 8) - 1
+        paths = [
+            ("GET", "/api/model0"),
+            ("GET", f"/api/model{last}/42"),
+            ("PUT", f"/api/model{last}/42"),
+            ("GET", f"/es/page{last}"),
+            ("GET", "/img/lila.png"),
+        ]
+        linear, linear_out = await run(Router(routes=routes), paths)
+        radix, radix_out = await run(RadixRouter(routes=routes), paths)
+        assert linear_out == radix_out, "radix router resolved a different route"
+        print(f"{total:>6}  {linear:>12.2f}  {radix:>9.2f}  {linear / radix:>6.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
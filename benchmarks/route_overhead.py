@@ -0,0 +1,100 @@
+"""
+English: Measures the per-request overhead that Router.route adds on top of a bare
+         Starlette endpoint, for a plain JSON route, a JSON route with SEO + locales,
+         and a template route. Run from the repository root:
+             python benchmarks/route_overhead.py
+Español: Mide la sobrecarga por petición que Router.route agrega sobre un endpoint
+         Starlette puro, para una ruta JSON simple, una ruta JSON con SEO + locales
+         y una ruta de plantilla. Ejecutar desde la raíz del repositorio:
+             python benchmarks/route_overhead.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.join(ROOT, "lila"))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "lila"))
+
+from starlette.requests import Request  # noqa: E402
+from lila.core.routing import Router, seo, locales  # noqa: E402
+from lila.core.responses import JSONResponse  # noqa: E402
+from lila.core.templates import render  # noqa: E402
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20000"))
+
+
+def make_request(path: str, query: bytes = b"") -> Request:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query,
+        "headers": [(b"host", b"localhost"), (b"cookie", b"lang=en")],
+        "scheme": "http",
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 1234),
+        "root_path": "",
+        "app": None,
+    }
+    return Request(scope)
+
+
+async def bench(endpoint, path: str, query: bytes = b"") -> float:
+    for _ in range(200):
+        await endpoint(make_request(path, query))
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await endpoint(make_request(path, query))
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    router = Router()
+
+    async def bare_json(request: Request):
+        return JSONResponse({"success": True})
+
+    @router.get("/json")
+    async def plain_json(request: Request):
+        return JSONResponse({"success": True})
+
+    @router.get("/seo")
+    @locales(["es", "en"])
+    @seo(title={"en": "Home", "es": "Inicio"}, description="translate:Create")
+    async def seo_json(request: Request):
+        return JSONResponse({"success": True})
+
+    class _App:
+        debug_html = False
+
+    async def bare_template(request: Request):
+        request.scope["app"] = _App()
+        return render(request=request, template="index")
+
+    @router.get("/template")
+    async def template(request: Request):
+        request.scope["app"] = _App()
+        return render(request=request, template="index")
+
+    endpoints = {route.path: route.endpoint for route in router.get_routes()}
+
+    rows = [
+        ("json (bare starlette)", await bench(bare_json, "/json")),
+        ("json (Router.route)", await bench(endpoints["/json"], "/json")),
+        ("json + seo + locales", await bench(endpoints["/en/seo"], "/en/seo")),
+        ("json + query string", await bench(endpoints["/json"], "/json", b"page=2&q=abc")),
+        ("template (bare)", await bench(bare_template, "/template")),
+        ("template (Router.route)", await bench(endpoints["/template"], "/template")),
+    ]
+    width = max(len(name) for name, _ in rows)
+    print(f"{'route'.ljust(width)}  µs/request")
+    for name, value in rows:
+        print(f"{name.ljust(width)}  {value:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
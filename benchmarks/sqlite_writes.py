@@ -0,0 +1,97 @@
+"""
+English: Compares SQLite write throughput of the default config against sqlite_profile="production" (WAL, pragmas
+         and the per-worker write coordinator) with several worker processes writing to one database file, like
+         uvicorn with WORKERS > 1. Each worker runs BENCH_CONCURRENCY concurrent writers doing small INSERTs
+         through Database.query_async. Run from the repository root:
+             python benchmarks/sqlite_writes.py
+Español: Compara el rendimiento de escritura en SQLite de la config por defecto contra sqlite_profile="production"
+         (WAL, pragmas y el coordinador de escritura por worker) con varios procesos escribiendo en un mismo
+         archivo, como uvicorn con WORKERS > 1. Cada worker corre BENCH_CONCURRENCY escritores concurrentes con
+         INSERTs pequeños vía Database.query_async. Ejecutar desde la raíz del repositorio:
+             python benchmarks/sqlite_writes.py
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.join(ROOT, "lila"))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "lila"))
+
+from lila.core.database import Database  # noqa: E402
+
+WORKERS = int(os.getenv("BENCH_WORKERS", "4"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "20"))
+WRITES = int(os.getenv("BENCH_WRITES", "250"))
+
+PROFILES = {
+    "default": {},
+    "production": {"sqlite_profile": "production"},
+}
+
+
+def worker(database: str, extra: dict, start, results) -> None:
+    async def write_all() -> tuple:
+        db = Database(config={"type": "sqlite", "database": database, "is_async": True, **extra})
+        db.connect()
+        errors = 0
+
+        async def writer(n: int) -> None:
+            nonlocal errors
+            for i in range(WRITES):
+                try:
+                    await db.query_async(
+                        "INSERT INTO events (worker, payload) VALUES (:w, :p)", {"w": os.getpid(), "p": f"{n}:{i}"}
+                    )
+                except Exception:
+                    errors += 1
+
+        start.wait()
+        began = time.perf_counter()
+        await asyncio.gather(*(writer(n) for n in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - began
+        await db.engine.dispose()
+        return elapsed, errors
+
+    results.put(asyncio.run(write_all()))
+
+
+def run(name: str, extra: dict, directory: str) -> tuple:
+    database = os.path.join(directory, name)
+    setup = Database(config={"type": "sqlite", "database": database, "is_async": False, **extra})
+    setup.connect()
+    setup.query("CREATE TABLE events (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)")
+    setup.engine.dispose()
+
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(database, extra, start, results)) for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    time.sleep(1.0)
+    began = time.perf_counter()
+    start.set()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+
+    errors = sum(e for _, e in outcomes)
+    return (WORKERS * CONCURRENCY * WRITES - errors) / elapsed, errors, elapsed
+
+
+def main() -> None:
+    print(f"{WORKERS} workers x {CONCURRENCY} writers x {WRITES} inserts")
+    print(f"{'profile':<12}  {'writes/s':>9}  {'errors':>6}  {'seconds':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, extra in PROFILES.items():
+            rate, errors, elapsed = run(name, extra, directory)
+            print(f"{name:<12}  {rate:>9.0f}  {errors:>6}  {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,22 @@ config = {
     "pool_size": 20,
     "max_overflow": 40
 }
+
+SQLite tuned for several workers (WAL, synchronous=NORMAL, busy_timeout, mmap, cache and a per-worker
+write coordinator that groups commits):
+config = {"type": "sqlite", "database": "lila", "is_async": True, "sqlite_profile": "production"}
+
+Pools sized from a global connection budget shared by every worker, warmed and checked on checkout:
+config = {..., **pool_sizing(max_connections=200), "min_size": 5, "pool_pre_ping": True, "pool_use_lifo": True}
+(from lila.core.database import pool_sizing; connection.pool_stats() reports checked out, overflow and waits)
+
+Read replicas (reads go to a replica, writes to the primary), each entry overrides the primary config:
+config = {
+    ...,
+    "replicas": [{"host": "replica-1"}, {"host": "replica-2"}],
+    "replica_policy": "round_robin",  # or "least_connections"
+    "read_your_writes": 5  # seconds reads stay on the primary after a write
+}
 """
 
 config = {"type": "sqlite", "database": "lila", "is_async": True}
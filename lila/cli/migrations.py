@@ -48,6 +48,10 @@ app = typer.Typer()
 
 async def migrate_async(connection, refresh: bool = False) -> bool:
     try:
+        # English: Creates the MySQL/PostgreSQL database if it is missing; Database.connect() no longer checks it.
+        # Español: Crea la base MySQL/PostgreSQL si no existe; Database.connect() ya no lo verifica.
+        if hasattr(connection, "ensure_database_async"):
+            await connection.ensure_database_async()
         load_models()
         if refresh:
             if hasattr(connection, "drop_all_async") and getattr(connection, "is_async", False):
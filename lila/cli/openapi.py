@@ -0,0 +1,41 @@
+import sys
+import os
+from pathlib import Path
+import importlib
+import typer
+
+# English: Ensure the current directory is in sys.path to import app modules.
+# Español: Asegurar que el directorio actual esté en sys.path para importar módulos de la app.
+if os.getcwd() not in sys.path:
+    sys.path.insert(0, os.getcwd())
+
+app = typer.Typer()
+
+
+@app.command()
+def export(
+    output: str = "public/openapi.json",
+    module: str = "app.routes.api.index",
+    router: str = "router",
+):
+    """
+    English: Writes the OpenAPI document of a Router to disk, so a static server (e.g. nginx) can serve it.
+             By default it exports `router` from app/routes/api/index.py to public/openapi.json.
+    Español: Escribe el documento OpenAPI de un Router en disco, para que un servidor estático (p. ej. nginx) lo sirva.
+             Por defecto exporta `router` de app/routes/api/index.py a public/openapi.json.
+    """
+    try:
+        router_obj = getattr(importlib.import_module(module), router)
+    except (ImportError, AttributeError) as e:
+        typer.echo(f"Router '{router}' not found in {module}: {e}")
+        raise typer.Exit(code=1)
+
+    body, etag = router_obj.openapi_bytes()
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    typer.echo(f"OpenAPI written to {path} ({len(body)} bytes, ETag {etag})")
+
+
+if __name__ == "__main__":
+    app()
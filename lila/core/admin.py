@@ -6,6 +6,8 @@ from lila.core.responses import  RedirectResponse, JSONResponse
 from lila.core.request import Request
 from lila.core.routing import Router
 from lila.core.session import Session
+from lila.core.query_stats import query_stats
+from lila.core.database import pool_stats
 from app.connections import connection
 from argon2 import PasswordHasher
 from functools import wraps
@@ -44,6 +46,20 @@ def admin_metrics():
     return JSONResponse(metrics)
 
 
+def admin_queries(request: Request) -> JSONResponse:
+    """Query statistics and connection pool state of the database layer (see lila.core.query_stats); DELETE resets the query statistics."""
+    if request.method == "DELETE":
+        query_stats.reset()
+        return JSONResponse({"success": True})
+    try:
+        limit = int(request.query_params.get("limit", 50))
+    except ValueError:
+        limit = 50
+    snapshot = query_stats.snapshot(limit=limit, sort=request.query_params.get("sort", "total_ms"))
+    snapshot["pools"] = pool_stats()
+    return JSONResponse(snapshot)
+
+
 def get_lila_memory_usage() -> tuple:
     """Get memory and CPU usage of the Lila Framework process."""
     process = psutil.Process(os.getpid())
@@ -250,6 +266,11 @@ def admin_routes(models: list, router: Router,default_route: str = "admin") -> R
     async def get_metrics(request: Request):
         return admin_metrics()
 
+    @router.route(path=f"/{default_route}/queries", methods=["GET", "DELETE"], cache_ttl=0)
+    @admin_required
+    async def get_queries(request: Request):
+        return admin_queries(request)
+
     @router.route(path=f"/{default_route}", methods=["GET"], cache_ttl=0)
     @admin_required
     async def admin_route(request: Request):
@@ -16,6 +16,7 @@ from itertools import chain
 from lila.core.request import Request
 from starlette.routing import Route, Mount
 from starlette.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 
 STATIC_EXTENSIONS = {
     ".js",
@@ -62,6 +63,9 @@ class App(Starlette):
         path_templates_markdown: Optional[str] = None,
         path_locales: Optional[str] = None,
         path_uploads: Optional[str] = None,
+        radix_routing: bool = False,
+        edge_cache: bool = False,
+        db_scope: bool = False,
     ):
         import app.config as config_module
         if secret_key is not None:
@@ -96,6 +100,8 @@ class App(Starlette):
         from lila.core.translate import Translate
         Translate.translate_enabled = translate
         self.debug_html = debug_html
+        self.edge_cache = edge_cache
+        self.db_scope = db_scope
 
         routes = routes or []
 
@@ -171,6 +177,33 @@ class App(Starlette):
             debug=debug, routes=routes, middleware=middleware,
         )
 
+        # English: Database pools are warmed up when the server starts (engines are lazy, connect() opens nothing) and
+        # pending background writes of the write-behind buffers are flushed when it shuts down.
+        # Español: Los pools de base de datos se precalientan al iniciar el servidor (los motores son perezosos,
+        # connect() no abre nada) y las escrituras en segundo plano pendientes se confirman al apagarlo.
+        lifespan_context = self.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app):
+            from lila.core.database import warm_up_databases
+            await warm_up_databases()
+            async with lifespan_context(app) as state:
+                try:
+                    yield state
+                finally:
+                    from lila.core.write_buffer import flush_write_buffers
+                    await flush_write_buffers()
+
+        self.router.lifespan_context = lifespan
+
+        if radix_routing:
+            # English: Replaces Starlette's linear route scan with a radix tree built once from the same routes.
+            # Español: Reemplaza el recorrido lineal de Starlette por un árbol radix construido una vez con las mismas rutas.
+            from lila.core.radix import RadixRouter
+            radix_router = RadixRouter(routes=self.router.routes, redirect_slashes=self.router.redirect_slashes)
+            radix_router.lifespan_context = self.router.lifespan_context
+            self.router = radix_router
+
         try:
             self.add_exception_handler(404, self._404_page)
             self.add_exception_handler(500, self._500_page)
@@ -188,6 +221,20 @@ class App(Starlette):
         except Exception as e:
             Logger.error(f"Error initializing application: {e}", exception=e)
 
+    def build_middleware_stack(self):
+        app = super().build_middleware_stack()
+        if self.db_scope:
+            # English: One pooled connection per request, checked out on first query and released with the response.
+            # Español: Una conexión del pool por petición, tomada en la primera consulta y liberada con la respuesta.
+            from lila.core.middleware import DatabaseScopeMiddleware
+            app = DatabaseScopeMiddleware(app)
+        if self.edge_cache:
+            # English: Cached route responses are replayed here, before errors, middlewares and compression run.
+            # Español: Las respuestas cacheadas de rutas se repiten aquí, antes de errores, middlewares y compresión.
+            from lila.core.middleware import EdgeCacheMiddleware
+            app = EdgeCacheMiddleware(app)
+        return app
+
     async def _404_page(self, request, exc):
         template_path = Path(f"{PATH_TEMPLATES_HTML}{PATH_TEMPLATE_NOT_FOUND}.jinja")
         if template_path.exists():
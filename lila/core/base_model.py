@@ -5,14 +5,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.connections import connection
 import asyncio
 import datetime
-from typing import Type, List, Dict, Any, Optional
-from lila.core.cache import Cache
+from typing import Type, List, Dict, Any, Optional, AsyncIterator
+from lila.core.cache import (
+    Cache, track_cache_tags, table_versions_async, bump_table_versions, bump_table_versions_async,
+)
 
 _PENDING_QUERIES: Dict[str, asyncio.Future] = {}
 
 
-async def run_deduplicated(cache_key: Optional[str], sync_func, *args, **kwargs) -> Any:
-    """Run a function with query deduplication and Redis caching if available."""
+async def run_deduplicated(cache_key: Optional[str], sync_func, *args, cache_ttl: int = 5, **kwargs) -> Any:
+    """Run a function with query deduplication and Redis caching (for cache_ttl seconds) if available."""
     if cache_key:
         cached_result = await Cache.get_async(cache_key)
         if cached_result is not None:
@@ -30,7 +32,7 @@ async def run_deduplicated(cache_key: Optional[str], sync_func, *args, **kwargs)
             else:
                 result = await loop.run_in_executor(None, lambda: sync_func(*args, **kwargs))
             
-            await Cache.set_async(cache_key, result, ttl=5)
+            await Cache.set_async(cache_key, result, ttl=cache_ttl)
             future.set_result(result)
             return result
         except Exception as exc:
@@ -51,11 +53,22 @@ class BaseModel(Base):
     _delete_logic = True
     _active_field = "active"
     _primary_key = "id"
+    # Seconds read results stay in Cache (get_all_async, get_by_id_async, run_async); 0 disables it.
+    _cache_ttl = 5
+
+    @classmethod
+    async def _versioned_cache_key(cls, cache_key: Optional[str]) -> Optional[str]:
+        """Append the table's write version to cache_key, so entries cached before a write are never read again."""
+        if not cache_key or not cls._cache_ttl:
+            return None
+        version, = await table_versions_async(cls.__tablename__)
+        return f"{cache_key}:v{version}"
 
     @classmethod
     async def invalidate_cache_async(cls):
-        """Invalidate all cached queries for this model in Redis asynchronously."""
+        """Invalidate cached queries for this model and every cache entry tagged with its table asynchronously."""
         from lila.core.cache import _REDIS_CLIENT_ASYNC
+        await bump_table_versions_async(cls.__tablename__)
         if _REDIS_CLIENT_ASYNC is not None:
             try:
                 keys = await _REDIS_CLIENT_ASYNC.keys(f"model:{cls.__tablename__}:*")
@@ -63,11 +76,16 @@ class BaseModel(Base):
                     await _REDIS_CLIENT_ASYNC.delete(*keys)
             except Exception:
                 pass
+        prefix = f"model:{cls.__tablename__}:"
+        for key in [k for k in Cache._DATA if k.startswith(prefix)]:
+            Cache._DATA.pop(key, None)
+        await Cache.invalidate_tags_async(cls.__tablename__)
 
     @classmethod
     def invalidate_cache(cls):
-        """Invalidate all cached queries for this model in Redis synchronously."""
+        """Invalidate cached queries for this model and every cache entry tagged with its table synchronously."""
         from lila.core.cache import _REDIS_CLIENT
+        bump_table_versions(cls.__tablename__)
         if _REDIS_CLIENT is not None:
             try:
                 keys = _REDIS_CLIENT.keys(f"model:{cls.__tablename__}:*")
@@ -75,15 +93,21 @@ class BaseModel(Base):
                     _REDIS_CLIENT.delete(*keys)
             except Exception:
                 pass
+        prefix = f"model:{cls.__tablename__}:"
+        for key in [k for k in Cache._DATA if k.startswith(prefix)]:
+            Cache._DATA.pop(key, None)
+        Cache.invalidate_tags(cls.__tablename__)
 
     @classmethod
     async def run_async(cls, cache_key: Optional[str], sync_func, *args, **kwargs) -> Any:
-        """Run a synchronous database operation in an executor."""
-        return await run_deduplicated(cache_key, sync_func, *args, **kwargs)
+        """Run a synchronous database operation in an executor, cached for _cache_ttl seconds until the next write."""
+        cache_key = await cls._versioned_cache_key(cache_key)
+        return await run_deduplicated(cache_key, sync_func, *args, cache_ttl=cls._cache_ttl, **kwargs)
 
     @classmethod
     def get_all(cls, select: str = None, limit: int = 1000, **filters) -> List[Dict[str, Any]]:
         """Get all records synchronously."""
+        track_cache_tags(cls.__tablename__)
         db = connection.get_session()
         try:
             if select:
@@ -121,14 +145,17 @@ class BaseModel(Base):
         **filters,
     ) -> List[Dict[str, Any]]:
         """Get all records asynchronously."""
-        cache_key = f"model:{cls.__tablename__}:get_all:{select}:{limit}:{tuple(sorted(filters.items()))}"
+        track_cache_tags(cls.__tablename__)
+        cache_key = await cls._versioned_cache_key(
+            f"model:{cls.__tablename__}:get_all:{select}:{limit}:{tuple(sorted(filters.items()))}"
+        )
 
         async def _fetch():
             if not connection.is_async:
                 return cls.get_all(select=select, limit=limit, **filters)
 
             from sqlalchemy import select as sa_select
-            async with connection.transaction() as db:
+            async with connection.read_session() as db:
                 if select:
                     column_names = [c.strip() for c in select.split(',')]
                 else:
@@ -156,11 +183,41 @@ class BaseModel(Base):
                 ]
                 return items
 
-        return await run_deduplicated(cache_key, _fetch)
+        return await run_deduplicated(cache_key, _fetch, cache_ttl=cls._cache_ttl)
+
+    @classmethod
+    async def iter_async(
+        cls,
+        select: str = None,
+        batch_size: int = 1000,
+        **filters,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate every matching record as a dict, in primary key order, through a server-side cursor (no limit)."""
+        from sqlalchemy import select as sa_select
+
+        track_cache_tags(cls.__tablename__)
+        table = cls.__table__
+        if select:
+            columns = [table.c[c.strip()] for c in select.split(',') if c.strip() in table.c]
+        else:
+            columns = list(table.c)
+
+        stmt = sa_select(*columns)
+        if cls._delete_logic and cls._active_field in table.c:
+            stmt = stmt.where(table.c[cls._active_field] == 1)
+        for key, val in filters.items():
+            if key in table.c:
+                stmt = stmt.where(table.c[key] == val)
+        if cls._primary_key in table.c:
+            stmt = stmt.order_by(table.c[cls._primary_key])
+
+        async for row in connection.stream_async(stmt, batch_size=batch_size):
+            yield row
 
     @classmethod
     def get_by_id(cls, db: Session, id: Any) -> Optional[Any]:
         """Get a record by ID synchronously."""
+        track_cache_tags(cls.__tablename__)
         query = db.query(cls).filter(getattr(cls, cls._primary_key) == id)
         if cls._delete_logic and hasattr(cls, cls._active_field):
             query = query.filter(getattr(cls, cls._active_field) == 1)
@@ -169,7 +226,8 @@ class BaseModel(Base):
     @classmethod
     async def get_by_id_async(cls, id: Any) -> Optional[Any]:
         """Get a record by ID asynchronously."""
-        cache_key = f"model:{cls.__tablename__}:get_by_id:{id}"
+        track_cache_tags(cls.__tablename__)
+        cache_key = await cls._versioned_cache_key(f"model:{cls.__tablename__}:get_by_id:{id}")
 
         async def _fetch():
             if not connection.is_async:
@@ -180,14 +238,14 @@ class BaseModel(Base):
                     db_sess.close()
 
             from sqlalchemy import select as sa_select
-            async with connection.transaction() as db:
+            async with connection.read_session() as db:
                 stmt = sa_select(cls).where(getattr(cls, cls._primary_key) == id)
                 if cls._delete_logic and hasattr(cls, cls._active_field):
                     stmt = stmt.where(getattr(cls, cls._active_field) == 1)
                 result = await db.execute(stmt)
                 return result.scalars().first()
 
-        return await run_deduplicated(cache_key, _fetch)
+        return await run_deduplicated(cache_key, _fetch, cache_ttl=cls._cache_ttl)
 
     @classmethod
     def insert(cls, db: Session, params: Dict[str, Any]) -> Any:
@@ -241,6 +299,123 @@ class BaseModel(Base):
         await cls.invalidate_cache_async()
         return instance
 
+    @classmethod
+    def _insert_many_statement(
+        cls,
+        keys: tuple,
+        on_conflict: Optional[str],
+        conflict_cols: List[str],
+        update_cols: Optional[List[str]],
+    ):
+        """Build the dialect-specific multi-row INSERT for one set of column keys."""
+        from sqlalchemy import insert as sa_insert
+
+        table = cls.__table__
+        dialect = connection.engine.dialect.name
+        if on_conflict is None:
+            return sa_insert(table)
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(table)
+            if on_conflict == "ignore":
+                return stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+            columns = update_cols or [k for k in keys if k not in conflict_cols and k != "created_at"]
+            if not columns:
+                return stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_cols,
+                set_={c: stmt.excluded[c] for c in columns},
+            )
+
+        if dialect in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+            stmt = dialect_insert(table)
+            if on_conflict == "ignore":
+                return stmt.prefix_with("IGNORE")
+            columns = update_cols or [k for k in keys if k not in conflict_cols and k != "created_at"]
+            if not columns:
+                return stmt.prefix_with("IGNORE")
+            return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+
+        raise ValueError(f"on_conflict is not supported for the '{dialect}' dialect")
+
+    @classmethod
+    async def insert_many_async(
+        cls,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 1000,
+        on_conflict: Optional[str] = None,
+        conflict_cols: Optional[List[str]] = None,
+        update_cols: Optional[List[str]] = None,
+    ) -> int:
+        """Insert many records with multi-row INSERTs, one transaction per chunk.
+
+        on_conflict="ignore" skips rows that hit a unique key, on_conflict="update" upserts them
+        (ON CONFLICT on PostgreSQL/SQLite, ON DUPLICATE KEY UPDATE on MySQL). conflict_cols defaults
+        to the primary key; update_cols defaults to every inserted column except conflict_cols
+        and created_at. Returns the number of rows sent to the database.
+        """
+        if on_conflict not in (None, "ignore", "update"):
+            raise ValueError("on_conflict must be None, 'ignore' or 'update'")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be greater than 0")
+
+        table = cls.__table__
+        conflict_cols = list(conflict_cols or [cls._primary_key])
+        now = datetime.datetime.now()
+        prepared = []
+        for params in rows:
+            valid_params = {}
+            for col in table.columns:
+                if col.name in params:
+                    valid_params[col.name] = params[col.name]
+                elif col.name == cls._active_field and cls._delete_logic:
+                    valid_params[col.name] = 1
+            if "created_at" in table.columns and "created_at" not in valid_params:
+                valid_params["created_at"] = now
+            prepared.append(valid_params)
+
+        if not prepared:
+            return 0
+
+        statements: Dict[tuple, Any] = {}
+
+        def _groups(chunk: List[Dict[str, Any]]):
+            # executemany needs the same keys on every row, so a chunk is split by key set.
+            groups: Dict[tuple, List[Dict[str, Any]]] = {}
+            for row in chunk:
+                groups.setdefault(tuple(row), []).append(row)
+            for keys, group in groups.items():
+                if keys not in statements:
+                    statements[keys] = cls._insert_many_statement(keys, on_conflict, conflict_cols, update_cols)
+                yield statements[keys], group
+
+        def _insert_chunk_sync(chunk: List[Dict[str, Any]]) -> None:
+            with connection.transaction_sync() as db:
+                for stmt, group in _groups(chunk):
+                    db.execute(stmt, group)
+
+        inserted = 0
+        try:
+            loop = asyncio.get_running_loop()
+            for start in range(0, len(prepared), chunk_size):
+                chunk = prepared[start:start + chunk_size]
+                if connection.is_async:
+                    async with connection.transaction() as db:
+                        for stmt, group in _groups(chunk):
+                            await db.execute(stmt, group)
+                else:
+                    await loop.run_in_executor(None, _insert_chunk_sync, chunk)
+                inserted += len(chunk)
+        finally:
+            if inserted:
+                await cls.invalidate_cache_async()
+        return inserted
+
     @classmethod
     def update(cls, db: Session, id: Any, data: Dict[str, Any]) -> bool:
         """Update a record synchronously."""
@@ -335,9 +510,98 @@ class BaseModel(Base):
         await cls.invalidate_cache_async()
         return bool(res)
 
+    _RANGE_OPERATORS = {
+        "gt": lambda c, v: c > v,
+        "gte": lambda c, v: c >= v,
+        "lt": lambda c, v: c < v,
+        "lte": lambda c, v: c <= v,
+        "ne": lambda c, v: c != v,
+    }
+
+    @classmethod
+    def _where_clauses(cls, filters: Dict[str, Any]) -> list:
+        """Translate a filters dict into WHERE clauses.
+
+        A scalar matches by equality, None by IS NULL, a list/tuple/set by IN and a dict such as
+        {"gte": 10, "lt": 20} by range (gt, gte, lt, lte, ne).
+        """
+        if not filters:
+            raise ValueError("filters are required; an empty filter would touch every row")
+        table = cls.__table__
+        clauses = []
+        for key, val in filters.items():
+            if key not in table.c:
+                raise ValueError(f"Unknown column '{key}' for {cls.__tablename__}")
+            column = table.c[key]
+            if isinstance(val, dict):
+                for op, operand in val.items():
+                    if op not in cls._RANGE_OPERATORS:
+                        raise ValueError(f"Unsupported operator '{op}' for column '{key}'")
+                    clauses.append(cls._RANGE_OPERATORS[op](column, operand))
+            elif isinstance(val, (list, tuple, set, frozenset)):
+                clauses.append(column.in_(list(val)))
+            elif val is None:
+                clauses.append(column.is_(None))
+            else:
+                clauses.append(column == val)
+        return clauses
+
+    @classmethod
+    async def _execute_where_async(cls, stmt) -> int:
+        """Run a set-based UPDATE/DELETE in one transaction, invalidate caches once and return the row count."""
+        if connection.is_async:
+            async with connection.transaction() as db:
+                result = await db.execute(stmt)
+        else:
+            def _run():
+                with connection.transaction_sync() as db:
+                    return db.execute(stmt)
+            result = await asyncio.get_running_loop().run_in_executor(None, _run)
+        count = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else 0
+        if count:
+            await cls.invalidate_cache_async()
+        return count
+
+    @classmethod
+    async def update_where_async(cls, filters: Dict[str, Any], values: Dict[str, Any]) -> int:
+        """Update every row matching filters with one UPDATE ... WHERE and return the affected row count.
+
+        With _delete_logic only active rows are updated. See _where_clauses for the filter syntax.
+        """
+        from sqlalchemy import update as sa_update
+
+        table = cls.__table__
+        unknown = [key for key in values if key not in table.c]
+        if not values or unknown:
+            raise ValueError(f"values must be a non-empty dict of columns of {cls.__tablename__}")
+
+        stmt = sa_update(table).where(*cls._where_clauses(filters))
+        if cls._delete_logic and cls._active_field in table.c and cls._active_field not in filters:
+            stmt = stmt.where(table.c[cls._active_field] == 1)
+        return await cls._execute_where_async(stmt.values(**values))
+
+    @classmethod
+    async def delete_where_async(cls, filters: Dict[str, Any]) -> int:
+        """Delete every row matching filters with one statement and return the affected row count.
+
+        With _delete_logic rows are soft deleted (UPDATE ... SET active = 0 WHERE active = 1),
+        otherwise a DELETE ... WHERE is issued. See _where_clauses for the filter syntax.
+        """
+        from sqlalchemy import update as sa_update, delete as sa_delete
+
+        table = cls.__table__
+        clauses = cls._where_clauses(filters)
+        if cls._delete_logic and cls._active_field in table.c:
+            active = table.c[cls._active_field]
+            stmt = sa_update(table).where(*clauses, active == 1).values({active: 0})
+        else:
+            stmt = sa_delete(table).where(*clauses)
+        return await cls._execute_where_async(stmt)
+
     @classmethod
     def get_all_without_orm(cls, select: str = None, limit: int = 1000, **filters) -> List[Dict[str, Any]]:
         """Get all records without ORM synchronously."""
+        track_cache_tags(cls.__tablename__)
         if not select:
             select = ", ".join([col.name for col in cls.__table__.columns])
             
@@ -361,6 +625,7 @@ class BaseModel(Base):
     @classmethod
     async def get_all_without_orm_async(cls, select: str = None, limit: int = 1000, **filters) -> List[Dict[str, Any]]:
         """Get all records without ORM asynchronously."""
+        track_cache_tags(cls.__tablename__)
         if not select:
             select = ", ".join([col.name for col in cls.__table__.columns])
             
@@ -384,6 +649,7 @@ class BaseModel(Base):
     @classmethod
     def get_by_id_without_orm(cls, id: Any, select: str = None) -> Optional[Dict[str, Any]]:
         """Get a record by ID without ORM synchronously."""
+        track_cache_tags(cls.__tablename__)
         if not select:
             select = ", ".join([col.name for col in cls.__table__.columns])
             
@@ -398,6 +664,7 @@ class BaseModel(Base):
     @classmethod
     async def get_by_id_without_orm_async(cls, id: Any, select: str = None) -> Optional[Dict[str, Any]]:
         """Get a record by ID without ORM asynchronously."""
+        track_cache_tags(cls.__tablename__)
         if not select:
             select = ", ".join([col.name for col in cls.__table__.columns])
             
@@ -411,6 +678,7 @@ class BaseModel(Base):
 
     def get_related(self, model_class: Type[Any], foreign_key_field: str = None) -> Optional[Any]:
         """Get a related model instance synchronously."""
+        track_cache_tags(model_class.__tablename__)
         if not foreign_key_field:
             foreign_key_field = f"{model_class.__name__.lower()}_id"
             if not hasattr(self, foreign_key_field):
@@ -434,6 +702,7 @@ class BaseModel(Base):
 
     async def get_related_async(self, model_class: Type[Any], foreign_key_field: str = None) -> Optional[Any]:
         """Get a related model instance asynchronously."""
+        track_cache_tags(model_class.__tablename__)
         if not foreign_key_field:
             foreign_key_field = f"{model_class.__name__.lower()}_id"
             if not hasattr(self, foreign_key_field):
@@ -444,7 +713,7 @@ class BaseModel(Base):
             return None
 
         from sqlalchemy import select as sa_select
-        async with connection.transaction() as db:
+        async with connection.read_session() as db:
             stmt = sa_select(model_class).where(getattr(model_class, model_class._primary_key) == fk_val)
             if model_class._delete_logic and hasattr(model_class, model_class._active_field):
                 stmt = stmt.where(getattr(model_class, model_class._active_field) == 1)
@@ -456,6 +725,7 @@ class BaseModel(Base):
 
     def get_related_many(self, model_class: Type[Any], foreign_key_field: str = None, limit: int = 1000) -> List[Any]:
         """Get related model instances synchronously."""
+        track_cache_tags(model_class.__tablename__)
         if not foreign_key_field:
             foreign_key_field = f"{self.__class__.__name__.lower()}_id"
             if not hasattr(model_class, foreign_key_field):
@@ -479,6 +749,7 @@ class BaseModel(Base):
 
     async def get_related_many_async(self, model_class: Type[Any], foreign_key_field: str = None, limit: int = 1000) -> List[Any]:
         """Get related model instances asynchronously."""
+        track_cache_tags(model_class.__tablename__)
         if not foreign_key_field:
             foreign_key_field = f"{self.__class__.__name__.lower()}_id"
             if not hasattr(model_class, foreign_key_field):
@@ -489,7 +760,7 @@ class BaseModel(Base):
             return []
 
         from sqlalchemy import select as sa_select
-        async with connection.transaction() as db:
+        async with connection.read_session() as db:
             stmt = sa_select(model_class).where(getattr(model_class, foreign_key_field) == pk_val)
             if model_class._delete_logic and hasattr(model_class, model_class._active_field):
                 stmt = stmt.where(getattr(model_class, model_class._active_field) == 1)
@@ -1,7 +1,15 @@
 import time
+import math
+import random
 import pickle
+import asyncio
+import hashlib
+import secrets
+import contextvars
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 from lila.core.config import ENV_CONFIG
 from app.config import DEBUG
 from starlette.responses import Response
@@ -21,6 +29,40 @@ _REDIS_CLIENT_ASYNC = None
 _REDIS_ASYNC_INITIALIZED = False
 _REDIS_ASYNC_LAST_TRY = 0.0
 
+# Single-flight state: one in-flight computation and at most one background refresh per key and worker.
+_INFLIGHT: dict[str, asyncio.Future] = {}
+_REFRESHING: set[str] = set()
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+# Tag index for the in-memory fallback (tag -> keys) and the tags collected while a cached value is computed.
+_TAG_INDEX: dict[str, set[str]] = {}
+_COLLECTED_TAGS: ContextVar[Optional[set]] = ContextVar("lila_cache_tags", default=None)
+
+# Per-table write versions for the in-memory fallback; with Redis they live in "tblver:<table>" counters.
+_TABLE_VERSIONS: dict[str, int] = {}
+
+
+def track_cache_tags(*tags: str) -> None:
+    """Record tags (usually table names) for the cache entry being computed, if any. Called by BaseModel reads."""
+    collected = _COLLECTED_TAGS.get()
+    if collected is not None:
+        collected.update(tags)
+
+
+@contextmanager
+def collect_cache_tags():
+    """Collect every tag tracked inside the block into the yielded set, and into the enclosing collection if any."""
+    parent = _COLLECTED_TAGS.get()
+    collected: set[str] = set()
+    token = _COLLECTED_TAGS.set(collected)
+    try:
+        yield collected
+    finally:
+        _COLLECTED_TAGS.reset(token)
+        # Nested caches (a cached helper inside a cached route) pass their tags to the outer entry.
+        if parent is not None:
+            parent.update(collected)
+
 
 def _get_redis_client():
     """Retrieve the synchronous Redis client, initializing it if necessary."""
@@ -94,6 +136,210 @@ async def _get_redis_client_async():
     return None
 
 
+DEFAULT_VARY: tuple[str, ...] = ("lang", "user", "query")
+_VARY_NAMED_PREFIXES = ("query:", "header:", "cookie:")
+
+
+def normalize_vary(vary: Optional[list[str]]) -> tuple[str, ...]:
+    """
+    Validate and order vary rules once. Supported rules: "lang", "user", "query" (all params),
+    "query:<name>", "header:<name>" and "cookie:<name>".
+    """
+    if vary is None:
+        return DEFAULT_VARY
+    rules = []
+    for rule in vary:
+        rule = rule.strip()
+        if rule in ("lang", "user", "query"):
+            rules.append(rule)
+        elif rule.startswith(_VARY_NAMED_PREFIXES) and rule.split(":", 1)[1]:
+            kind, name = rule.split(":", 1)
+            rules.append(f"{kind}:{name.lower() if kind == 'header' else name}")
+        else:
+            raise ValueError(f"Unknown cache vary rule: {rule!r}")
+    return tuple(sorted(set(rules)))
+
+
+async def resolve_cache_user(request, cookie_keys: Optional[list[str]] = None) -> str:
+    """
+    Resolve the identity used by the "user" vary rule: the user id stored in the first valid session cookie
+    or in the bearer token, never the raw cookie or token (unknown cookies and invalid tokens use a digest).
+    Returns "anon" for anonymous requests.
+    """
+    cached_user = getattr(request.state, "cache_user", None)
+    if cached_user is not None:
+        return cached_user
+
+    from lila.core.session import Session
+    identity = "anon"
+    for key in cookie_keys if cookie_keys is not None else ["session", "auth", "auth_admin"]:
+        if not request.cookies.get(key):
+            continue
+        data = await Session.unsign_async(key=key, request=request)
+        # Cookies that are not Lila sessions still isolate the entry, through a digest of their value.
+        identity = f"{key}:{_identity_of(data if data else ('raw', request.cookies[key]))}"
+        break
+
+    if identity == "anon":
+        auth_header = request.headers.get("Authorization", "")
+        if auth_header:
+            from lila.core.auth import get_token
+            token_data = get_token(auth_header)
+            # Invalid or expired tokens get their own identity, a digest of the header, never the anonymous one.
+            identity = f"token:{_identity_of(token_data if isinstance(token_data, dict) else ('raw', auth_header))}"
+
+    request.state.cache_user = identity
+    return identity
+
+
+def _identity_of(data: Any) -> str:
+    """Return the user id of session or token data, or a digest of the data when it has no id field."""
+    if isinstance(data, dict):
+        for field in ("user_id", "id", "sub"):
+            if data.get(field) is not None:
+                return str(data[field])
+        return hashlib.blake2b(repr(sorted(data.items())).encode(), digest_size=8).hexdigest()
+    return hashlib.blake2b(str(data).encode(), digest_size=8).hexdigest()
+
+
+async def build_cache_key(
+    request,
+    prefix: str = "route",
+    vary: tuple[str, ...] = DEFAULT_VARY,
+    cookie_keys: Optional[list[str]] = None,
+) -> str:
+    """
+    Build a normalized, fixed-length cache key: "<prefix>:<method>:<path>:<digest>". Query params are sorted
+    and every variable part (query, language, user id, headers, cookies) is hashed into a 32 character digest.
+    """
+    parts = []
+    for rule in vary:
+        if rule == "query":
+            parts.append(f"q={sorted(request.query_params.multi_items())}")
+        elif rule == "lang":
+            from lila.core.translate import Translate
+            parts.append(f"l={Translate.lang(request=request)}")
+        elif rule == "user":
+            parts.append(f"u={await resolve_cache_user(request, cookie_keys)}")
+        elif rule.startswith("query:"):
+            parts.append(f"{rule}={request.query_params.getlist(rule[6:])}")
+        elif rule.startswith("header:"):
+            parts.append(f"{rule}={request.headers.get(rule[7:], '')}")
+        else:
+            parts.append(f"{rule}={request.cookies.get(rule[7:], '')}")
+
+    path = request.url.path
+    digest = hashlib.blake2b("\n".join([path, *parts]).encode(), digest_size=16).hexdigest()
+    if len(path) > 128:
+        path = path[:128]
+    return f"{prefix}:{request.method}:{path}:{digest}"
+
+
+def _queue_tag_index(pipe, key: str, tags: Iterable[str], ttl: int) -> None:
+    """Queue the commands that add key to each "tag:<name>" set; a set lives as long as its longest entry."""
+    for tag in tags:
+        name = f"tag:{tag}"
+        pipe.sadd(name, key)
+        pipe.expire(name, ttl, nx=True)
+        pipe.expire(name, ttl, gt=True)
+
+
+def table_versions(*tables: str) -> tuple[int, ...]:
+    """Current version of each table synchronously. Cached query keys embed them, so a bump makes old entries unreachable."""
+    global _REDIS_CLIENT
+    client = _get_redis_client()
+    if client is not None and tables:
+        try:
+            return tuple(int(v or 0) for v in client.mget([f"tblver:{t}" for t in tables]))
+        except Exception:
+            _REDIS_CLIENT = None
+    return tuple(_TABLE_VERSIONS.get(t, 0) for t in tables)
+
+
+async def table_versions_async(*tables: str) -> tuple[int, ...]:
+    """Current version of each table asynchronously (one MGET with Redis)."""
+    global _REDIS_CLIENT_ASYNC
+    client = await _get_redis_client_async()
+    if client is not None and tables:
+        try:
+            return tuple(int(v or 0) for v in await client.mget([f"tblver:{t}" for t in tables]))
+        except Exception:
+            _REDIS_CLIENT_ASYNC = None
+    return table_versions(*tables)
+
+
+def bump_table_versions(*tables: str) -> None:
+    """Increment the version of each written table synchronously."""
+    global _REDIS_CLIENT
+    for t in tables:
+        _TABLE_VERSIONS[t] = _TABLE_VERSIONS.get(t, 0) + 1
+    client = _get_redis_client()
+    if client is not None and tables:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for t in tables:
+                pipe.incr(f"tblver:{t}")
+            pipe.execute()
+        except Exception:
+            _REDIS_CLIENT = None
+
+
+async def bump_table_versions_async(*tables: str) -> None:
+    """Increment the version of each written table asynchronously."""
+    global _REDIS_CLIENT_ASYNC
+    for t in tables:
+        _TABLE_VERSIONS[t] = _TABLE_VERSIONS.get(t, 0) + 1
+    client = await _get_redis_client_async()
+    if client is not None and tables:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for t in tables:
+                pipe.incr(f"tblver:{t}")
+            await pipe.execute()
+        except Exception:
+            _REDIS_CLIENT_ASYNC = None
+
+
+# Deletes the lock only while it still holds our token, so a lock that expired and was taken by another worker is kept.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+async def _acquire_lock_async(key: str, timeout: float) -> Any:
+    """
+    Try to take the short cross-worker Redis lock for key. Returns the owner token on success, False when another
+    worker holds it and None when Redis is not available.
+    """
+    global _REDIS_CLIENT_ASYNC
+    client = await _get_redis_client_async()
+    if client is None:
+        return None
+    token = secrets.token_hex(16)
+    try:
+        if await client.set(f"lock:{key}", token, nx=True, px=max(1, int(timeout * 1000))):
+            return token
+        return False
+    except Exception:
+        _REDIS_CLIENT_ASYNC = None
+        return None
+
+
+async def _release_lock_async(key: str, token: str) -> None:
+    """Release the cross-worker Redis lock for key if it is still owned by token."""
+    global _REDIS_CLIENT_ASYNC
+    client = await _get_redis_client_async()
+    if client is None:
+        return
+    try:
+        await client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+    except Exception:
+        _REDIS_CLIENT_ASYNC = None
+
+
 class Cache:
     """Interface for caching values with Redis backend and in-memory fallback."""
     _DATA: dict[str, tuple[Any, float]] = {}
@@ -106,15 +352,25 @@ class Cache:
         keys_to_delete = [k for k, (_, expiry) in cls._DATA.items() if now > expiry]
         for k in keys_to_delete:
             del cls._DATA[k]
+        for tag in list(_TAG_INDEX):
+            _TAG_INDEX[tag] &= cls._DATA.keys()
+            if not _TAG_INDEX[tag]:
+                del _TAG_INDEX[tag]
 
     @classmethod
-    def set(cls, key: str, value: Any, ttl: int = 300) -> None:
-        """Set a key value pair in cache with time-to-live synchronously."""
+    def set(cls, key: str, value: Any, ttl: int = 300, tags: Optional[Iterable[str]] = None) -> None:
+        """Set a key value pair in cache with time-to-live synchronously. tags allow invalidate_tags to delete it."""
         global _REDIS_CLIENT
         client = _get_redis_client()
         if client is not None:
             try:
-                client.setex(name=key, time=ttl, value=pickle.dumps(value))
+                if tags:
+                    pipe = client.pipeline(transaction=False)
+                    pipe.setex(name=key, time=ttl, value=pickle.dumps(value))
+                    _queue_tag_index(pipe, key, tags, ttl)
+                    pipe.execute()
+                else:
+                    client.setex(name=key, time=ttl, value=pickle.dumps(value))
                 if DEBUG:
                     print(f"REDIS CACHE: SET: {key} with {ttl} ttl, value: {value}")
                 return
@@ -126,22 +382,30 @@ class Cache:
             if len(cls._DATA) >= cls.MAX_ITEMS:
                 cls.clear()
         cls._DATA[key] = (value, time.time() + ttl)
+        for tag in tags or ():
+            _TAG_INDEX.setdefault(tag, set()).add(key)
 
     @classmethod
-    async def set_async(cls, key: str, value: Any, ttl: int = 300) -> None:
-        """Set a key value pair in cache with time-to-live asynchronously."""
+    async def set_async(cls, key: str, value: Any, ttl: int = 300, tags: Optional[Iterable[str]] = None) -> None:
+        """Set a key value pair in cache with time-to-live asynchronously. tags allow invalidate_tags to delete it."""
         global _REDIS_CLIENT_ASYNC
         client = await _get_redis_client_async()
         if client is not None:
             try:
-                await client.setex(name=key, time=ttl, value=pickle.dumps(value))
+                if tags:
+                    pipe = client.pipeline(transaction=False)
+                    pipe.setex(name=key, time=ttl, value=pickle.dumps(value))
+                    _queue_tag_index(pipe, key, tags, ttl)
+                    await pipe.execute()
+                else:
+                    await client.setex(name=key, time=ttl, value=pickle.dumps(value))
                 if DEBUG:
                     print(f"REDIS CACHE (ASYNC): SET: {key} with {ttl} ttl, value: {value}")
                 return
             except Exception:
                 _REDIS_CLIENT_ASYNC = None
 
-        cls.set(key, value, ttl)
+        cls.set(key, value, ttl, tags)
 
     @classmethod
     def get(cls, key: str) -> Optional[Any]:
@@ -235,6 +499,7 @@ class Cache:
                 _REDIS_CLIENT = None
 
         cls._DATA.clear()
+        _TAG_INDEX.clear()
 
     @classmethod
     async def clear_async(cls) -> None:
@@ -250,40 +515,205 @@ class Cache:
 
         cls.clear()
 
+    @classmethod
+    def invalidate_tags(cls, *tags: str) -> None:
+        """Delete every entry stored with any of the given tags synchronously."""
+        global _REDIS_CLIENT
+        client = _get_redis_client()
+        if client is not None:
+            try:
+                for tag in tags:
+                    while True:
+                        keys = client.spop(f"tag:{tag}", 500)
+                        if not keys:
+                            break
+                        client.delete(*keys)
+                return
+            except Exception:
+                _REDIS_CLIENT = None
+
+        for tag in tags:
+            for key in _TAG_INDEX.pop(tag, ()):
+                cls._DATA.pop(key, None)
+
+    @classmethod
+    async def invalidate_tags_async(cls, *tags: str) -> None:
+        """Delete every entry stored with any of the given tags asynchronously."""
+        global _REDIS_CLIENT_ASYNC
+        client = await _get_redis_client_async()
+        if client is not None:
+            try:
+                for tag in tags:
+                    while True:
+                        keys = await client.spop(f"tag:{tag}", 500)
+                        if not keys:
+                            break
+                        await client.delete(*keys)
+                return
+            except Exception:
+                _REDIS_CLIENT_ASYNC = None
+
+        cls.invalidate_tags(*tags)
+
+    @classmethod
+    async def fetch_async(
+        cls,
+        key: str,
+        compute,
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        early_refresh: float = 0.0,
+        lock_timeout: float = 5.0,
+        tags: Optional[Iterable[str]] = None,
+    ) -> tuple[Any, str]:
+        """
+        Return (value, state) for key, computing it with `await compute()` on a miss. state is HIT, STALE or MISS.
+        Concurrent misses share one computation per worker and one per cluster through a short Redis lock.
+        Entries stay `stale_ttl` seconds after `ttl`; in that window the stale value is served while one
+        background task refreshes it. `early_refresh` (XFetch beta, 1.0 is a good default) refreshes hot
+        keys probabilistically before they expire. When compute returns None nothing is stored.
+        The entry is tagged with `tags` plus every tag tracked while compute runs (see track_cache_tags).
+        Background refreshes run compute in a clean context, after the triggering request has been answered, so
+        with stale_ttl/early_refresh it must not depend on per-request state (body, session, cookies it sets).
+        """
+        entry = await cls.get_async(key)
+        if entry is not None:
+            if not isinstance(entry, dict) or "fresh_until" not in entry:
+                return entry, "HIT"
+            now = time.time()
+            fresh_until = entry["fresh_until"]
+            if now < fresh_until:
+                delta = entry.get("delta", 0.0)
+                if early_refresh > 0 and delta > 0 and now - delta * early_refresh * math.log(1.0 - random.random()) >= fresh_until:
+                    cls._refresh_in_background(key, compute, ttl, stale_ttl, lock_timeout, tags)
+                track_cache_tags(*entry.get("tags", ()))
+                return entry["value"], "HIT"
+            cls._refresh_in_background(key, compute, ttl, stale_ttl, lock_timeout, tags)
+            track_cache_tags(*entry.get("tags", ()))
+            return entry["value"], "STALE"
+
+        pending = _INFLIGHT.get(key)
+        if pending is not None:
+            value, entry_tags = await asyncio.shield(pending)
+            if value is not None:
+                track_cache_tags(*entry_tags)
+                return value, "HIT"
+            return await compute(), "MISS"
+
+        future = asyncio.get_running_loop().create_future()
+        _INFLIGHT[key] = future
+        locked = None
+        value, entry_tags = None, ()
+        try:
+            locked = await _acquire_lock_async(key, lock_timeout)
+            if locked is False:
+                entry = await cls._wait_for_peer_async(key, lock_timeout)
+                if entry is not None:
+                    value, entry_tags = entry["value"], entry.get("tags", ())
+                    track_cache_tags(*entry_tags)
+                    return value, "HIT"
+            value, entry_tags = await cls._compute_and_store_async(key, compute, ttl, stale_ttl, tags)
+            return value, "MISS"
+        finally:
+            # Followers get None on errors and compute on their own instead of re-raising.
+            if not future.done():
+                future.set_result((value, entry_tags))
+            _INFLIGHT.pop(key, None)
+            if locked:
+                await _release_lock_async(key, locked)
+
+    @classmethod
+    async def _compute_and_store_async(cls, key: str, compute, ttl: int, stale_ttl: int, tags: Optional[Iterable[str]] = None) -> tuple[Any, list[str]]:
+        """Run compute and store its value with the metadata used for stale and early refresh decisions."""
+        start = time.perf_counter()
+        with collect_cache_tags() as collected:
+            value = await compute()
+        entry_tags = sorted(collected.union(tags or ()))
+        track_cache_tags(*entry_tags)
+        if value is not None:
+            entry = {"value": value, "fresh_until": time.time() + ttl, "delta": time.perf_counter() - start, "tags": entry_tags}
+            await cls.set_async(key, entry, ttl=ttl + max(0, stale_ttl), tags=entry_tags)
+        return value, entry_tags
+
+    @classmethod
+    async def _wait_for_peer_async(cls, key: str, timeout: float) -> Any:
+        """Poll the cache while another worker holds the lock for key. Returns the stored entry or None on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await cls.get_async(key)
+            if entry is not None:
+                return entry if isinstance(entry, dict) and "fresh_until" in entry else {"value": entry}
+        return None
+
+    @classmethod
+    def _refresh_in_background(cls, key: str, compute, ttl: int, stale_ttl: int, lock_timeout: float, tags: Optional[Iterable[str]] = None) -> None:
+        """Schedule one refresh of key unless this worker or another one is already refreshing it."""
+        if key in _REFRESHING:
+            return
+        _REFRESHING.add(key)
+
+        async def refresh():
+            locked = None
+            try:
+                locked = await _acquire_lock_async(key, lock_timeout)
+                if locked is False:
+                    return
+                await cls._compute_and_store_async(key, compute, ttl, stale_ttl, tags)
+            except Exception as e:
+                if DEBUG:
+                    print(f"CACHE: background refresh failed for {key}: {e}")
+            finally:
+                _REFRESHING.discard(key)
+                if locked:
+                    await _release_lock_async(key, locked)
+
+        # Clean context: the refresh outlives the request that triggered it and must not reuse its connection
+        # scope, read routing or query route.
+        task = asyncio.get_running_loop().create_task(refresh(), context=contextvars.Context())
+        _BACKGROUND_TASKS.add(task)
+        task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+def cached(ttl: int = 300, stale_ttl: int = 0, early_refresh: float = 0.0, vary: Optional[list[str]] = None, tags: Optional[list[str]] = None):
+    """
+    Route decorator to cache GET requests asynchronously.
+    Concurrent misses run the handler once; stale_ttl and early_refresh behave as in Cache.fetch_async.
+    vary lists what the cached response depends on (see normalize_vary); by default the query and the user.
+    tags are added to the tables read through BaseModel; Cache.invalidate_tags_async(tag) drops the entries.
+    """
+    rules = normalize_vary(vary if vary is not None else ["query", "user"])
 
-def cached(ttl: int = 300):
-    """Route decorator to cache GET requests asynchronously."""
     def decorator(func):
         @wraps(func)
         async def wrapper(request, *args, **kwargs):
             if request.method != "GET":
                 return await func(request, *args, **kwargs)
 
-            query_params = tuple(sorted(request.query_params.items()))
-            auth_cookie = request.cookies.get("auth", "") or request.cookies.get("session", "")
-            auth_header = request.headers.get("Authorization", "")
-            cache_key = f"route_cache:{request.url.path}:{query_params}:{auth_cookie}:{auth_header}"
-
-            cached_data = await Cache.get_async(cache_key)
-            if cached_data is not None:
-                return Response(
-                    content=cached_data["body"],
-                    status_code=cached_data["status_code"],
-                    media_type=cached_data["media_type"],
-                    headers=cached_data["headers"]
-                )
-
-            response = await func(request, *args, **kwargs)
-            if response.status_code == 200:
-                body_bytes = getattr(response, "body", b"")
-                cache_payload = {
-                    "body": body_bytes,
+            cache_key = await build_cache_key(request, prefix="route_cache", vary=rules)
+            produced = {}
+
+            async def compute():
+                response = await func(request, *args, **kwargs)
+                produced["response"] = response
+                if response.status_code != 200:
+                    return None
+                return {
+                    "body": getattr(response, "body", b""),
                     "status_code": response.status_code,
                     "media_type": getattr(response, "media_type", "application/json"),
                     "headers": dict(response.headers)
                 }
-                await Cache.set_async(cache_key, cache_payload, ttl)
 
-            return response
+            cached_data, _ = await Cache.fetch_async(cache_key, compute, ttl=ttl, stale_ttl=stale_ttl, early_refresh=early_refresh, tags=tags)
+            response = produced.get("response")
+            if response is not None:
+                return response
+            return Response(
+                content=cached_data["body"],
+                status_code=cached_data["status_code"],
+                media_type=cached_data["media_type"],
+                headers=cached_data["headers"]
+            )
         return wrapper
     return decorator
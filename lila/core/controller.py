@@ -1,12 +1,43 @@
-from typing import Union
-from pydantic import BaseModel, ValidationError
+from typing import Union, Any
+from pydantic import BaseModel, ValidationError, TypeAdapter
 from lila.core.request import Request
 
+_TYPE_ADAPTERS: dict[Any, TypeAdapter] = {}
+
+
+def get_type_adapter(schema: Any) -> TypeAdapter:
+    """
+    English: Returns a TypeAdapter for the schema, built once and cached for the life of the process.
+    Español: Retorna un TypeAdapter para el schema, construido una vez y cacheado durante la vida del proceso.
+    """
+    adapter = _TYPE_ADAPTERS.get(schema)
+    if adapter is None:
+        adapter = _TYPE_ADAPTERS[schema] = TypeAdapter(schema)
+    return adapter
+
+
+def query_to_dict(request: Request) -> dict:
+    """
+    English: Converts query params to a dict for validation; repeated keys become lists.
+    Español: Convierte los query params a un dict para validar; las claves repetidas se convierten en listas.
+    """
+    data: dict = {}
+    for key, value in request.query_params.multi_items():
+        if key in data:
+            current = data[key]
+            if isinstance(current, list):
+                current.append(value)
+            else:
+                data[key] = [current, value]
+        else:
+            data[key] = value
+    return data
+
+
 class RequestParser:
     async def parse_body(self, request: Request, schema: BaseModel) -> dict:
         try:
-            body = await request.json()
-            model = schema(**body)
+            model = get_type_adapter(schema).validate_json(await request.body())
             return {"success": True, "data": model}
         except ValidationError as e:
             return {"success": False, "errors": e.errors()}
@@ -15,8 +46,7 @@ class RequestParser:
 
     async def parse_query(self, request: Request, schema: BaseModel) -> dict:
         try:
-            query_dict = dict(request.query_params)
-            model = schema(**query_dict)
+            model = get_type_adapter(schema).validate_python(query_to_dict(request))
             return {"success": True, "data": model}
         except ValidationError as e:
             return {"success": False, "errors": e.errors()}
@@ -1,12 +1,229 @@
 from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, event, Table
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.expression import Executable, TextClause
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from typing import Optional, Type, Dict, Any, Union
+from typing import Optional, Type, Dict, Any, Union, AsyncIterator
 from lila.core.logger import Logger
+from lila.core.query_stats import instrument, note_pool_wait
+from lila.core.cache import (
+    Cache, track_cache_tags, table_versions_async, bump_table_versions, bump_table_versions_async,
+)
+import os
 import re
-from contextlib import contextmanager, asynccontextmanager
+import hashlib
+import threading
+import pickle
+import time
+from contextlib import contextmanager, asynccontextmanager, AsyncExitStack
+import contextvars
+from contextvars import ContextVar
+
+
+def _statement(query: Union[str, Executable]) -> tuple:
+    """
+    English: Returns (statement, leading SQL keyword). Strings are wrapped in text(); prebuilt text() or Core
+    statements are used as they are, so SQLAlchemy's compiled cache is hit without parsing again.
+    Español: Retorna (sentencia, palabra clave SQL inicial). Los strings se envuelven en text(); las sentencias
+    text() o Core ya armadas se usan tal cual, así se reutiliza la caché de compilación de SQLAlchemy.
+    """
+    if isinstance(query, str):
+        return text(query), query.lstrip()[:6].upper()
+    if isinstance(query, TextClause):
+        return query, query.text.lstrip()[:6].upper()
+    for keyword in ("select", "insert", "update", "delete"):
+        if getattr(query, f"is_{keyword}", False):
+            return query, keyword.upper()
+    return query, ""
+
+
+_TABLE_NAME = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+[`"\[]?(?:\w+[`"\]]?\.[`"\[]?)?(\w+)', re.IGNORECASE)
+_SQL_TABLES: Dict[str, tuple] = {}
+
+
+def _tables_of(statement: Union[str, Executable]) -> tuple:
+    """
+    English: Names of the tables a statement reads or writes. Core statements are walked; SQL text is scanned for
+    FROM/JOIN/INTO/UPDATE and the result is memoized per SQL string.
+    Español: Nombres de las tablas que lee o escribe una sentencia. Las sentencias Core se recorren; el SQL en texto
+    se analiza buscando FROM/JOIN/INTO/UPDATE y el resultado se memoriza por string.
+    """
+    if isinstance(statement, TextClause):
+        statement = statement.text
+    if isinstance(statement, str):
+        tables = _SQL_TABLES.get(statement)
+        if tables is None:
+            if len(_SQL_TABLES) >= 1024:
+                _SQL_TABLES.clear()
+            tables = _SQL_TABLES[statement] = tuple(sorted({m.lower() for m in _TABLE_NAME.findall(statement)}))
+        return tables
+    return tuple(sorted({node.name for node in visitors.iterate(statement) if isinstance(node, Table)}))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_executed_tables(orm_execute_state) -> None:
+    """Remembers the tables written through session.execute() so transaction() can bump their cache versions."""
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        if statement.text.lstrip()[:6].upper() not in ("INSERT", "UPDATE", "DELETE"):
+            return
+    elif not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    orm_execute_state.session.info.setdefault("lila_written_tables", set()).update(_tables_of(statement))
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context) -> None:
+    """Remembers the tables of the objects flushed by the unit of work."""
+    written = session.info.setdefault("lila_written_tables", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, "__table__", None)
+        if table is not None:
+            written.add(table.name)
+
+
+_SCOPE: ContextVar[Optional[dict]] = ContextVar("lila_db_scope", default=None)
+# Key set in a scope dict when its connection_scope() exits. Tasks spawned inside keep a reference to the dict;
+# once closed it no longer lends connections, so they check out (and return) their own.
+_SCOPE_CLOSED = object()
+
+
+class _ConnectionScope:
+    """The connection one Database lends to a request scope; busy while a query or session is using it."""
+    __slots__ = ("connection", "busy")
+
+    def __init__(self) -> None:
+        self.connection = None
+        self.busy = False
+
+
+class _PoolMeter:
+    """Checkout counters of one engine's pool, measured where Lila acquires connections."""
+    __slots__ = ("waiting", "checkouts", "total_wait", "max_wait", "lock")
+
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.lock = threading.Lock()
+
+    def begin(self) -> float:
+        with self.lock:
+            self.waiting += 1
+        return time.perf_counter()
+
+    def end(self, started: float) -> None:
+        waited = time.perf_counter() - started
+        with self.lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.total_wait += waited
+            if waited > self.max_wait:
+                self.max_wait = waited
+        note_pool_wait(waited)
+
+
+def pool_sizing(max_connections: int, workers: Optional[int] = None, reserved: int = 5, servers: int = 1) -> Dict[str, int]:
+    """
+    English: pool_size and max_overflow that keep every worker within a global connection budget:
+    max_connections minus `reserved` (admin, migrations, cron...) is split between workers and, when one budget
+    is shared by several Database objects per worker, between `servers`. Half of each share stays open (pool_size),
+    the rest is burst capacity (max_overflow). workers defaults to WORKERS of app.config ("max" = 2 * cpu + 1).
+        config = {"type": "postgresql", ..., **pool_sizing(max_connections=200)}
+    Español: pool_size y max_overflow que mantienen a todos los workers dentro de un presupuesto global de
+    conexiones: max_connections menos `reserved` (admin, migraciones, cron...) se reparte entre los workers y, si
+    varios Database por worker comparten el presupuesto, entre `servers`. La mitad de cada parte queda abierta
+    (pool_size) y el resto es capacidad de pico (max_overflow). workers por defecto es WORKERS de app.config
+    ("max" = 2 * cpu + 1).
+    """
+    if workers is None:
+        try:
+            from app.config import WORKERS
+        except ImportError:
+            WORKERS = "max"
+        if str(WORKERS).lower() == "max" or str(WORKERS) == "0":
+            workers = (os.cpu_count() or 1) * 2 + 1
+        else:
+            workers = int(WORKERS)
+    consumers = max(1, workers) * max(1, servers)
+    if max_connections - reserved < consumers:
+        Logger.warning(f"pool_sizing: {max_connections} connections cannot give one to each of {consumers} pools")
+    share = max(1, (max_connections - reserved) // consumers)
+    pool_size = max(1, share // 2)
+    return {"pool_size": pool_size, "max_overflow": share - pool_size}
+
+
+_ROUTING: ContextVar[Optional["_ReadRouting"]] = ContextVar("lila_db_routing", default=None)
+_IN_TRANSACTION: ContextVar[bool] = ContextVar("lila_db_in_transaction", default=False)
+# Longest read-your-writes window among databases with replicas; DatabaseScopeMiddleware uses it as cookie max-age.
+_READ_YOUR_WRITES_WINDOW = 0.0
+READ_YOUR_WRITES_COOKIE = "lila_rw"
+
+
+class _ReadRouting:
+    """Read routing state of one request or job, shared with the tasks it spawns."""
+    __slots__ = ("last_write",)
+
+    def __init__(self) -> None:
+        self.last_write = float("-inf")
+
+
+@asynccontextmanager
+async def connection_scope():
+    """
+    English: Unit of work for the current request or background job. Inside it, every async Database checks out
+    at most one pooled connection, on first use, and reuses it for query_async, query_orm_async and transaction().
+    Nested or concurrent use falls back to a fresh connection. Connections are released on exit; nested scopes
+    join the outer one, and tasks spawned inside that outlive it use their own connections. The scope also bounds the read-your-writes window used for replica routing.
+    Español: Unidad de trabajo para la petición o tarea actual. Dentro, cada Database async toma como máximo una
+    conexión del pool, al primer uso, y la reutiliza en query_async, query_orm_async y transaction(). El uso
+    anidado o concurrente usa una conexión nueva. Las conexiones se liberan al salir; los scopes anidados se
+    unen al externo, y las tareas creadas dentro que lo sobreviven usan sus propias conexiones. El scope también delimita la ventana read-your-writes del ruteo a réplicas.
+    """
+    current = _SCOPE.get()
+    if current is not None and _SCOPE_CLOSED not in current:
+        yield
+        return
+    scopes = {}
+    token = _SCOPE.set(scopes)
+    routing_token = _ROUTING.set(_ReadRouting())
+    try:
+        yield
+    finally:
+        scopes[_SCOPE_CLOSED] = True
+        await release_scope_connections(scopes)
+        _ROUTING.reset(routing_token)
+        _SCOPE.reset(token)
+
+
+async def release_scope_connections(scopes: Optional[dict] = None) -> None:
+    """Returns the connections held by the current scope to the pool; the scope stays usable and re-acquires lazily."""
+    if scopes is None:
+        scopes = _SCOPE.get()
+    if not scopes:
+        return
+    for scope in list(scopes.values()):
+        if isinstance(scope, _ConnectionScope) and scope.connection is not None and not scope.busy:
+            connection, scope.connection = scope.connection, None
+            await connection.close()
+
+
+# Every connected Database of this worker; App warms them up at startup through warm_up_databases().
+_DATABASES: list = []
+
+
+async def warm_up_databases() -> None:
+    """Opens the first pooled connections of every connected Database (see Database.warm_up_async)."""
+    for database in list(_DATABASES):
+        await database.warm_up_async()
+
+
+def pool_stats() -> list:
+    """Pool stats of every connected Database whose engine exists (see Database.pool_stats)."""
+    return [database.pool_stats() for database in list(_DATABASES) if database._engine is not None]
 
 
 class Base(DeclarativeBase):
@@ -21,162 +238,394 @@ class Database:
         self.connection = None
         self.metadata = MetaData()
         self.tables = []
-        self.engine = None
-        self.SessionLocal = None
+        self._engine = None
+        self._session_local = None
+        self._engine_lock = threading.Lock()
+        self._connected = False
         self.is_async = self.config.get("is_async", True)
         self.auto_commit = self.config.get("auto_commit", False)
         self.auto_flush = self.config.get("auto_flush", False)
+        self.replicas = []
+        self.replica_policy = self.config.get("replica_policy", "round_robin")
+        self.read_your_writes = float(self.config.get("read_your_writes", 5))
+        self._replica_next = -1
+        self._write_buffer = None
+        self._write_coordinator = None
+        self._pool_meters: Dict[Any, _PoolMeter] = {}
 
     def connect(self) -> bool:
-        """Establish database engine and session maker."""
+        """
+        English: Validates the config and registers the database; no connection is opened here. The engine (and
+        replica engines) are created on first use and App warms their pools during lifespan startup, so importing
+        app.connections costs no network round trip per worker. Creating a missing MySQL/PostgreSQL database is an
+        explicit step: lila-migrations runs ensure_database(), or config["create_database"] = True runs it once
+        during the App warm-up (lifespan startup) and leaves a marker in app/cache.
+        Español: Valida la config y registra la base de datos; aquí no se abre ninguna conexión. El motor (y los de
+        réplicas) se crean al primer uso y App precalienta sus pools al iniciar el lifespan, así importar
+        app.connections no cuesta un viaje de red por worker. Crear una base MySQL/PostgreSQL inexistente es un paso
+        explícito: lila-migrations ejecuta ensure_database(), o config["create_database"] = True lo ejecuta una vez
+        durante el precalentamiento de App (inicio del lifespan) y deja un marcador en app/cache.
+        """
         if self.type in ["mysql", "postgresql", "psgr"]:
-            user = self.config.get("user", "root")
-            password = self.config.get("password", "")
-            host = self.config.get("host", "127.0.0.1")
-            port = self.config.get("port", 5432 if self.type in ["postgresql", "psgr"] else 3306)
             database = self.config.get("database", "db")
-            db_type = "postgresql" if self.type in ["postgresql", "psgr"] else self.type
-            
-            if self.is_async:
-                connector = "asyncpg" if db_type == "postgresql" else "aiomysql"
-            else:
-                connector = "psycopg" if db_type == "postgresql" else "mysqlconnector"
-                
-            isolation_level = self.config.get("isolation_level", None)
             if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', database):
                 Logger.error(f"Invalid database name: {database}")
                 return False
+        elif self.is_async and self.config.get("write_coordinator", bool(self.config.get("sqlite_profile"))):
+            from lila.core.sqlite import WriteCoordinator
+            self._write_coordinator = WriteCoordinator(self, max_batch=self.config.get("write_batch", 200))
+        self._connected = True
+        if self not in _DATABASES:
+            _DATABASES.append(self)
+        return True
 
-            if self.is_async:
-                async def _check_and_create_db():
-                    temp_url = (
-                        f"{db_type}+{connector}://{user}:{password}@{host}:{port}/postgres"
-                        if db_type == "postgresql"
-                        else f"{db_type}+{connector}://{user}:{password}@{host}:{port}/mysql"
-                    )
-                    temp_engine = create_async_engine(temp_url)
-                    try:
-                        async with temp_engine.connect() as conn:
-                            if db_type == "postgresql":
-                                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
-                                result = await conn.execute(
-                                    text("SELECT 1 FROM pg_database WHERE datname = :dbname"),
-                                    {"dbname": database}
-                                )
-                            else:
-                                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
-                                result = await conn.execute(
-                                    text("SHOW DATABASES LIKE :dbname"),
-                                    {"dbname": database}
-                                )
-                            if not result.fetchone():
-                                await conn.execute(text(f"CREATE DATABASE {database}"))
-                                print(f"Database '{database}' created.")
-                    except Exception as e:
-                        Logger.error(f"FATAL: Database connection failed during startup check: {e}")
-                        import sys
-                        sys.stderr.write(f"\n FATAL ERROR: Database connection failed during startup check:\n{e}\nIs your database running and accessible?\n")
-                        sys.stderr.flush()
-                        import os
-                        os._exit(1)
-                    finally:
-                        await temp_engine.dispose()
+    @property
+    def engine(self):
+        """Primary engine, created on first access after connect()."""
+        if self._engine is None and self._connected:
+            self._create_engines()
+        return self._engine
 
-                try:
-                    import asyncio
-                    try:
-                        loop = asyncio.get_event_loop()
-                    except RuntimeError:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    if loop.is_running():
-                        loop.create_task(_check_and_create_db())
-                    else:
-                        loop.run_until_complete(_check_and_create_db())
-                except Exception as e:
-                    Logger.error(f"Database creation check scheduling failed: {e}")
-                    import sys
-                    sys.stderr.write(f"\n FATAL ERROR: Database creation check scheduling failed:\n{e}\n")
-                    sys.stderr.flush()
-                    import os
-                    os._exit(1)
-            else:
-                temp_engine = create_engine(
-                    f"{db_type}+{connector}://{user}:{password}@{host}:{port}/postgres"
-                    if db_type == "postgresql"
-                    else f"{db_type}+{connector}://{user}:{password}@{host}:{port}/mysql"
-                )
-                with temp_engine.connect() as conn:
-                    if db_type == "postgresql":
-                        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
-                        result = conn.execute(
-                            text("SELECT 1 FROM pg_database WHERE datname = :dbname"),
-                            {"dbname": database}
-                        )
-                    else:
-                        result = conn.execute(
-                            text("SHOW DATABASES LIKE :dbname"),
-                            {"dbname": database}
-                        )
-                    if not result.fetchone():
-                        conn.execute(text(f"CREATE DATABASE {database}"))
-                        print(f"Database '{database}' created.")
-                temp_engine.dispose()
+    @engine.setter
+    def engine(self, engine) -> None:
+        self._engine = engine
 
+    @property
+    def SessionLocal(self):
+        if self._session_local is None and self._connected:
+            self._create_engines()
+        return self._session_local
+
+    @SessionLocal.setter
+    def SessionLocal(self, session_local) -> None:
+        self._session_local = session_local
+
+    def _create_engines(self) -> None:
+        """Builds the primary engine, its session maker and the replica engines (once, thread-safe)."""
+        with self._engine_lock:
+            if self._engine is not None:
+                return
             try:
-                pool_size = self.config.get("pool_size", 20)
-                max_overflow = self.config.get("max_overflow", 40)
-                pool_recycle = self.config.get("pool_recycle", 1800)
-                pool_timeout = self.config.get("pool_timeout", 30)
-                
-                if self.is_async:
-                    self.engine = create_async_engine(
-                        f"{db_type}+{connector}://{user}:{password}@{host}:{port}/{database}",
-                        isolation_level=isolation_level,
-                        pool_size=pool_size,
-                        max_overflow=max_overflow,
-                        pool_recycle=pool_recycle,
-                        pool_timeout=pool_timeout,
-                    )
-                    self.SessionLocal = async_sessionmaker(
-                        autocommit=False, autoflush=self.auto_flush, bind=self.engine, expire_on_commit=False
-                    )
-                else:
-                    self.engine = create_engine(
-                        f"{db_type}+{connector}://{user}:{password}@{host}:{port}/{database}",
-                        isolation_level=isolation_level,
-                        execution_options={"autocommit": self.auto_commit},
-                        pool_size=pool_size,
-                        max_overflow=max_overflow,
-                        pool_recycle=pool_recycle,
-                        pool_timeout=pool_timeout,
-                    )
-                    self.SessionLocal = sessionmaker(
-                        autocommit=False, autoflush=self.auto_flush, bind=self.engine
-                    )
+                engine = self._create_engine(self.config)
+                self._session_local = self._sessionmaker(engine)
+                self._connect_replicas()
+                self._engine = engine
             except ImportError as e:
                 Logger.error(f"Database driver import error: {e}")
                 raise ConnectionError(f"Database driver import error: {e}")
             except SQLAlchemyError as e:
                 Logger.error(f"Database connection error: {e}")
                 raise ConnectionError(f"Database connection error: {e}")
+
+    def _server_url(self) -> str:
+        """URL of the server's maintenance database (postgres / mysql), used to create the configured database."""
+        db_type = "postgresql" if self.type in ["postgresql", "psgr"] else self.type
+        if self.is_async:
+            connector = "asyncpg" if db_type == "postgresql" else "aiomysql"
         else:
-            database = self.config.get("database", "db")
+            connector = "psycopg" if db_type == "postgresql" else "mysqlconnector"
+        return "{}+{}://{}:{}@{}:{}/{}".format(
+            db_type,
+            connector,
+            self.config.get("user", "root"),
+            self.config.get("password", ""),
+            self.config.get("host", "127.0.0.1"),
+            self.config.get("port", 5432 if db_type == "postgresql" else 3306),
+            "postgres" if db_type == "postgresql" else "mysql",
+        )
+
+    def _database_marker(self) -> str:
+        key = f"{self.type}:{self.config.get('host', '127.0.0.1')}:{self.config.get('port', '')}:{self.config.get('database', 'db')}"
+        return os.path.join("app", "cache", f".lila_db_{hashlib.sha1(key.encode()).hexdigest()[:16]}")
+
+    def _write_database_marker(self) -> None:
+        marker = self._database_marker()
+        try:
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(self.config.get("database", "db"))
+        except OSError as e:
+            Logger.warning(f"Could not write database marker {marker}: {e}")
+
+    async def ensure_database_async(self) -> bool:
+        """
+        English: Creates the configured MySQL/PostgreSQL database when it does not exist. Returns True if it was
+        created. SQLite files are created on first connection, so it is a no-op there.
+        Español: Crea la base MySQL/PostgreSQL configurada si no existe. Retorna True si fue creada. Los archivos
+        SQLite se crean en la primera conexión, así que aquí no hace nada.
+        """
+        if self.type not in ["mysql", "postgresql", "psgr"]:
+            return False
+        if not self.is_async:
+            import asyncio
+            return await asyncio.get_running_loop().run_in_executor(None, self.ensure_database)
+        database = self.config.get("database", "db")
+        created = False
+        temp_engine = create_async_engine(self._server_url())
+        try:
+            async with temp_engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                if self.type == "mysql":
+                    result = await conn.execute(text("SHOW DATABASES LIKE :dbname"), {"dbname": database})
+                else:
+                    result = await conn.execute(
+                        text("SELECT 1 FROM pg_database WHERE datname = :dbname"), {"dbname": database}
+                    )
+                if not result.fetchone():
+                    await conn.execute(text(f"CREATE DATABASE {database}"))
+                    print(f"Database '{database}' created.")
+                    created = True
+        finally:
+            await temp_engine.dispose()
+        self._write_database_marker()
+        return created
+
+    def ensure_database(self) -> bool:
+        """
+        Synchronous ensure_database_async(), for CLIs and scripts. Async configs run it in a new event loop, in a
+        worker thread when this thread already runs one; inside async code prefer await ensure_database_async().
+        """
+        if self.type not in ["mysql", "postgresql", "psgr"]:
+            return False
+        if self.is_async:
+            import asyncio
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self.ensure_database_async())
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(asyncio.run, self.ensure_database_async()).result()
+        database = self.config.get("database", "db")
+        created = False
+        temp_engine = create_engine(self._server_url())
+        try:
+            with temp_engine.connect() as conn:
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                if self.type == "mysql":
+                    result = conn.execute(text("SHOW DATABASES LIKE :dbname"), {"dbname": database})
+                else:
+                    result = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :dbname"), {"dbname": database})
+                if not result.fetchone():
+                    conn.execute(text(f"CREATE DATABASE {database}"))
+                    print(f"Database '{database}' created.")
+                    created = True
+        finally:
+            temp_engine.dispose()
+        self._write_database_marker()
+        return created
+
+    async def warm_up_async(self) -> None:
+        """
+        English: Creates the engines and opens config["min_size"] pooled connections (default 1, at most pool_size)
+        to the primary and each replica, so the first requests do not pay the connection setup. With
+        config["create_database"] the missing database is created first (once, see connect). Raises
+        ConnectionError when a server is not reachable.
+        Español: Crea los motores y abre config["min_size"] conexiones del pool (por defecto 1, como máximo
+        pool_size) al principal y a cada réplica, así las primeras peticiones no pagan el establecimiento de la
+        conexión. Con config["create_database"] primero se crea la base si falta (una vez, ver connect). Lanza
+        ConnectionError si un servidor no responde.
+        """
+        import asyncio
+
+        if self.config.get("create_database") and not os.path.exists(self._database_marker()):
+            try:
+                await self.ensure_database_async()
+            except Exception as e:
+                Logger.error(f"Database creation check failed: {e}")
+                raise ConnectionError(f"Database creation check failed: {e}") from e
+
+        for engine in (self.engine, *self.replicas):
+            size = getattr(engine.pool, "size", None)
+            count = max(1, self.config.get("min_size", 1))
+            if callable(size):
+                count = min(count, size())
             try:
                 if self.is_async:
-                    self.engine = create_async_engine(f"sqlite+aiosqlite:///{database}.sqlite")
-                    self.SessionLocal = async_sessionmaker(
-                        autocommit=False, autoflush=False, bind=self.engine, expire_on_commit=False
-                    )
+                    # Opened together so the pool really holds `count` connections, then returned to it.
+                    connections = await asyncio.gather(*(engine.connect().start() for _ in range(count)))
+                    for connection in connections:
+                        await connection.close()
                 else:
-                    self.engine = create_engine(f"sqlite:///{database}.sqlite")
-                    self.SessionLocal = sessionmaker(
-                        autocommit=False, autoflush=False, bind=self.engine
-                    )
-            except SQLAlchemyError as e:
-                Logger.error(f"Create database, error: {e}")
-                raise ConnectionError(f"Create database, error: {e}")
-        return True
+                    def open_connections(engine=engine, count=count):
+                        connections = [engine.connect() for _ in range(count)]
+                        for connection in connections:
+                            connection.close()
+                    await asyncio.get_running_loop().run_in_executor(None, open_connections)
+            except Exception as e:
+                Logger.error(f"Database warm-up failed: {e}")
+                raise ConnectionError(f"Database warm-up failed: {e}") from e
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        English: Pool state of the primary and each replica: size, checked_in, checked_out, overflow, waiting
+        (tasks waiting for a connection right now), checkouts and avg/max wait in milliseconds. Waits are measured
+        where Lila checks out connections (query_async, query, stream_async, sessions and transactions).
+        Español: Estado del pool del principal y de cada réplica: size, checked_in, checked_out, overflow, waiting
+        (tareas esperando una conexión ahora), checkouts y espera promedio/máxima en milisegundos. Las esperas se
+        miden donde Lila toma conexiones (query_async, query, stream_async, sesiones y transacciones).
+        """
+        def engine_stats(engine) -> Dict[str, Any]:
+            pool = engine.pool
+            meter = self._pool_meters.get(engine) or _PoolMeter()
+            stats = {"pool": type(pool).__name__}
+            for name in ("size", "checkedin", "checkedout", "overflow"):
+                method = getattr(pool, name, None)
+                if callable(method):
+                    stats[name.replace("checked", "checked_")] = method()
+            if "overflow" in stats:
+                stats["overflow"] = max(0, stats["overflow"])
+            stats.update(
+                waiting=meter.waiting,
+                checkouts=meter.checkouts,
+                avg_wait_ms=round(meter.total_wait / meter.checkouts * 1000, 3) if meter.checkouts else 0.0,
+                max_wait_ms=round(meter.max_wait * 1000, 3),
+            )
+            return stats
+
+        return {
+            "database": self.config.get("database", "db"),
+            "primary": engine_stats(self.engine),
+            "replicas": [engine_stats(engine) for engine in self.replicas],
+        }
+
+    def _meter(self, engine) -> _PoolMeter:
+        meter = self._pool_meters.get(engine)
+        if meter is None:
+            meter = self._pool_meters[engine] = _PoolMeter()
+        return meter
+
+    def _create_engine(self, config: dict):
+        """Builds the engine for one server config (the primary or a replica)."""
+        if self.type in ["mysql", "postgresql", "psgr"]:
+            db_type = "postgresql" if self.type in ["postgresql", "psgr"] else self.type
+            if self.is_async:
+                connector = "asyncpg" if db_type == "postgresql" else "aiomysql"
+            else:
+                connector = "psycopg" if db_type == "postgresql" else "mysqlconnector"
+            url = "{}+{}://{}:{}@{}:{}/{}".format(
+                db_type,
+                connector,
+                config.get("user", "root"),
+                config.get("password", ""),
+                config.get("host", "127.0.0.1"),
+                config.get("port", 5432 if db_type == "postgresql" else 3306),
+                config.get("database", "db"),
+            )
+            options = dict(
+                isolation_level=config.get("isolation_level", None),
+                pool_size=config.get("pool_size", 20),
+                max_overflow=config.get("max_overflow", 40),
+                pool_recycle=config.get("pool_recycle", 1800),
+                pool_timeout=config.get("pool_timeout", 30),
+                # pool_pre_ping tests each connection on checkout (drops ones the server closed); pool_use_lifo
+                # reuses the most recent connection so idle ones past pool_recycle can be closed.
+                pool_pre_ping=config.get("pool_pre_ping", False),
+                pool_use_lifo=config.get("pool_use_lifo", False),
+            )
+            if self.is_async:
+                engine = create_async_engine(url, **options)
+            else:
+                engine = create_engine(url, execution_options={"autocommit": self.auto_commit}, **options)
+            label = f"{config.get('database', 'db')}@{config.get('host', '127.0.0.1')}"
+        else:
+            from lila.core.sqlite import sqlite_pragmas, apply_pragmas
+
+            database = config.get("database", "db")
+            if self.is_async:
+                engine = create_async_engine(f"sqlite+aiosqlite:///{database}.sqlite")
+            else:
+                engine = create_engine(f"sqlite:///{database}.sqlite")
+            apply_pragmas(engine, sqlite_pragmas(config))
+            label = database
+        if config.get("query_stats", True):
+            # Per-statement timing for /admin/queries and the slow_query log (config["slow_query_ms"], None = off).
+            instrument(engine, label, config.get("slow_query_ms", 500))
+        return engine
+
+    def _sessionmaker(self, engine):
+        if self.is_async:
+            return async_sessionmaker(
+                autocommit=False, autoflush=self.auto_flush, bind=engine, expire_on_commit=False
+            )
+        return sessionmaker(autocommit=False, autoflush=self.auto_flush, bind=engine)
+
+    def _connect_replicas(self) -> None:
+        """
+        English: Builds one engine per entry of config["replicas"]. Each entry is merged over the primary config, so
+        it only lists what differs (host, port, database...).
+        Español: Crea un motor por cada entrada de config["replicas"]. Cada entrada se combina con la config
+        principal, así solo indica lo que cambia (host, port, database...).
+        """
+        global _READ_YOUR_WRITES_WINDOW
+        primary = {k: v for k, v in self.config.items() if k != "replicas"}
+        self.replicas = [self._create_engine({**primary, **replica}) for replica in self.config.get("replicas", [])]
+        if self.replica_policy not in ("round_robin", "least_connections"):
+            raise ValueError("replica_policy must be 'round_robin' or 'least_connections'")
+        if self.replicas:
+            _READ_YOUR_WRITES_WINDOW = max(_READ_YOUR_WRITES_WINDOW, self.read_your_writes)
+
+    def _reads_from_primary(self) -> bool:
+        """True when reads must see the primary: no replicas, inside transaction() or within the read-your-writes window."""
+        if not self.replicas or _IN_TRANSACTION.get():
+            return True
+        routing = _ROUTING.get()
+        return routing is not None and time.monotonic() - routing.last_write < self.read_your_writes
+
+    def read_engine(self):
+        """
+        English: Engine for the next read: the primary when _reads_from_primary(), otherwise a replica picked by
+        replica_policy (round_robin, or least_connections by checked-out pool connections).
+        Español: Motor para la próxima lectura: el principal cuando _reads_from_primary(), si no una réplica elegida
+        por replica_policy (round_robin, o least_connections según conexiones tomadas del pool).
+        """
+        if self._reads_from_primary():
+            return self.engine
+        self._replica_next = (self._replica_next + 1) % len(self.replicas)
+        if self.replica_policy == "least_connections":
+            ordered = self.replicas[self._replica_next:] + self.replicas[:self._replica_next]
+            return min(ordered, key=lambda engine: engine.pool.checkedout())
+        return self.replicas[self._replica_next]
+
+    def _mark_write(self) -> None:
+        """Starts the read-your-writes window of the current request or job."""
+        if self.replicas:
+            routing = _ROUTING.get()
+            if routing is None:
+                routing = _ReadRouting()
+                _ROUTING.set(routing)
+            routing.last_write = time.monotonic()
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncSession:
+        """
+        English: AsyncSession for reads, bound to read_engine(). Nothing is committed; use transaction() to write.
+        Español: AsyncSession para lecturas, ligada a read_engine(). No confirma nada; para escribir use transaction().
+        """
+        engine = self.read_engine()
+        if engine is self.engine:
+            async with self._session() as session:
+                yield session
+            return
+        async with self._connect(engine) as connection:
+            session = self.SessionLocal(bind=connection)
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    @property
+    def write_buffer(self):
+        """
+        English: Write-behind buffer for background=True writes when Redis is not available, created on first use.
+        Tuned with config["write_behind"] = {"flush_ms": 50, "flush_rows": 500, "max_pending": 10000}.
+        Español: Buffer write-behind para escrituras background=True sin Redis, creado al primer uso.
+        Se ajusta con config["write_behind"] = {"flush_ms": 50, "flush_rows": 500, "max_pending": 10000}.
+        """
+        if self._write_buffer is None:
+            from lila.core.write_buffer import WriteBuffer
+            self._write_buffer = WriteBuffer(self, **self.config.get("write_behind", {}))
+        return self._write_buffer
 
     def get_session(self) -> Union[Session, AsyncSession]:
         """Retrieve a session from the session maker."""
@@ -184,23 +633,105 @@ class Database:
             raise Exception("Database not connected. Call connect() first.")
         return self.SessionLocal()
 
+    def scope(self):
+        """
+        English: async with connection.scope(): reuse one connection for every query inside (see connection_scope).
+        Español: async with connection.scope(): reutiliza una conexión para todas las consultas internas.
+        """
+        return connection_scope()
+
+    def _scoped(self, engine=None) -> Optional[_ConnectionScope]:
+        scopes = _SCOPE.get()
+        if scopes is None or _SCOPE_CLOSED in scopes or not self.is_async:
+            return None
+        engine = engine or self.engine
+        scope = scopes.get(engine)
+        if scope is None:
+            scope = scopes[engine] = _ConnectionScope()
+        return scope
+
+    @asynccontextmanager
+    async def _connect(self, engine=None):
+        """Yields the request scope's connection to engine (the primary by default) when it is free, otherwise a new pooled one."""
+        engine = engine or self.engine
+        scope = self._scoped(engine)
+        if scope is None or scope.busy:
+            connection = await self._checkout(engine)
+            try:
+                yield connection
+            finally:
+                await connection.close()
+            return
+        scope.busy = True
+        try:
+            if scope.connection is None:
+                scope.connection = await self._checkout(engine)
+            yield scope.connection
+        finally:
+            try:
+                # Each use ends its own transaction so the next one starts clean on the shared connection.
+                if scope.connection is not None and scope.connection.in_transaction():
+                    await scope.connection.rollback()
+            except Exception:
+                connection, scope.connection = scope.connection, None
+                await connection.invalidate()
+            scope.busy = False
+            if scope.connection is not None and _SCOPE_CLOSED in (_SCOPE.get() or ()):
+                # The scope exited while this use was running (a task spawned inside it): nobody else will release it.
+                connection, scope.connection = scope.connection, None
+                await connection.close()
+
+    async def _checkout(self, engine):
+        """Checks out a pooled connection of engine, recording the wait in its pool meter and query stats."""
+        meter = self._meter(engine)
+        started = meter.begin()
+        try:
+            return await engine.connect().start()
+        finally:
+            meter.end(started)
+
+    @asynccontextmanager
+    async def _session(self):
+        """Yields an AsyncSession bound to the request scope's connection when it is free, otherwise to a new pooled one."""
+        async with self._connect() as connection:
+            session = self.SessionLocal(bind=connection)
+            try:
+                yield session
+            finally:
+                await session.close()
+
     @asynccontextmanager
     async def transaction(self) -> AsyncSession:
         """Context manager to handle an async database session transaction with automatic commit/rollback."""
-        session = self.get_session()
+        lock = None
+        if self._write_coordinator is not None and not _IN_TRANSACTION.get():
+            # One writer per worker on SQLite: wait for the group commits and other transactions of this worker.
+            lock = self._write_coordinator.lock
+            await lock.acquire()
+        token = _IN_TRANSACTION.set(True)
         try:
-            yield session
-            await session.commit()
-        except Exception as e:
-            await session.rollback()
-            raise e
+            async with self._session() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    raise e
+                finally:
+                    written = session.info.pop("lila_written_tables", None)
+                    if written:
+                        await bump_table_versions_async(*written)
         finally:
-            await session.close()
+            if lock is not None:
+                lock.release()
+            _IN_TRANSACTION.reset(token)
+            self._mark_write()
 
     @contextmanager
     def transaction_sync(self) -> Session:
         """Context manager to handle a sync database session transaction with automatic commit/rollback."""
         session = self.get_session()
+        token = _IN_TRANSACTION.set(True)
         try:
             yield session
             session.commit()
@@ -208,7 +739,12 @@ class Database:
             session.rollback()
             raise e
         finally:
+            written = session.info.pop("lila_written_tables", None)
             session.close()
+            if written:
+                bump_table_versions(*written)
+            _IN_TRANSACTION.reset(token)
+            self._mark_write()
 
     def prepare_migrate(self, tables: list) -> None:
         """Prepare tables for migration."""
@@ -250,7 +786,7 @@ class Database:
 
     def query(
         self,
-        query: str,
+        query: Union[str, Executable],
         params: Optional[dict] = None,
         return_rows: bool = False,
         return_row: bool = False,
@@ -268,26 +804,35 @@ class Database:
             return loop.run_until_complete(self._query_async_native(query, params, return_rows, return_row))
 
         result = False
+        statement, keyword = _statement(query)
+        is_write = keyword.startswith(("CREATE", "INSERT", "UPDATE", "DELETE"))
+        engine = self.read_engine() if keyword == "SELECT" else self.engine
         try:
-            with self.engine.connect() as connection:
-                result = connection.execute(text(query), params or ())
-                if (
-                    query.strip()
-                    .upper()
-                    .startswith(("CREATE", "INSERT", "UPDATE", "DELETE"))
-                ):
-                    connection.commit()
+            meter = self._meter(engine)
+            started = meter.begin()
+            try:
+                connection = engine.connect()
+            finally:
+                meter.end(started)
+            with connection:
+                result = connection.execute(statement, params or ())
                 if return_rows:
                     rows = result.fetchall()
+                    if is_write:
+                        connection.commit()
                     items = [dict(getattr(item, "_mapping", {})) for item in rows]
                     return items
                 if return_row:
                     row = result.fetchone()
+                    if is_write:
+                        connection.commit()
                     if row:
                         return dict(getattr(row, "_mapping", {}))
                     return None
-                if self.type in ["postgresql", "psgr"]:
-                    if query.strip().upper().startswith("INSERT"):
+                if is_write:
+                    connection.commit()
+                if self.type in ["postgresql", "psgr"] and isinstance(query, str):
+                    if keyword == "INSERT":
                         if result:
                             result.lastrowid = result.fetchone()[0]
                         return result
@@ -295,62 +840,153 @@ class Database:
         except SQLAlchemyError as e:
             print(f"Query error: {e}")
             Logger.error(f"Query error: {e}")
+        finally:
+            if is_write:
+                self._mark_write()
+                bump_table_versions(*_tables_of(query))
         return result
 
     async def _query_async_native(
         self,
-        query: str,
+        query: Union[str, Executable],
         params: Optional[dict] = None,
         return_rows: bool = False,
         return_row: bool = False,
     ) -> Any:
-        """Execute a raw SQL query asynchronously using the async engine."""
-        async with self.engine.connect() as connection:
-            result = await connection.execute(text(query), params or ())
-            if (
-                query.strip()
-                .upper()
-                .startswith(("CREATE", "INSERT", "UPDATE", "DELETE"))
-            ):
-                await connection.commit()
-            if return_rows:
-                rows = result.fetchall()
-                items = [dict(getattr(item, "_mapping", {})) for item in rows]
-                return items
-            if return_row:
-                row = result.fetchone()
-                if row:
-                    return dict(getattr(row, "_mapping", {}))
-                return None
-            return result
+        """Execute a raw SQL query (string, text() or Core statement) asynchronously using the async engine."""
+        statement, keyword = _statement(query)
+        is_write = keyword.startswith(("CREATE", "INSERT", "UPDATE", "DELETE"))
+        engine = self.read_engine() if keyword == "SELECT" else self.engine
+        try:
+            if is_write and self._write_coordinator is not None and not _IN_TRANSACTION.get():
+                return await self._write_coordinator.execute(statement, params, return_rows, return_row)
+            async with self._connect(engine) as connection:
+                result = await connection.execute(statement, params or ())
+                # Rows (including RETURNING) are read before the commit closes the cursor.
+                if return_rows:
+                    rows = result.fetchall()
+                    if is_write:
+                        await connection.commit()
+                    items = [dict(getattr(item, "_mapping", {})) for item in rows]
+                    return items
+                if return_row:
+                    row = result.fetchone()
+                    if is_write:
+                        await connection.commit()
+                    if row:
+                        return dict(getattr(row, "_mapping", {}))
+                    return None
+                if is_write:
+                    await connection.commit()
+                return result
+        finally:
+            if is_write:
+                self._mark_write()
+                await bump_table_versions_async(*_tables_of(query))
+
+    async def stream_async(
+        self,
+        query: Union[str, Executable],
+        params: Optional[dict] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """
+        English: Async generator of rows (dicts) read through a server-side cursor (stream_results + yield_per), so
+        only batch_size rows are in memory at a time. Works with asyncpg, aiomysql and aiosqlite; sync engines
+        fetch each batch in a thread. It uses its own connection, never the request scope's, and closes it when the
+        generator is exhausted or closed (aclose, break, client disconnect).
+        Español: Generador async de filas (dicts) leídas con un cursor del servidor (stream_results + yield_per), así
+        solo hay batch_size filas en memoria a la vez. Funciona con asyncpg, aiomysql y aiosqlite; los motores sync
+        traen cada lote en un hilo. Usa su propia conexión, nunca la del scope de la petición, y la cierra al
+        terminar o cerrar el generador (aclose, break, desconexión del cliente).
+        """
+        import asyncio
+
+        statement, _ = _statement(query)
+        statement = statement.execution_options(stream_results=True, yield_per=batch_size)
+
+        engine = self.read_engine()
+        if self.is_async:
+            connection = await self._checkout(engine)
+            try:
+                result = await connection.stream(statement, params or {})
+                try:
+                    async for partition in result.mappings().partitions(batch_size):
+                        for row in partition:
+                            yield dict(row)
+                finally:
+                    await result.close()
+            finally:
+                await connection.close()
+            return
+
+        loop = asyncio.get_running_loop()
+        connection = await loop.run_in_executor(None, engine.connect)
+        try:
+            result = await loop.run_in_executor(None, lambda: connection.execute(statement, params or {}))
+            while True:
+                rows = await loop.run_in_executor(None, result.fetchmany, batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row._mapping)
+        finally:
+            await loop.run_in_executor(None, connection.close)
 
     async def query_async(
         self,
-        query: str,
+        query: Union[str, Executable],
         params: Optional[dict] = None,
         return_rows: bool = False,
         return_row: bool = False,
         background: Optional[bool] = None,
+        cache_ttl: Optional[int] = None,
     ) -> Any:
-        """Execute a raw SQL query asynchronously with query deduplication and optional write queueing."""
+        """
+        English: Execute a raw SQL query asynchronously with query deduplication and optional write queueing.
+        With cache_ttl (seconds) and return_rows/return_row, SELECT results are kept in Cache under a hash of the SQL,
+        the params and the versions of the tables it reads. Any write to those tables through Database or
+        BaseModel bumps their version, so a stale result is never served.
+        Español: Ejecuta una consulta SQL async con deduplicación y encolado opcional de escrituras. Con cache_ttl
+        (segundos) y return_rows/return_row, los resultados de SELECT se guardan en Cache con un hash del SQL, los
+        params y las versiones de las tablas que lee. Cualquier escritura a esas tablas vía Database o BaseModel
+        incrementa su versión, así nunca se sirve un resultado viejo.
+        """
         import asyncio
         from lila.core.base_model import _PENDING_QUERIES
         from lila.core.background import BackgroundTask
         import uuid
 
-        is_select = query.strip().upper().startswith("SELECT")
+        is_select = _statement(query)[1] == "SELECT"
 
         if not is_select and background is True:
+            if not isinstance(query, str):
+                # The worker payload is serialized, so prebuilt statements travel as SQL text.
+                query = query.text if isinstance(query, TextClause) else str(query)
             job_id = str(uuid.uuid4())
             task = BackgroundTask(_execute_queued_query, query, params)
             if task._starlette_task is not None:
-                loop = asyncio.get_running_loop()
-                loop.create_task(_execute_queued_query(query, params))
+                # Without Redis the write goes to this worker's write-behind buffer.
+                await self.write_buffer.put_query(query, params)
             return {"success": True, "queued": True, "job_id": job_id}
 
+        if is_select and cache_ttl and (return_rows or return_row):
+            result_key = await self._result_cache_key(query, params, return_rows, return_row)
+            cached = await Cache.get_async(result_key)
+            if cached is not None:
+                return cached
+            result = await self.query_async(query, params, return_rows, return_row)
+            await Cache.set_async(result_key, result, ttl=cache_ttl)
+            return result
+
         if is_select:
             params_tuple = tuple(sorted(params.items())) if params else ()
-            cache_key = f"db_query:{query}:{params_tuple}:{return_rows}:{return_row}"
+            try:
+                hash(params_tuple)
+            except TypeError:
+                # List/dict params (expanding IN, = ANY(:ids), JSON) are keyed by their repr.
+                params_tuple = repr(params_tuple)
+            cache_key = ("db_query", query, params_tuple, return_rows, return_row, self._reads_from_primary())
 
             if cache_key in _PENDING_QUERIES:
                 return await asyncio.shield(_PENDING_QUERIES[cache_key])
@@ -363,7 +999,7 @@ class Database:
                     result = await self._query_async_native(query, params, return_rows, return_row)
                 else:
                     result = await loop.run_in_executor(
-                        None, lambda: self.query(query, params, return_rows, return_row)
+                        None, contextvars.copy_context().run, self.query, query, params, return_rows, return_row
                     )
                 future.set_result(result)
                 return result
@@ -377,9 +1013,28 @@ class Database:
                 return await self._query_async_native(query, params, return_rows, return_row)
             else:
                 loop = asyncio.get_running_loop()
-                return await loop.run_in_executor(
-                    None, lambda: self.query(query, params, return_rows, return_row)
-                )
+                try:
+                    return await loop.run_in_executor(
+                        None, contextvars.copy_context().run, self.query, query, params, return_rows, return_row
+                    )
+                finally:
+                    # The worker thread runs in a copied context, so the write is recorded here as well.
+                    self._mark_write()
+
+    async def _result_cache_key(
+        self, query: Union[str, Executable], params: Optional[dict], return_rows: bool, return_row: bool
+    ) -> str:
+        """Cache key of a SELECT result: hash of the SQL, its params and the current versions of its tables."""
+        if isinstance(query, (str, TextClause)):
+            sql, bound = (query if isinstance(query, str) else query.text), {}
+        else:
+            compiled = query.compile()
+            sql, bound = str(compiled), compiled.params
+        tables = _tables_of(query)
+        track_cache_tags(*tables)
+        versions = await table_versions_async(*tables)
+        payload = (self.type, self.config.get("database"), sql, sorted({**bound, **(params or {})}.items()), return_rows, return_row, tables, versions)
+        return f"query:{hashlib.sha1(pickle.dumps(payload)).hexdigest()}"
 
     def commit(self) -> None:
         """Commit the current synchronous transaction."""
@@ -505,23 +1160,15 @@ class Database:
                 return_one
             )
             if task._starlette_task is not None:
-                # If Redis is unavailable, fallback to native asyncio background execution without blocking
-                loop = asyncio.get_running_loop()
-                loop.create_task(_execute_queued_orm(
-                    model_module,
-                    model_name,
-                    operation,
-                    instance_dict,
-                    filters,
-                    values,
-                    return_one
-                ))
+                # If Redis is unavailable, the write goes to this worker's write-behind buffer
+                await self.write_buffer.put_orm(model, operation, instance_dict, filters, values)
             return {"success": True, "queued": True, "job_id": job_id}
 
-        own_session = False
+        own_session = AsyncExitStack()
         if session is None:
-            session = self.get_session()
-            own_session = True
+            session = await own_session.enter_async_context(
+                self._session() if is_write else self.read_session()
+            )
 
         try:
             if operation == "insert":
@@ -578,8 +1225,10 @@ class Database:
             return 0
 
         finally:
-            if own_session:
-                await session.close()
+            await own_session.aclose()
+            if is_write:
+                self._mark_write()
+                await bump_table_versions_async(model.__tablename__)
 
     def query_orm(
         self,
@@ -710,12 +1359,11 @@ async def _execute_queued_orm(
     from app.connections import connection
     from lila.core.logger import Logger
 
+    model_class = getattr(importlib.import_module(model_module), model_name)
+
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            module = importlib.import_module(model_module)
-            model_class = getattr(module, model_name)
-
             instance = None
             if instance_dict:
                 instance = model_class(**instance_dict)
@@ -729,6 +1377,9 @@ async def _execute_queued_orm(
                 return_one=return_one,
                 background=False
             )
+            if operation in ("insert", "update", "delete"):
+                from lila.core.cache import Cache
+                await Cache.invalidate_tags_async(model_class.__tablename__)
             return
         except Exception as e:
             if attempt == max_retries - 1:
@@ -396,12 +396,18 @@ class FlashMiddleware(BaseHTTPMiddleware):
 
 
 class CacheMiddleware(BaseHTTPMiddleware):
-    """Middleware to implement Read-Through Caching globally for GET requests."""
+    """
+    Middleware to implement Read-Through Caching globally for GET requests. Keys vary on the query and the user
+    by default; responses with Set-Cookie are not stored.
+    """
 
-    def __init__(self, app, default_ttl: int = 300, exclude_paths: list = None):
+    def __init__(self, app, default_ttl: int = 300, exclude_paths: list = None, vary: list = None, tags: list = None):
         super().__init__(app)
+        from lila.core.cache import normalize_vary
         self.default_ttl = default_ttl
         self.exclude_paths = exclude_paths or ["/docs", "/openapi.json", "/static", "/public"]
+        self.vary = normalize_vary(vary if vary is not None else ["query", "user"])
+        self.tags = tags or []
 
     async def dispatch(self, request: Request, call_next):
         if request.method != "GET":
@@ -411,13 +417,16 @@ class CacheMiddleware(BaseHTTPMiddleware):
         if any(path_.startswith(p) for p in self.exclude_paths):
             return await call_next(request)
 
-        from lila.core.cache import Cache
-        query_params = tuple(sorted(request.query_params.items()))
-        cache_key = f"middleware_cache:{path_}:{query_params}"
+        from lila.core.cache import Cache, build_cache_key, collect_cache_tags
+        from lila.core.responses import compute_etag, etag_matches, not_modified_response
+        from starlette.responses import Response
+        cache_key = await build_cache_key(request, prefix="middleware_cache", vary=self.vary)
+        if_none_match = request.headers.get("if-none-match")
 
         cached_data = await Cache.get_async(cache_key)
         if cached_data is not None:
-            from starlette.responses import Response
+            if etag_matches(if_none_match, cached_data.get("etag")):
+                return not_modified_response(cached_data["headers"])
             return Response(
                 content=cached_data["body"],
                 status_code=cached_data["status_code"],
@@ -425,18 +434,173 @@ class CacheMiddleware(BaseHTTPMiddleware):
                 headers=cached_data["headers"]
             )
 
-        response = await call_next(request)
+        with collect_cache_tags() as collected_tags:
+            response = await call_next(request)
 
-        if response.status_code == 200:
-            if hasattr(response, "body") and not hasattr(response, "streaming_content"):
+        # Responses that set cookies (session, CSRF...) belong to one client and are never stored.
+        if response.status_code == 200 and "set-cookie" not in response.headers:
+            body = getattr(response, "body", None)
+            if body is None and "content-length" in response.headers:
+                # call_next always streams; a Content-Length means the endpoint produced a complete body.
+                body = b"".join([chunk async for chunk in response.body_iterator])
+                streamed = response
+                response = Response(content=body, status_code=streamed.status_code)
+                response.raw_headers = list(streamed.raw_headers)
+            if body is not None:
+                etag = response.headers.get("etag")
+                if etag is None:
+                    etag = response.headers["ETag"] = compute_etag(body)
                 cache_payload = {
-                    "body": response.body,
+                    "body": body,
                     "status_code": response.status_code,
                     "media_type": getattr(response, "media_type", "application/json"),
-                    "headers": dict(response.headers)
+                    "headers": {k: v for k, v in response.headers.items() if k != "content-length"},
+                    "etag": etag,
                 }
-                await Cache.set_async(cache_key, cache_payload, self.default_ttl)
+                await Cache.set_async(cache_key, cache_payload, self.default_ttl, tags=collected_tags.union(self.tags))
+                if etag_matches(if_none_match, etag):
+                    return not_modified_response(response.headers)
 
         return response
 
 
+class EdgeCacheMiddleware:
+    """
+    English: Pure ASGI response cache placed in front of the whole middleware stack by App(edge_cache=True).
+    It stores the final, already compressed http.response.start headers and body bytes of routes cached with
+    cache_ttl and, on a hit, writes them straight to send, skipping routing, middlewares and compression.
+    Keys use the Router cache vary rules (learned per path from the route cache stage) plus Accept-Encoding.
+    Español: Caché de respuestas ASGI puro ubicado delante de toda la pila de middlewares por App(edge_cache=True).
+    Guarda los headers finales de http.response.start y el cuerpo ya comprimido de las rutas con cache_ttl y,
+    en un acierto, los escribe directo en send, omitiendo el enrutado, los middlewares y la compresión.
+    Las claves usan las reglas vary de la caché del Router (aprendidas por path) más Accept-Encoding.
+    """
+    MAX_BODY_SIZE = 1024 * 1024
+    MAX_POLICIES = 10000
+
+    def __init__(self, app):
+        self.app = app
+        self.policies: dict[str, tuple] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        from lila.core.cache import Cache, build_cache_key, collect_cache_tags
+
+        # English: Keys are computed on a copy so route state (fixed locale, SEO) never changes them.
+        # Español: Las claves se calculan sobre una copia para que el estado de la ruta (locale, SEO) no las cambie.
+        snapshot = dict(scope)
+        snapshot["state"] = dict(scope.get("state") or {})
+        request = Request(snapshot)
+        if "_flash" in request.cookies:
+            # English: Pending flash messages must reach FlashMiddleware. / Español: Los flash pendientes deben llegar a FlashMiddleware.
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        policy = self.policies.get(path)
+        cache_key = None
+        if policy is not None:
+            cache_key = await build_cache_key(request, prefix="edge", vary=policy[0], cookie_keys=policy[1])
+            entry = await Cache.get_async(cache_key)
+            if entry is not None:
+                await self._replay(entry, request, send)
+                return
+
+        start_message = None
+        chunks = []
+        size = 0
+
+        async def capture_send(message):
+            nonlocal start_message, size
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body" and size <= self.MAX_BODY_SIZE:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            await send(message)
+
+        with collect_cache_tags() as tags:
+            await self.app(scope, receive, capture_send)
+
+        marker = scope.get("lila.edge_cache")
+        if marker is None or start_message is None or start_message["status"] != 200 or size > self.MAX_BODY_SIZE:
+            return
+        headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"x-lila-cache"]
+        if any(k.lower() == b"set-cookie" for k, _ in headers):
+            return
+
+        ttl, vary, cookie_keys = marker
+        learned = (tuple(sorted(set(vary) | {"header:accept-encoding"})), tuple(cookie_keys))
+        if learned != policy:
+            if len(self.policies) >= self.MAX_POLICIES:
+                self.policies.clear()
+            self.policies[path] = learned
+            cache_key = await build_cache_key(request, prefix="edge", vary=learned[0], cookie_keys=learned[1])
+        headers.append((b"x-lila-cache", b"EDGE"))
+        await Cache.set_async(cache_key, {"headers": headers, "body": b"".join(chunks)}, ttl=ttl, tags=tags)
+
+    async def _replay(self, entry: dict, request: Request, send) -> None:
+        from lila.core.responses import etag_matches, not_modified_response
+
+        etag = next((v for k, v in entry["headers"] if k == b"etag"), None)
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag.decode("latin-1")):
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in entry["headers"]}
+            await not_modified_response(headers)(request.scope, request.receive, send)
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": entry["headers"]})
+        await send({"type": "http.response.body", "body": entry["body"]})
+
+
+class DatabaseScopeMiddleware:
+    """
+    English: Pure ASGI middleware added by App(db_scope=True). Each HTTP request runs inside connection_scope(),
+    so every Database and BaseModel call of the request reuses one lazily checked-out connection. The connection
+    goes back to the pool as soon as the last body chunk is sent.
+    Español: Middleware ASGI puro agregado por App(db_scope=True). Cada petición HTTP corre dentro de
+    connection_scope(), así todas las llamadas de Database y BaseModel reutilizan una conexión tomada al primer uso.
+    La conexión vuelve al pool apenas se envía el último fragmento del cuerpo.
+
+    English: With read replicas, a request that writes sets a short-lived cookie, so the same client reads from the
+    primary for read_your_writes seconds afterwards.
+    Español: Con réplicas de lectura, una petición que escribe deja una cookie de corta duración, así el mismo
+    cliente lee del principal durante read_your_writes segundos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        import time
+        from lila.core import database
+        from lila.core.database import connection_scope, release_scope_connections, _ROUTING, READ_YOUR_WRITES_COOKIE
+
+        started = time.monotonic()
+        baseline = float("-inf")
+
+        async def send_and_release(message):
+            if message["type"] == "http.response.start" and database._READ_YOUR_WRITES_WINDOW:
+                routing = _ROUTING.get()
+                if routing is not None and routing.last_write > baseline:
+                    cookie = (
+                        f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={int(database._READ_YOUR_WRITES_WINDOW) or 1}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+                    message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await release_scope_connections()
+
+        async with connection_scope():
+            if database._READ_YOUR_WRITES_WINDOW:
+                for name, value in scope.get("headers", []):
+                    if name == b"cookie" and f"{READ_YOUR_WRITES_COOKIE}=".encode() in value:
+                        _ROUTING.get().last_write = baseline = started
+                        break
+            await self.app(scope, receive, send_and_release)
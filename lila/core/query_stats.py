@@ -0,0 +1,206 @@
+import re
+import threading
+import time
+import datetime
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from lila.core.logger import Logger
+
+# English: Route that issued the current queries; set by the router for each request, None for jobs and startup.
+# Español: Ruta que originó las consultas actuales; la fija el router en cada petición, None en jobs y arranque.
+QUERY_ROUTE: ContextVar[Optional[str]] = ContextVar("lila_query_route", default=None)
+# Seconds the current task waited for its last pooled connection; the next statement takes it and resets it.
+_POOL_WAIT: ContextVar[float] = ContextVar("lila_pool_wait", default=0.0)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\(\?\+\))(?:\s*,\s*\(\?\+\))+")
+_SPACES = re.compile(r"\s+")
+_FINGERPRINTS: Dict[str, str] = {}
+
+
+def fingerprint(sql: str) -> str:
+    """
+    English: Normalized form of a SQL statement: literals and placeholders become ?, IN lists and multi-row VALUES
+    collapse to one entry and whitespace is squeezed, so every call of the same query shares one row of stats.
+    Español: Forma normalizada de una sentencia SQL: literales y placeholders pasan a ?, las listas IN y los VALUES
+    de varias filas se reducen a una entrada y se compactan los espacios, así cada llamada de la misma consulta
+    comparte una fila de estadísticas.
+    """
+    normalized = _FINGERPRINTS.get(sql)
+    if normalized is None:
+        if len(_FINGERPRINTS) >= 1024:
+            _FINGERPRINTS.clear()
+        normalized = _COMMENTS.sub(" ", sql)
+        normalized = _LITERALS.sub("?", normalized)
+        normalized = _LISTS.sub("(?+)", normalized)
+        normalized = _ROWS.sub(r"\1", normalized)
+        normalized = _FINGERPRINTS[sql] = _SPACES.sub(" ", normalized).strip()
+    return normalized
+
+
+def note_pool_wait(seconds: float) -> None:
+    """Records how long the current task waited to check out a connection; charged to its next statement."""
+    _POOL_WAIT.set(seconds)
+
+
+class QueryStats:
+    """
+    English: Bounded in-memory aggregates per (database, SQL fingerprint): calls, total/max duration, rows, time
+    spent waiting for a pooled connection and the routes that issued them. The least recently seen fingerprint is
+    dropped when max_entries is reached. Statements slower than the database's slow_query_ms are written to the
+    slow_query log and kept in a short list of recent slow queries.
+    Español: Agregados en memoria acotados por (base de datos, huella SQL): llamadas, duración total/máxima, filas,
+    tiempo de espera por una conexión del pool y las rutas que las originaron. Al llegar a max_entries se descarta
+    la huella vista hace más tiempo. Las sentencias más lentas que slow_query_ms de la base se escriben en el log
+    slow_query y se guardan en una lista corta de consultas lentas recientes.
+    """
+
+    def __init__(self, max_entries: int = 500, max_routes: int = 10, max_slow: int = 50) -> None:
+        self.max_entries = max_entries
+        self.max_routes = max_routes
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._slow: deque = deque(maxlen=max_slow)
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def record(
+        self,
+        database: str,
+        sql: str,
+        duration: float,
+        rows: Optional[int],
+        pool_wait: float,
+        route: Optional[str],
+        slow_query_ms: Optional[float],
+    ) -> None:
+        """Adds one executed statement (durations in seconds)."""
+        duration_ms = duration * 1000
+        key = (database, fingerprint(sql))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                entry = self._entries[key] = {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "pool_wait_ms": 0.0, "slow": 0, "routes": {},
+                }
+            else:
+                self._entries.move_to_end(key)
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            if duration_ms > entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+            if rows:
+                entry["rows"] += rows
+            entry["pool_wait_ms"] += pool_wait * 1000
+            route = route or "-"
+            routes = entry["routes"]
+            if route in routes or len(routes) < self.max_routes:
+                routes[route] = routes.get(route, 0) + 1
+            else:
+                routes["other"] = routes.get("other", 0) + 1
+            is_slow = slow_query_ms is not None and duration_ms >= slow_query_ms
+            if is_slow:
+                entry["slow"] += 1
+                self._slow.append({
+                    "at": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "database": database,
+                    "duration_ms": round(duration_ms, 3),
+                    "rows": rows,
+                    "route": route,
+                    "sql": sql[:2000],
+                })
+        if is_slow:
+            Logger.log("slow_query", f"{duration_ms:.1f} ms | {database} | route {route} | rows {rows} | {sql[:2000]}")
+
+    def snapshot(self, limit: int = 50, sort: str = "total_ms") -> Dict[str, Any]:
+        """
+        English: JSON-ready view: totals, the top `limit` fingerprints ordered by sort (total_ms, avg_ms, max_ms,
+        calls, rows or pool_wait_ms) and the recent slow queries, newest first.
+        Español: Vista lista para JSON: totales, las `limit` huellas principales ordenadas por sort (total_ms,
+        avg_ms, max_ms, calls, rows o pool_wait_ms) y las consultas lentas recientes, la más nueva primero.
+        """
+        with self._lock:
+            items = [(key, dict(entry, routes=dict(entry["routes"]))) for key, entry in self._entries.items()]
+            slow = list(self._slow)
+        entries = []
+        for (database, sql), entry in items:
+            calls = entry["calls"]
+            entries.append({
+                "database": database,
+                "fingerprint": sql,
+                "calls": calls,
+                "total_ms": round(entry["total_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / calls, 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "rows": entry["rows"],
+                "avg_rows": round(entry["rows"] / calls, 2),
+                "pool_wait_ms": round(entry["pool_wait_ms"], 3),
+                "slow": entry["slow"],
+                "routes": dict(sorted(entry["routes"].items(), key=lambda item: -item[1])),
+            })
+        if entries and sort not in entries[0]:
+            sort = "total_ms"
+        entries.sort(key=lambda entry: entry[sort], reverse=True)
+        return {
+            "since": datetime.datetime.fromtimestamp(self.since).isoformat(timespec="seconds"),
+            "fingerprints": len(entries),
+            "calls": sum(entry["calls"] for entry in entries),
+            "total_ms": round(sum(entry["total_ms"] for entry in entries), 3),
+            "entries": entries[:limit],
+            "slow_queries": slow[::-1],
+        }
+
+    def reset(self) -> None:
+        """Drops every aggregate and slow query."""
+        with self._lock:
+            self._entries.clear()
+            self._slow.clear()
+            self.since = time.time()
+
+
+# Process-wide table fed by every instrumented engine; served by /admin/queries.
+query_stats = QueryStats()
+
+
+def instrument(engine, database: str, slow_query_ms: Optional[float] = 500) -> None:
+    """
+    English: Installs before/after_cursor_execute hooks on engine (sync or async) that feed query_stats with the
+    duration, rows, pool wait and route of every statement. slow_query_ms=None disables the slow query log.
+    Español: Instala hooks before/after_cursor_execute en engine (sync o async) que alimentan query_stats con la
+    duración, filas, espera del pool y ruta de cada sentencia. slow_query_ms=None desactiva el log de lentas.
+    """
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("lila_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("lila_query_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        rows = cursor.rowcount
+        if rows is None or rows < 0:
+            # Async drivers buffer the whole result before returning, so SELECT row counts are known here.
+            buffered = getattr(cursor, "_rows", None)
+            rows = len(buffered) if buffered is not None else None
+        pool_wait = _POOL_WAIT.get()
+        if pool_wait:
+            _POOL_WAIT.set(0.0)
+        query_stats.record(database, statement, duration, rows, pool_wait, QUERY_ROUTE.get(), slow_query_ms)
+
+    @event.listens_for(target, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        if connection is not None:
+            started = connection.info.get("lila_query_started")
+            if started:
+                started.pop()
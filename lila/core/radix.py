@@ -0,0 +1,156 @@
+from starlette.routing import Router as StarletteRouter, Match, BaseRoute, Mount, get_route_path
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.types import Scope, Receive, Send
+from typing import Optional
+
+
+class _RadixNode:
+    """
+    English: One path segment of the radix tree. Holds the indexes of the routes that end or branch here.
+    Español: Un segmento de ruta del árbol radix. Guarda los índices de las rutas que terminan o se ramifican aquí.
+    """
+    __slots__ = ("static", "param", "routes", "catch_all")
+
+    def __init__(self) -> None:
+        self.static: dict[str, "_RadixNode"] = {}
+        self.param: Optional["_RadixNode"] = None
+        self.routes: list[int] = []
+        self.catch_all: list[int] = []
+
+
+class RadixRouter(StarletteRouter):
+    """
+    English: Starlette-compatible router that matches paths through a segment radix tree built once from the
+    registered routes. Lookup cost depends on the path depth instead of the number of routes. Candidates are
+    still confirmed with route.matches() in registration order, so path convertors, 405 handling, Mount,
+    Host, url_path_for and redirect_slashes behave exactly like Starlette.
+    Español: Router compatible con Starlette que resuelve rutas con un árbol radix por segmentos construido una vez
+    a partir de las rutas registradas. El costo depende de la profundidad del path y no de la cantidad de rutas.
+    Los candidatos se confirman con route.matches() en orden de registro, así que convertidores, 405, Mount,
+    Host, url_path_for y redirect_slashes se comportan igual que en Starlette.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._root = _RadixNode()
+        self._fallback: list[int] = []
+        self._indexed_count = -1
+        self.build()
+
+    def build(self) -> None:
+        """
+        English: (Re)builds the radix tree from self.routes. Called automatically when routes are added.
+        Español: (Re)construye el árbol radix desde self.routes. Se llama automáticamente al agregar rutas.
+        """
+        self._root = _RadixNode()
+        self._fallback = []
+        for index, route in enumerate(self.routes):
+            path = getattr(route, "path", None)
+            if path is None or not isinstance(path, str):
+                # English: Host and custom routes are not path based; they are always tried.
+                # Español: Host y rutas personalizadas no se basan en el path; siempre se prueban.
+                self._fallback.append(index)
+                continue
+            self._insert(path, index, is_prefix=isinstance(route, Mount))
+        self._indexed_count = len(self.routes)
+
+    def _insert(self, path: str, index: int, is_prefix: bool) -> None:
+        node = self._root
+        segments = path.split("/")[1:]
+        for segment in segments:
+            if "{" in segment:
+                if ":path}" in segment:
+                    node.catch_all.append(index)
+                    return
+                # English: "{id}", "{id:int}" and mixed segments such as "{name}.txt" share one wildcard child;
+                # route.matches() confirms the convertor afterwards.
+                # Español: "{id}", "{id:int}" y segmentos mixtos como "{name}.txt" comparten un hijo comodín;
+                # route.matches() confirma el convertidor después.
+                if node.param is None:
+                    node.param = _RadixNode()
+                node = node.param
+            else:
+                child = node.static.get(segment)
+                if child is None:
+                    child = node.static[segment] = _RadixNode()
+                node = child
+        if is_prefix:
+            node.catch_all.append(index)
+        else:
+            node.routes.append(index)
+
+    def candidates(self, route_path: str) -> list[int]:
+        """
+        English: Returns the indexes of the routes that may match route_path, in registration order.
+        Español: Retorna los índices de las rutas que pueden coincidir con route_path, en orden de registro.
+        """
+        if self._indexed_count != len(self.routes):
+            self.build()
+
+        segments = route_path.split("/")[1:]
+        total = len(segments)
+        found = list(self._fallback)
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node.catch_all:
+                found.extend(node.catch_all)
+            if depth == total:
+                found.extend(node.routes)
+                continue
+            child = node.static.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+            if node.param is not None:
+                stack.append((node.param, depth + 1))
+
+        if len(found) > 1:
+            found = sorted(set(found))
+        return found
+
+    def _match(self, scope: Scope, route_path: str):
+        partial = None
+        partial_scope = None
+        routes = self.routes
+        for index in self.candidates(route_path):
+            route: BaseRoute = routes[index]
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope
+            if match == Match.PARTIAL and partial is None:
+                partial = route
+                partial_scope = child_scope
+        return partial, partial_scope
+
+    async def app(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] in ("http", "websocket", "lifespan")
+
+        if "router" not in scope:
+            scope["router"] = self
+
+        if scope["type"] == "lifespan":
+            await self.lifespan(scope, receive, send)
+            return
+
+        route_path = get_route_path(scope)
+        route, child_scope = self._match(scope, route_path)
+        if route is not None:
+            scope.update(child_scope)
+            await route.handle(scope, receive, send)
+            return
+
+        if scope["type"] == "http" and self.redirect_slashes and route_path != "/":
+            redirect_scope = dict(scope)
+            if route_path.endswith("/"):
+                redirect_scope["path"] = redirect_scope["path"].rstrip("/")
+            else:
+                redirect_scope["path"] = redirect_scope["path"] + "/"
+
+            redirect_route, _ = self._match(redirect_scope, get_route_path(redirect_scope))
+            if redirect_route is not None:
+                response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+                await response(scope, receive, send)
+                return
+
+        await self.default(scope, receive, send)
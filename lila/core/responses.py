@@ -1,4 +1,5 @@
 import orjson
+import hashlib
 from starlette.responses import (
     Response,
     HTMLResponse as StarletteHTMLResponse,
@@ -9,7 +10,7 @@ from starlette.responses import (
 )
 from decimal import Decimal
 from pydantic import BaseModel
-from typing import Any, Union
+from typing import Any, AsyncIterable, Iterable, Union
 
 class LilaResponseMixin:
     def __init__(self, *args, **kwargs):
@@ -36,6 +37,38 @@ class FileResponse(LilaResponseMixin, StarletteFileResponse):
     pass
 
 
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body: a quoted 128-bit BLAKE2b digest."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True when an If-None-Match header value matches etag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+_NOT_MODIFIED_HEADERS = ("cache-control", "content-location", "date", "etag", "expires", "vary", "x-lila-cache")
+
+
+def not_modified_response(headers) -> Response:
+    """304 Not Modified carrying only the validator and caching headers of the full response."""
+    return Response(
+        status_code=304,
+        headers={k: v for k, v in headers.items() if k.lower() in _NOT_MODIFIED_HEADERS},
+    )
+
+
 def _default_encoder(obj: Any) -> Any:
     if isinstance(obj, BaseModel):
         return obj.model_dump(mode="json")
@@ -99,3 +132,78 @@ class JSONResponse(Response):
             {"success": False, "errors": errors, "msg": msg_errors},
             status_code=400,
         )
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """
+    English: Streams rows from an async (or sync) iterator as one JSON array, or as NDJSON with ndjson=True.
+    Rows are encoded with orjson chunk_size at a time, so memory stays flat whatever the row count.
+    If the client disconnects, the source iterator is closed, which ends the database query behind it.
+    Español: Envía filas de un iterador async (o sync) como un único array JSON, o como NDJSON con ndjson=True.
+    Las filas se codifican con orjson de a chunk_size, así la memoria se mantiene estable sin importar la cantidad.
+    Si el cliente se desconecta se cierra el iterador de origen, lo que termina la consulta a la base de datos.
+    """
+
+    def __init__(
+        self,
+        content: Union[AsyncIterable[Any], Iterable[Any]],
+        ndjson: bool = False,
+        chunk_size: int = 500,
+        status_code: int = 200,
+        headers: dict = None,
+    ) -> None:
+        self.source = content
+        self.ndjson = ndjson
+        self.chunk_size = max(1, chunk_size)
+        super().__init__(
+            self._encode(),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/x-ndjson" if ndjson else "application/json",
+        )
+
+    async def _batches(self):
+        batch = []
+        if hasattr(self.source, "__aiter__"):
+            async for row in self.source:
+                batch.append(row)
+                if len(batch) >= self.chunk_size:
+                    yield batch
+                    batch = []
+        else:
+            for row in self.source:
+                batch.append(row)
+                if len(batch) >= self.chunk_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def _encode(self):
+        batches = self._batches()
+        try:
+            if self.ndjson:
+                async for batch in batches:
+                    yield b"".join(orjson_dumps(row) + b"\n" for row in batch)
+                return
+
+            yield b"["
+            first = True
+            async for batch in batches:
+                # English: One orjson call per chunk; the surrounding brackets are dropped to splice chunks together.
+                # Español: Una llamada a orjson por bloque; se quitan los corchetes para unir los bloques.
+                body = orjson_dumps(batch)[1:-1]
+                yield body if first else b"," + body
+                first = False
+            yield b"]"
+        finally:
+            await batches.aclose()
+            aclose = getattr(self.source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
@@ -1,6 +1,7 @@
 from starlette.routing import Route, Mount, WebSocketRoute
 from starlette.staticfiles import StaticFiles
-from lila.core.responses import HTMLResponse, JSONResponse, RedirectResponse
+from starlette.responses import Response
+from lila.core.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingJSONResponse, orjson_loads, orjson_dumps, compute_etag, etag_matches, not_modified_response
 from lila.core.request import Request
 from app.config import (
     TITLE_PROJECT,
@@ -11,16 +12,22 @@ from app.config import (
 )
 from typing import Any, Type, Optional, List
 from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
 from argon2 import PasswordHasher
 from lila.core.auth import generate_token_value, get_user_id_by_token as get_user_by_token
 from lila.core.translate import Translate
 from lila.core.security import Security
 from lila.core.logger import Logger
-from lila.core.cache import Cache
+from lila.core.cache import Cache, build_cache_key, normalize_vary, track_cache_tags
+from lila.core.controller import get_type_adapter, query_to_dict
+from lila.core.query_stats import QUERY_ROUTE
 
+import base64
+import copy
 import datetime
 import re
 import os
+import time
 from functools import wraps
 from pathlib import Path
 from lila.core.templates import render
@@ -29,8 +36,11 @@ import asyncio
 import importlib.util
 import inspect
 import pydantic
+import sqlalchemy
 
 ph = PasswordHasher()
+# Pydantic error types raised when the body is not valid JSON or not a JSON object at all.
+_INVALID_BODY_ERRORS = frozenset({"json_invalid", "json_type", "model_type", "model_attributes_type", "dict_type"})
 
 class CachedStaticFiles(StaticFiles):
     """
@@ -104,6 +114,7 @@ class Router:
         self.default_cache_ttl = default_cache_ttl
         self.cache_cookie_keys = cache_cookie_keys if cache_cookie_keys is not None else ["session", "auth", "auth_admin"]
         self.middlewares = middlewares if middlewares is not None else []
+        self._openapi_cache = None
         self._load_centralized_seo()
 
     def _load_centralized_seo(self) -> None:
@@ -124,7 +135,27 @@ class Router:
         except Exception:
             pass
 
-    def route(self, path: str, methods: list[str] = None, model: Type[BaseModel] = None, cache_ttl: Optional[int] = None, cache_cookie_keys: Optional[list[str]] = None,cache_max_age: Optional[int] = None) -> None:
+    def route(self, path: str, methods: list[str] = None, model: Type[BaseModel] = None, cache_ttl: Optional[int] = None, cache_cookie_keys: Optional[list[str]] = None,cache_max_age: Optional[int] = None, sanitize: bool = True, stale_ttl: int = 0, early_refresh: float = 0.0, vary: Optional[list[str]] = None, cache_tags: Optional[list[str]] = None, query_model: Type[BaseModel] = None) -> None:
+        """
+        English: Registers a route. sanitize=False skips XSS sanitization of the body and query string, for trusted internal APIs.
+        query_model=Filters validates the query string of GET/DELETE requests (400 on error) and passes it to the
+        parameter annotated with that model, or to request.state.query; without it the query is left untouched.
+        stale_ttl keeps an expired cached response servable while it is refreshed in the background; early_refresh
+        (XFetch beta, e.g. 1.0) refreshes hot cache entries shortly before they expire. The refresh re-runs the
+        handler after the response was sent, so such handlers must not depend on the body, session or cookies set.
+        vary=["lang", "user", "query:page"] limits the cache key to those inputs; the user is the id from the session.
+        cache_tags=["users"] tags the cached entry (tables read through BaseModel are added automatically), so
+        BaseModel and rest_crud_generate writes on that table invalidate it and long TTLs stay safe.
+        Español: Registra una ruta. sanitize=False omite la sanitización XSS del cuerpo y la query, para APIs internas de confianza.
+        query_model=Filters valida la query de las peticiones GET/DELETE (400 si falla) y la pasa al parámetro anotado
+        con ese modelo, o a request.state.query; sin él la query no se toca.
+        stale_ttl mantiene una respuesta vencida disponible mientras se refresca en segundo plano; early_refresh
+        (beta de XFetch, p. ej. 1.0) refresca las entradas más usadas poco antes de vencer. El refresco vuelve a
+        ejecutar el manejador tras enviar la respuesta, así que no debe depender del cuerpo, la sesión ni las cookies.
+        vary=["lang", "user", "query:page"] limita la clave de caché a esas entradas; el usuario es el id de la sesión.
+        cache_tags=["users"] etiqueta la entrada (las tablas leídas con BaseModel se agregan solas), así las escrituras
+        de BaseModel y rest_crud_generate en esa tabla la invalidan y los TTL largos son seguros.
+        """
         if methods is None:
             methods = ["GET"]
         
@@ -141,9 +172,6 @@ class Router:
             for m in reversed(self.middlewares):
                 current_func = m(current_func)
 
-            # Boot-time inspection of route metadata
-            is_async_func = asyncio.iscoroutinefunction(current_func)
-            
             # Inspect signature to auto-detect Pydantic validation parameters
             body_param_name = None
             body_model_class = None
@@ -158,150 +186,51 @@ class Router:
                 pass
 
             target_model = body_model_class or model
-            locales_list = getattr(func, "_locales", None)
-            has_seo = hasattr(func, "_seo")
 
-            if has_seo:
+            if hasattr(func, "_seo"):
                 current_seo = self.seo_data.get(real_path, {})
                 for k, v in func._seo.items():
                     if k not in current_seo or DEBUG:
                         current_seo[k] = v
                 self.seo_data[real_path] = current_seo
 
-            raw_seo_meta = self.seo_data.get(real_path, {})
-
-            @wraps(func)
-            async def validation_wrapper(request: Request):
-                """
-                Pre-compiled validation wrapper for fast route handling.
-                """
-                lang_param = None
-                if request.query_params:
-                    for param_name in ("lang", "changeLang", "change_lang"):
-                        if param_name in request.query_params:
-                            lang_param = request.query_params[param_name]
-                            break
-                
-                if lang_param:
-                    from urllib.parse import urlencode, urlparse, urlunparse, parse_qs
-                    parsed = urlparse(str(request.url))
-                    query_dict = parse_qs(parsed.query)
-                    for k in ("lang", "changeLang", "change_lang"):
-                        query_dict.pop(k, None)
-                    new_query = urlencode(query_dict, doseq=True)
-                    clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, new_query, parsed.fragment))
-                    
-                    response = RedirectResponse(url=clean_url)
-                    await Translate.set_lang(request, response, lang_param)
-                    return response
-
-                matched_lang = None
-                if locales_list:
-                    req_path = request.url.path
-                    for lang in locales_list:
-                        if req_path == f"/{lang}" or req_path.startswith(f"/{lang}/"):
-                            matched_lang = lang
-                            break
-                
-                if matched_lang:
-                    request.state.lang = matched_lang
-
-                current_lang = Translate.lang(request=request)
-                
-                seo_meta = raw_seo_meta
-                if DEBUG and has_seo:
-                    seo_meta = {**seo_meta, **func._seo}
-
-                request.state.seo = self._process_seo_metadata(seo_meta, current_lang, request)
-
-                cache_key = None
-                if ttl > 0 and request.method == "GET" and not DEBUG:
-                    session_cookie = ""
-                    for key in cookie_keys:
-                        val = request.cookies.get(key)
-                        if val:
-                            session_cookie = val
-                            break
-                    auth_header = request.headers.get("Authorization", "")
-                    cache_key = f"route:{request.method}:{request.url.path}:{str(request.query_params)}:{current_lang}:{session_cookie}:{auth_header}"
-                    cached_data = await Cache.get_async(cache_key)
-                    if cached_data:
-                        from starlette.responses import Response
-                        response_headers = dict(cached_data.get("headers", {}))
-                        response_headers["X-Lila-Cache"] = "HIT"
-                        target_max_age = cache_max_age if cache_max_age is not None else ttl
-                        if "Cache-Control" not in response_headers and "cache-control" not in response_headers:
-                            response_headers["Cache-Control"] = f"private, max-age={target_max_age}"
-
-                        return Response(
-                            content=cached_data["body"],
-                            status_code=cached_data["status_code"],
-                            headers=response_headers,
-                            media_type=cached_data["media_type"]
-                        )
-
-                if request.query_params and Security.check_xss(str(request.query_params)):
-                    return JSONResponse({"success": False,"message": "Potential XSS detected in query parameters", "msg": "Potential XSS detected in query parameters"}, status_code=400)
+            seo_meta = dict(self.seo_data.get(real_path, {}))
+
+            # English: Boot-time compilation of the execution plan. Only the stages this route needs are chained.
+            # Español: Compilación del plan de ejecución al arrancar. Solo se encadenan las etapas que la ruta necesita.
+            has_body = bool(target_model) and any(m in ("POST", "PUT", "PATCH") for m in methods)
+            # English: Query strings are only validated on routes that opt in with query_model.
+            # Español: La query solo se valida en las rutas que lo piden con query_model.
+            has_query = query_model is not None and any(m not in ("POST", "PUT", "PATCH") for m in methods)
+            query_param_name = None
+            if has_query and body_model_class is query_model:
+                query_param_name = body_param_name
+            if has_body or has_query:
+                handler = self._compile_validation_stage(
+                    current_func,
+                    body_model=target_model if has_body else None,
+                    query_model=query_model if has_query else None,
+                    param_name=body_param_name,
+                    query_param_name=query_param_name,
+                    sanitize=sanitize,
+                )
+            elif asyncio.iscoroutinefunction(current_func):
+                handler = current_func
+            else:
+                handler = self._as_async(current_func)
 
-                validated_data = None
-                if target_model and request.method in ("POST", "PUT", "PATCH"):
-                    try:
-                        body = await request.json()
-                        sanitized_body = Security.sanitize_data(body)
-                        
-                        if Security.check_xss(str(sanitized_body)):
-                             return JSONResponse({"success": False,"message":"Potential XSS detected in body", "msg": "Potential XSS detected in body"}, status_code=400)
+            if ttl > 0 and not DEBUG and "GET" in methods:
+                handler = self._compile_cache_stage(handler, ttl, cookie_keys, cache_max_age, stale_ttl, early_refresh, vary, cache_tags)
 
-                        validated_data = target_model(**sanitized_body)
-                        request.state.data = validated_data
-                    except ValidationError as e:
-                        return self.response_validation_error(e, current_lang)
-                    except Exception as e:
-                        msg = "Invalid JSON Body" if current_lang == "en" else "JSON inválido"
-                        if DEBUG:
-                            print(f"Routing Error: {e}")
-                        return JSONResponse({"success": False, "message": msg, "msg": msg}, status_code=400)
-                
-                kwargs = {}
-                if body_param_name and validated_data is not None:
-                    kwargs[body_param_name] = validated_data
-
-                if is_async_func:
-                    response = await current_func(request, **kwargs)
-                else:
-                    response = current_func(request, **kwargs)
-
-                if ttl > 0 and request.method == "GET" and not DEBUG and cache_key:
-                        target_max_age = cache_max_age if cache_max_age is not None else ttl
-                        if hasattr(response, "headers"):
-                            response.headers["X-Lila-Cache"] = "MISS"
-                            if "Cache-Control" not in response.headers and "cache-control" not in response.headers:
-                                response.headers["Cache-Control"] = f"private, max-age={target_max_age}"
-
-                        if hasattr(response, "body"):
-                            cache_headers = {
-                                k.decode('utf-8'): v.decode('utf-8') 
-                                for k, v in getattr(response, "raw_headers", []) 
-                                if k.lower() not in (b"content-length", b"x-lila-cache")
-                            }
-                            cache_data = {
-                                "body": response.body,
-                                "status_code": response.status_code,
-                                "headers": cache_headers,
-                                "media_type": getattr(response, "media_type", None)
-                            }
-                            await Cache.set_async(cache_key, cache_data, ttl=ttl)
-                
-                return response
-
-            paths_to_register = [real_path]
+            paths_to_register = [(real_path, None)]
             for lang in getattr(func, "_locales", []):
                 loc_path = f"/{lang}" if real_path == "/" else f"/{lang}/{real_path.lstrip('/')}"
-                paths_to_register.append(self.normalize_path("", loc_path))
+                paths_to_register.append((self.normalize_path("", loc_path), lang))
 
-            for p in paths_to_register:
+            for p, lang in paths_to_register:
+                endpoint = self._compile_entry_stage(func, handler, seo_meta, lang, sanitize, path=p)
                 self.routes.append(
-                    Route(path=p, endpoint=validation_wrapper, methods=methods)
+                    Route(path=p, endpoint=endpoint, methods=methods)
                 )
                 if model is not None:
                     self.docs.append({"path": p, "model": model})
@@ -309,6 +238,236 @@ class Router:
             return func
         return decorator
 
+    @staticmethod
+    def _as_async(func):
+        """
+        English: Wraps a synchronous handler so every compiled stage can await it.
+        Español: Envuelve un manejador síncrono para que todas las etapas compiladas puedan esperarlo.
+        """
+        @wraps(func)
+        async def async_handler(request: Request):
+            return func(request)
+        return async_handler
+
+    def _compile_entry_stage(self, func, handler, seo_meta: dict, fixed_lang: Optional[str], sanitize: bool = True, path: Optional[str] = None):
+        """
+        English: Builds the outermost endpoint: language switch redirect, query XSS guard, locale and SEO resolution.
+        SEO metadata is resolved once per language and reused by every following request. The route path is
+        published in QUERY_ROUTE so the queries it runs are attributed to it.
+        Español: Construye el endpoint exterior: redirección de cambio de idioma, control XSS de query, locale y SEO.
+        Los metadatos SEO se resuelven una vez por idioma y se reutilizan en las siguientes peticiones. La ruta se
+        publica en QUERY_ROUTE para atribuirle las consultas que ejecuta.
+        """
+        resolved_seo = {}
+
+        def seo_for(lang: str, request: Request) -> dict:
+            if DEBUG:
+                return self._process_seo_metadata(seo_meta, lang, request)
+            seo_lang = resolved_seo.get(lang)
+            if seo_lang is None:
+                seo_lang = resolved_seo[lang] = self._process_seo_metadata(seo_meta, lang, request)
+            return dict(seo_lang)
+
+        if seo_meta or fixed_lang:
+            inner = handler
+
+            async def handler(request: Request):
+                if fixed_lang:
+                    request.state.lang = fixed_lang
+                if seo_meta:
+                    request.state.seo = seo_for(Translate.lang(request=request), request)
+                return await inner(request)
+
+        @wraps(func)
+        async def validation_wrapper(request: Request):
+            """
+            Pre-compiled validation wrapper for fast route handling.
+            """
+            QUERY_ROUTE.set(path)
+            query_string = request.scope.get("query_string")
+            if query_string:
+                # English: "ang=" covers lang=, changeLang= and change_lang= without parsing the query.
+                # Español: "ang=" cubre lang=, changeLang= y change_lang= sin parsear la query.
+                if b"ang=" in query_string:
+                    response = await self._lang_switch_response(request)
+                    if response is not None:
+                        return response
+                if sanitize and Security.check_xss(str(request.query_params)):
+                    return JSONResponse({"success": False,"message": "Potential XSS detected in query parameters", "msg": "Potential XSS detected in query parameters"}, status_code=400)
+            return await handler(request)
+
+        return validation_wrapper
+
+    async def _lang_switch_response(self, request: Request):
+        """
+        English: Returns a redirect that persists the requested language and strips the lang params, or None.
+        Español: Retorna una redirección que guarda el idioma pedido y quita los parámetros lang, o None.
+        """
+        lang_param = None
+        for param_name in ("lang", "changeLang", "change_lang"):
+            if param_name in request.query_params:
+                lang_param = request.query_params[param_name]
+                break
+
+        if not lang_param:
+            return None
+
+        from urllib.parse import urlencode, urlparse, urlunparse, parse_qs
+        parsed = urlparse(str(request.url))
+        query_dict = parse_qs(parsed.query)
+        for k in ("lang", "changeLang", "change_lang"):
+            query_dict.pop(k, None)
+        new_query = urlencode(query_dict, doseq=True)
+        clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, new_query, parsed.fragment))
+
+        response = RedirectResponse(url=clean_url)
+        await Translate.set_lang(request, response, lang_param)
+        return response
+
+    def _compile_cache_stage(self, handler, ttl: int, cookie_keys: list[str], cache_max_age: Optional[int], stale_ttl: int = 0, early_refresh: float = 0.0, vary: Optional[list[str]] = None, cache_tags: Optional[list[str]] = None):
+        """
+        English: Wraps a handler with the GET response cache. Concurrent misses of one key run the handler once
+        (per worker and, with Redis, per cluster). Within stale_ttl the expired body is served with X-Lila-Cache: STALE
+        while one background task refreshes it; early_refresh > 0 enables probabilistic refresh before expiry.
+        vary declares what the response depends on (default: lang, user and the whole query); see build_cache_key.
+        Only 200 responses are stored, with a strong ETag; If-None-Match is answered with 304 Not Modified.
+        Español: Envuelve un manejador con la caché de respuestas GET. Los fallos concurrentes de una clave ejecutan el
+        manejador una sola vez (por worker y, con Redis, por clúster). Dentro de stale_ttl se sirve el cuerpo vencido con
+        X-Lila-Cache: STALE mientras una tarea en segundo plano lo refresca; early_refresh > 0 activa el refresco
+        probabilístico antes de vencer.
+        vary declara de qué depende la respuesta (por defecto: idioma, usuario y toda la query); ver build_cache_key.
+        Solo se guardan las respuestas 200, con un ETag fuerte; If-None-Match se responde con 304 Not Modified.
+        """
+        vary_rules = normalize_vary(vary)
+        target_max_age = cache_max_age if cache_max_age is not None else ttl
+
+        async def cache_stage(request: Request):
+            if request.method != "GET":
+                return await handler(request)
+
+            cache_key = await build_cache_key(request, prefix="route", vary=vary_rules, cookie_keys=cookie_keys)
+            if_none_match = request.headers.get("if-none-match")
+            produced = {}
+
+            async def compute():
+                response = await handler(request)
+                produced["response"] = response
+                if hasattr(response, "headers"):
+                    if "Cache-Control" not in response.headers and "cache-control" not in response.headers:
+                        response.headers["Cache-Control"] = f"private, max-age={target_max_age}"
+                # Only 200 bodies are stored: an error (e.g. 401 for a bad token) must not be replayed to others.
+                if not hasattr(response, "body") or response.status_code != 200:
+                    return None
+                etag = response.headers.get("etag")
+                if etag is None:
+                    etag = response.headers["ETag"] = compute_etag(response.body)
+                cache_headers = {
+                    k.decode('utf-8'): v.decode('utf-8') 
+                    for k, v in getattr(response, "raw_headers", []) 
+                    if k.lower() not in (b"content-length", b"x-lila-cache")
+                }
+                return {
+                    "body": response.body,
+                    "status_code": response.status_code,
+                    "headers": cache_headers,
+                    "media_type": getattr(response, "media_type", None),
+                    "etag": etag,
+                    "stored_at": time.time(),
+                }
+
+            cached_data, state = await Cache.fetch_async(cache_key, compute, ttl=ttl, stale_ttl=stale_ttl, early_refresh=early_refresh, tags=cache_tags)
+            response = produced.get("response")
+            # English: Tells App(edge_cache=True) that this response may be replayed at the ASGI layer, and for how long.
+            # Español: Indica a App(edge_cache=True) que esta respuesta puede repetirse en la capa ASGI, y por cuánto tiempo.
+            if state != "STALE" and cached_data is not None and cached_data["status_code"] == 200:
+                remaining = int(ttl - (time.time() - cached_data.get("stored_at", time.time())))
+                if remaining > 0:
+                    request.scope["lila.edge_cache"] = (remaining, vary_rules, cookie_keys)
+            if response is not None:
+                if hasattr(response, "headers"):
+                    response.headers["X-Lila-Cache"] = "MISS"
+                    if etag_matches(if_none_match, response.headers.get("etag")):
+                        return not_modified_response(response.headers)
+                return response
+
+            response_headers = dict(cached_data.get("headers", {}))
+            response_headers["X-Lila-Cache"] = state
+            if "Cache-Control" not in response_headers and "cache-control" not in response_headers:
+                response_headers["Cache-Control"] = f"private, max-age={target_max_age}"
+            # English: Conditional GET is answered from the stored ETag, before the full Response is built.
+            # Español: El GET condicional se responde con el ETag guardado, antes de construir la Response completa.
+            if etag_matches(if_none_match, cached_data.get("etag")):
+                return not_modified_response(response_headers)
+            return Response(
+                content=cached_data["body"],
+                status_code=cached_data["status_code"],
+                headers=response_headers,
+                media_type=cached_data["media_type"]
+            )
+
+        return cache_stage
+
+    def _compile_validation_stage(self, func, body_model: Optional[Type[BaseModel]], query_model: Optional[Type[BaseModel]], param_name: Optional[str], sanitize: bool = True, query_param_name: Optional[str] = None):
+        """
+        English: Wraps a handler with Pydantic validation using TypeAdapters built at registration time.
+        POST/PUT/PATCH bodies are validated from the raw bytes when they provably need no sanitization,
+        otherwise they go through one sanitize/scan walk. Other methods validate the query string into
+        query_param_name, or request.state.query when the handler does not declare it.
+        Español: Envuelve un manejador con validación Pydantic usando TypeAdapters construidos al registrar la ruta.
+        Los cuerpos POST/PUT/PATCH se validan desde los bytes crudos cuando no necesitan sanitización,
+        si no pasan por un único recorrido de sanitización/escaneo. Los demás métodos validan la query en
+        query_param_name, o en request.state.query si el manejador no lo declara.
+        """
+        is_async_func = asyncio.iscoroutinefunction(func)
+        body_adapter = get_type_adapter(body_model) if body_model is not None else None
+        query_adapter = get_type_adapter(query_model) if query_model is not None else None
+
+        def invalid_body(request: Request, e: Exception):
+            msg = "Invalid JSON Body" if Translate.lang(request=request) == "en" else "JSON inválido"
+            if DEBUG:
+                print(f"Routing Error: {e}")
+            return JSONResponse({"success": False, "message": msg, "msg": msg}, status_code=400)
+
+        async def validation_stage(request: Request):
+            kwargs = {}
+            if request.method in ("POST", "PUT", "PATCH"):
+                if body_adapter is not None:
+                    try:
+                        raw = await request.body()
+                        if not sanitize or Security.is_clean_json(raw):
+                            validated_data = body_adapter.validate_json(raw)
+                        else:
+                            body, xss_found = Security.sanitize_and_check(orjson_loads(raw))
+                            if xss_found:
+                                return JSONResponse({"success": False,"message":"Potential XSS detected in body", "msg": "Potential XSS detected in body"}, status_code=400)
+                            validated_data = body_adapter.validate_python(body)
+                        request.state.data = validated_data
+                    except ValidationError as e:
+                        # English: Malformed JSON or a non-object body; model_validator errors are field errors.
+                        # Español: JSON mal formado o un cuerpo que no es objeto; los de model_validator son de campos.
+                        if any(err["type"] in _INVALID_BODY_ERRORS and not err["loc"] for err in e.errors()):
+                            return invalid_body(request, e)
+                        return self.response_validation_error(e, Translate.lang(request=request))
+                    except Exception as e:
+                        return invalid_body(request, e)
+
+                    if param_name:
+                        kwargs[param_name] = validated_data
+            elif query_adapter is not None:
+                try:
+                    query = query_adapter.validate_python(query_to_dict(request))
+                except ValidationError as e:
+                    return self.response_validation_error(e, Translate.lang(request=request))
+                request.state.query = query
+                if query_param_name:
+                    kwargs[query_param_name] = query
+
+            if is_async_func:
+                return await func(request, **kwargs)
+            return func(request, **kwargs)
+
+        return validation_stage
+
     def _process_seo_metadata(self, seo_meta: dict, lang: str, request: Request) -> dict:
         """
         English: Processes SEO metadata resolving translations and language-specific values.
@@ -335,8 +494,14 @@ class Router:
         msg_parts = []
         
         for err in e.errors():
-            field = err["loc"][-1] 
             translated_msg = Translate.translate_pydantic_error(err, language)
+            if not err["loc"]:
+                # English: Model-level errors (e.g. @model_validator) have no field.
+                # Español: Los errores del modelo (p. ej. @model_validator) no tienen campo.
+                errors_list.append({"__root__": translated_msg})
+                msg_parts.append(translated_msg)
+                continue
+            field = err["loc"][-1] 
             
             errors_list.append({str(field): translated_msg})
             msg_parts.append(f"{field}: {translated_msg}")
@@ -442,140 +607,169 @@ class Router:
     def openapi_json(
         self, path: str = "/openapi.json", methods: list[str] | None = None
     ) -> None:
+        """
+        English: Serves the OpenAPI document. It is built once per process, kept as orjson bytes with a strong ETag,
+        and rebuilt only if routes or docs are added afterwards. If-None-Match is answered with 304.
+        Español: Sirve el documento OpenAPI. Se construye una vez por proceso, se guarda como bytes de orjson con un
+        ETag fuerte y solo se reconstruye si luego se agregan rutas o docs. If-None-Match se responde con 304.
+        """
         if methods is None:
             methods = ["GET"]
 
         async def openapi_schema(request: Request):
-            # English: Cache handling for openapi schema.
-            # Español: Manejo de caché para el esquema openapi.
-            if not DEBUG:
-                cached_openapi = await Cache.get_async("openapi_schema_json")
-                if cached_openapi:
-                    return JSONResponse(cached_openapi)
-
-            openapi_schema_data = {
-                "openapi": "3.0.0",
-                "info": {
-                    "title": TITLE_PROJECT,
-                    "version": VERSION_PROJECT,
-                    "description": DESCRIPTION_PROJECT,
-                },
-                "paths": {},
-                "components": {"schemas": {}},
-            }
+            body, etag = self.openapi_bytes()
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified_response({"ETag": etag})
+            return Response(content=body, media_type="application/json", headers={"ETag": etag, "Powered-By": "Lila Framework"})
 
-            EXCLUDED = {"/docs", "/openapi.json"}
+        self.routes.append(Route(path=path, endpoint=openapi_schema, methods=methods))
 
-            for route in self.routes:
-                if not isinstance(route, Route):
-                    continue
+    def openapi_bytes(self) -> tuple[bytes, str]:
+        """
+        English: Returns the serialized OpenAPI document and its ETag, building it on first use.
+        Español: Retorna el documento OpenAPI serializado y su ETag, construyéndolo en el primer uso.
+        """
+        version = (len(self.routes), len(self.docs))
+        cached = self._openapi_cache
+        if cached is None or cached[0] != version:
+            body = orjson_dumps(self.build_openapi())
+            cached = self._openapi_cache = (version, body, compute_etag(body))
+        return cached[1], cached[2]
+
+    def _register_openapi_model(self, model, components: dict) -> Optional[dict]:
+        """
+        English: Adds a model (and its nested $defs) to components once and returns its schema.
+        Español: Agrega un modelo (y sus $defs anidados) a components una sola vez y retorna su esquema.
+        """
+        name = model.__name__
+        if name in components:
+            return components[name]
+        try:
+            if hasattr(model, "model_json_schema"):
+                model_schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            elif hasattr(model, "schema"):
+                model_schema = model.schema()
+            else:
+                return None
+        except Exception:
+            return None
+        for def_name, def_schema in model_schema.pop("$defs", {}).items():
+            components.setdefault(def_name, def_schema)
+        components[name] = model_schema
+        return model_schema
 
-                route_path = route.path
-                if route_path in EXCLUDED:
-                    continue
+    def build_openapi(self) -> dict:
+        """
+        English: Builds the OpenAPI 3 document for the routes of this router.
+        Español: Construye el documento OpenAPI 3 para las rutas de este router.
+        """
+        openapi_schema_data = {
+            "openapi": "3.0.0",
+            "info": {
+                "title": TITLE_PROJECT,
+                "version": VERSION_PROJECT,
+                "description": DESCRIPTION_PROJECT,
+            },
+            "paths": {},
+            "components": {"schemas": {}},
+        }
+        components = openapi_schema_data["components"]["schemas"]
 
-                model = None
-                for doc in self.docs:
-                    doc_path = doc.get("path")
-                    if not doc_path:
-                        continue
-                    route_base = re.sub(r"/\{[^/]+\}", "", route_path)
-                    if doc_path.rstrip("/") == route_base.rstrip("/"):
-                        model = doc.get("model")
-                        break
+        EXCLUDED = {"/docs", "/openapi.json"}
 
-                model_schema = None
-                if model and hasattr(model, "schema"):
-                    try:
-                        model_schema = model.schema()
-                        if (
-                            model.__name__
-                            not in openapi_schema_data["components"]["schemas"]
-                        ):
-                            openapi_schema_data["components"]["schemas"][
-                                model.__name__
-                            ] = model_schema
-                    except Exception:
-                        model_schema = None
-
-                methods_list = route.methods or ["GET"]
-                for method in methods_list:
-                    m = method.lower()
-                    if m == "head":
-                        continue
-
-                    openapi_schema_data["paths"].setdefault(route_path, {})
-
-                    path_param_names = self.get_path_params(route_path)
-                    path_parameters = []
-                    for pname in path_param_names:
-                        inferred_schema = {"type": "string"}
-                        if model_schema:
-                            props = model_schema.get("properties", {})
-                            if pname in props:
-                                prop = props[pname]
-                                inferred_schema = {}
-                                if "$ref" in prop:
-                                    inferred_schema["$ref"] = prop["$ref"]
-                                else:
-                                    if "type" in prop:
-                                        inferred_schema["type"] = prop["type"]
-                                    if "format" in prop:
-                                        inferred_schema["format"] = prop["format"]
-                        path_parameters.append(
-                            {
-                                "name": pname,
-                                "in": "path",
-                                "required": True,
-                                "schema": inferred_schema,
-                            }
-                        )
-
-                    op = {
-                        "summary": route.name
-                        or getattr(route.endpoint, "__name__", ""),
-                        "parameters": path_parameters,
-                        "responses": {
-                            "200": {
-                                "description": route.endpoint.__doc__
-                                or f"{route.name} function",
-                                "content": {},
-                            }
-                        },
-                    }
+        # English: One pass over self.docs; the first doc registered for a base path wins, as before.
+        # Español: Una sola pasada sobre self.docs; gana el primer doc registrado para un path base, como antes.
+        docs_by_path = {}
+        for doc in self.docs:
+            doc_path = doc.get("path")
+            if doc_path:
+                docs_by_path.setdefault(doc_path.rstrip("/"), doc.get("model"))
+
+        for route in self.routes:
+            if not isinstance(route, Route):
+                continue
+
+            route_path = route.path
+            if route_path in EXCLUDED:
+                continue
+
+            route_base = re.sub(r"/\{[^/]+\}", "", route_path)
+            model = docs_by_path.get(route_base.rstrip("/"))
+            model_schema = self._register_openapi_model(model, components) if model else None
+
+            methods_list = route.methods or ["GET"]
+            for method in methods_list:
+                m = method.lower()
+                if m == "head":
+                    continue
+
+                openapi_schema_data["paths"].setdefault(route_path, {})
 
-                    if model_schema and m in ["post", "put", "patch"]:
-                        props = dict(model_schema.get("properties", {}))
-                        required = list(model_schema.get("required", []))
-                        for p in path_param_names:
-                            props.pop(p, None)
-                            if p in required:
-                                required.remove(p)
-                        request_schema = {"type": "object", "properties": props}
-                        if required:
-                            request_schema["required"] = required
-                        op["requestBody"] = {
+                path_param_names = self.get_path_params(route_path)
+                path_parameters = []
+                for pname in path_param_names:
+                    inferred_schema = {"type": "string"}
+                    if model_schema:
+                        props = model_schema.get("properties", {})
+                        if pname in props:
+                            prop = props[pname]
+                            inferred_schema = {}
+                            if "$ref" in prop:
+                                inferred_schema["$ref"] = prop["$ref"]
+                            else:
+                                if "type" in prop:
+                                    inferred_schema["type"] = prop["type"]
+                                if "format" in prop:
+                                    inferred_schema["format"] = prop["format"]
+                    path_parameters.append(
+                        {
+                            "name": pname,
+                            "in": "path",
                             "required": True,
-                            "content": {"application/json": {"schema": request_schema}},
+                            "schema": inferred_schema,
+                        }
+                    )
+
+                op = {
+                    "summary": route.name
+                    or getattr(route.endpoint, "__name__", ""),
+                    "parameters": path_parameters + list(getattr(route.endpoint, "openapi_parameters", [])),
+                    "responses": {
+                        "200": {
+                            "description": route.endpoint.__doc__
+                            or f"{route.name} function",
+                            "content": {},
                         }
+                    },
+                }
+
+                if model_schema and m in ["post", "put", "patch"]:
+                    props = dict(model_schema.get("properties", {}))
+                    required = list(model_schema.get("required", []))
+                    for p in path_param_names:
+                        props.pop(p, None)
+                        if p in required:
+                            required.remove(p)
+                    request_schema = {"type": "object", "properties": props}
+                    if required:
+                        request_schema["required"] = required
+                    op["requestBody"] = {
+                        "required": True,
+                        "content": {"application/json": {"schema": request_schema}},
+                    }
 
-                    if model_schema:
-                        op["responses"]["200"]["content"] = {
-                            "application/json": {
-                                "schema": {
-                                    "$ref": f"#/components/schemas/{model.__name__}"
-                                }
+                if model_schema:
+                    op["responses"]["200"]["content"] = {
+                        "application/json": {
+                            "schema": {
+                                "$ref": f"#/components/schemas/{model.__name__}"
                             }
                         }
+                    }
 
-                    openapi_schema_data["paths"][route_path][m] = op
-
-            if not DEBUG:
-                await Cache.set_async("openapi_schema_json", openapi_schema_data, ttl=3600)
-
-            return JSONResponse(openapi_schema_data)
+                openapi_schema_data["paths"][route_path][m] = op
 
-        self.routes.append(Route(path=path, endpoint=openapi_schema, methods=methods))
+        return openapi_schema_data
 
     def get_path_params(self, path: str):
         return re.findall(r"{(\w+)(?::\w+)?}", path)
@@ -632,9 +826,106 @@ class Router:
         generate_html: bool = True,
         rewrite_tempalte : bool = False,
         url_html : str = None,
+        paginate: bool = False,
+        page_size: int = 50,
+        max_page_size: int = 500,
+        cursor_field: str = "id",
+        sort_fields: Optional[List[str]] = None,
+        filter_fields: Optional[List[str]] = None,
+        bulk: bool = False,
+        bulk_max_items: int = 1000,
+        bulk_chunk_size: int = 500,
+        streaming: bool = False,
     ) -> None:
+        """
+        English: Generates GET/POST/PUT/DELETE routes (and optionally an HTML page) for model_sql.
+        With paginate=True the list endpoint reads one page at a time using keyset pagination and accepts
+        ?limit= (capped at max_page_size), ?cursor=, ?sort=field|-field (sort_fields + cursor_field),
+        ?filter[field]=value (filter_fields only) and ?fields=a,b (subset of select). It answers
+        {"data": [...], "next_cursor": str | None}, using jsonresponse_prefix as the key when set.
+        Sort on indexed, non-null columns. Pagination is opt-in: the default paginate=False returns every row as
+        before (a plain list, or {jsonresponse_prefix: [...]}).
+        With bulk=True it also adds POST, PATCH and DELETE on {name}/bulk: up to bulk_max_items rows validated
+        in one pass and written in chunks of bulk_chunk_size inside a single transaction. Bulk POST returns the
+        new ids only on databases with executemany RETURNING (PostgreSQL, SQLite), not on MySQL or MariaDB.
+        With streaming=True, ?stream=json|ndjson streams every matching row from a server-side cursor.
+        Español: Genera rutas GET/POST/PUT/DELETE (y opcionalmente una página HTML) para model_sql.
+        Con paginate=True el listado lee una página por vez con paginación keyset y acepta
+        ?limit= (tope max_page_size), ?cursor=, ?sort=campo|-campo (sort_fields + cursor_field),
+        ?filter[campo]=valor (solo filter_fields) y ?fields=a,b (subconjunto de select). Responde
+        {"data": [...], "next_cursor": str | None}, usando jsonresponse_prefix como clave si se define.
+        Ordenar por columnas indexadas y no nulas. La paginación es opcional: por defecto paginate=False retorna
+        todas las filas como antes (una lista, o {jsonresponse_prefix: [...]}).
+        Con bulk=True agrega además POST, PATCH y DELETE en {name}/bulk: hasta bulk_max_items filas validadas
+        en una pasada y escritas en bloques de bulk_chunk_size dentro de una sola transacción. El POST bulk retorna
+        los ids nuevos solo en bases con RETURNING en executemany (PostgreSQL, SQLite), no en MySQL ni MariaDB.
+        Con streaming=True, ?stream=json|ndjson envía todas las filas que coinciden desde un cursor del servidor.
+        """
         name = base_path or f"/{model_sql.__tablename__}"
         crud_routes = []
+        table = model_sql.__tablename__
+        table_columns = set(model_sql.__table__.columns.keys())
+        listable = [c for c in (select or model_sql.__table__.columns.keys()) if c in table_columns]
+        sortable = {cursor_field, *(sort_fields or [])} & table_columns
+        filterable = set(filter_fields or []) & table_columns
+
+        # English: Every statement is built once here (or once per query shape below); handlers only bind parameters,
+        # so SQLAlchemy reuses its compiled-statement cache instead of parsing SQL on each request.
+        # Español: Cada sentencia se arma una sola vez aquí (o una vez por forma de consulta); los handlers solo
+        # enlazan parámetros, así SQLAlchemy reutiliza su caché de compilación en vez de parsear SQL en cada petición.
+        sql_table = model_sql.__table__
+        columns_sql = " , ".join(select) if select else "*"
+        active_sql = "active = 1" if active else ""
+        user_sql = f"{user_id_session} = :{user_id_session}" if user_id_session else ""
+        owner_sql = ""
+        if "user_id" in model_pydantic.model_fields.keys():
+            owner_sql = "user_id = :user_id"
+        elif "id_user" in model_pydantic.model_fields.keys():
+            owner_sql = "id_user = :id_user"
+
+        def where_sql(*conditions) -> str:
+            conditions = [c for c in conditions if c]
+            return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        delete_sql = (
+            f"UPDATE {table} SET active=0 WHERE id= :id" if delete_logic else f"DELETE FROM {table} WHERE id=:id"
+        )
+        statements = {
+            "list_all": sqlalchemy.text(f"SELECT {columns_sql} FROM {table}{where_sql(active_sql)}"),
+            "list_all_user": sqlalchemy.text(f"SELECT {columns_sql} FROM {table}{where_sql(active_sql, user_sql)}"),
+            "get_id": sqlalchemy.text(f"SELECT {columns_sql} FROM {table}{where_sql(active_sql, 'id = :id', owner_sql)}"),
+            "get_id_user": sqlalchemy.text(
+                f"SELECT {columns_sql} FROM {table}{where_sql(active_sql, 'id = :id', owner_sql, user_sql)}"
+            ),
+            "delete": sqlalchemy.text(delete_sql),
+            "delete_user": sqlalchemy.text(f"{delete_sql} AND {user_sql}") if user_id_session else None,
+        }
+        if "id" in table_columns:
+            id_column = sql_table.c.id
+            # English: Core UPDATE takes its SET columns from the parameter keys; WHERE binds use a w_ prefix.
+            # Español: El UPDATE de Core toma las columnas SET de las claves de parámetros; el WHERE usa prefijo w_.
+            statements["update"] = sqlalchemy.update(sql_table).where(id_column == sqlalchemy.bindparam("w_id"))
+            if user_id_session and user_id_session in table_columns:
+                statements["update_user"] = statements["update"].where(
+                    sql_table.c[user_id_session] == sqlalchemy.bindparam("w_user")
+                )
+            statements["insert"] = sqlalchemy.insert(sql_table)
+            if connection.engine.dialect.insert_returning:
+                statements["insert"] = statements["insert"].returning(id_column)
+
+        statement_cache = {}
+
+        def cached_statement(shape: tuple, build):
+            """
+            English: Returns the statement built for this query shape, building it on first use (bounded).
+            Español: Retorna la sentencia armada para esta forma de consulta, construyéndola al primer uso (acotado).
+            """
+            statement = statement_cache.get(shape)
+            if statement is None:
+                statement = build()
+                if len(statement_cache) < 256:
+                    statement_cache[shape] = statement
+            return statement
 
         def middleware(func):
             @wraps(func)
@@ -663,26 +954,159 @@ class Router:
                 return id_token
             return id_token
 
+        def list_error(message: str) -> JSONResponse:
+            return JSONResponse({"success": False, "message": message, "msg": message}, status_code=400)
+
+        def encode_cursor(row: dict, sort_field: str) -> str:
+            raw = orjson_dumps([row.get(sort_field), row.get(cursor_field)])
+            return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+        def decode_cursor(cursor: str) -> list:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            value = orjson_loads(raw)
+            if not isinstance(value, list) or len(value) != 2:
+                raise ValueError("invalid cursor")
+            return value
+
+        def list_query(self, unbounded: bool = False) -> tuple | JSONResponse:
+            """
+            English: Translates the list query string into (statement, params, sort_field, extra_columns, limit).
+            Every identifier comes from a whitelist; values are always bound parameters.
+            unbounded=True drops the LIMIT, for streaming.
+            Español: Traduce el query string del listado a (sentencia, params, sort_field, extra_columns, limit).
+            Todo identificador sale de una lista blanca; los valores siempre son parámetros.
+            unbounded=True quita el LIMIT, para streaming.
+            """
+            query_params = self.query_params
+            params = {}
+
+            try:
+                limit = int(query_params.get("limit", page_size))
+            except ValueError:
+                return list_error("limit must be an integer")
+            limit = max(1, min(limit, max_page_size))
+
+            fields = listable
+            if query_params.get("fields"):
+                fields = [f.strip() for f in query_params["fields"].split(",") if f.strip()]
+                unknown = [f for f in fields if f not in listable]
+                if unknown or not fields:
+                    return list_error(f"Unknown fields: {', '.join(unknown)}")
+
+            sort = query_params.get("sort", cursor_field)
+            descending = sort.startswith("-")
+            sort_field = sort.lstrip("-")
+            if sort_field not in sortable:
+                return list_error(f"Sorting by '{sort_field}' is not allowed")
+
+            filters = []
+            for key, value in query_params.multi_items():
+                if not key.startswith("filter["):
+                    continue
+                field = key[7:-1] if key.endswith("]") else ""
+                if field not in filterable:
+                    return list_error(f"Filtering by '{field}' is not allowed")
+                params[f"f{len(filters)}"] = value
+                filters.append(field)
+
+            user_filter = False
+            if user_id_session:
+                user_id = get_user_id_session(self)
+                if isinstance(user_id, JSONResponse):
+                    return user_id
+                params[user_id_session] = user_id
+                user_filter = True
+
+            has_cursor = bool(query_params.get("cursor"))
+            if has_cursor:
+                try:
+                    last_value, last_id = decode_cursor(query_params["cursor"])
+                except Exception:
+                    return list_error("Invalid cursor")
+                if sort_field != cursor_field:
+                    params["c_value"] = last_value
+                params["c_id"] = last_id
+
+            # English: The cursor columns are always read so next_cursor can be built, then dropped if not requested.
+            # Español: Las columnas del cursor siempre se leen para armar next_cursor y se quitan si no se pidieron.
+            extra_columns = [c for c in dict.fromkeys((sort_field, cursor_field)) if c not in fields]
+            if not unbounded:
+                params["limit"] = limit + 1
+
+            def build():
+                conditions = ["active = 1"] if active else []
+                conditions += [f"{field} = :f{i}" for i, field in enumerate(filters)]
+                if user_filter:
+                    conditions.append(f"{user_id_session} = :{user_id_session}")
+                op = "<" if descending else ">"
+                if has_cursor and sort_field == cursor_field:
+                    conditions.append(f"{cursor_field} {op} :c_id")
+                elif has_cursor:
+                    conditions.append(
+                        f"({sort_field} {op} :c_value OR ({sort_field} = :c_value AND {cursor_field} {op} :c_id))"
+                    )
+                direction = "DESC" if descending else "ASC"
+                order = f"{cursor_field} {direction}"
+                if sort_field != cursor_field:
+                    order = f"{sort_field} {direction}, {order}"
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                sql = f"SELECT {' , '.join([*fields, *extra_columns])} FROM {table} {where} ORDER BY {order}"
+                return sqlalchemy.text(sql if unbounded else sql + " LIMIT :limit")
+
+            shape = ("list", tuple(fields), sort_field, descending, tuple(filters), user_filter, has_cursor, unbounded)
+            return cached_statement(shape, build), params, sort_field, extra_columns, limit
+
+        async def stream_rows(query, params: dict, extra_columns: list):
+            async for row in connection.stream_async(query, params):
+                yield {k: v for k, v in row.items() if k not in extra_columns} if extra_columns else row
+
         async def get(self):
             try:
                 response = await execute_middleware(self, type="get")
                 if isinstance(response, JSONResponse):
                     return response
 
-                columns = " , ".join(select) if select else "*"
-                filters = f"WHERE active = 1" if active else ""
-                params = {"user_id": 0}
+                stream_format = self.query_params.get("stream") if streaming else None
+                if stream_format:
+                    if stream_format not in ("json", "ndjson"):
+                        return list_error("stream must be 'json' or 'ndjson'")
+                    compiled = list_query(self, unbounded=True)
+                    if isinstance(compiled, JSONResponse):
+                        return compiled
+                    query, params, _, extra_columns, _ = compiled
+                    track_cache_tags(table)
+                    return StreamingJSONResponse(
+                        stream_rows(query, params, extra_columns), ndjson=stream_format == "ndjson"
+                    )
+
+                if paginate:
+                    compiled = list_query(self)
+                    if isinstance(compiled, JSONResponse):
+                        return compiled
+                    query, params, sort_field, extra_columns, limit = compiled
+                    track_cache_tags(table)
+                    items = await connection.query_async(query=query, params=params, return_rows=True) or []
+                    next_cursor = None
+                    if len(items) > limit:
+                        items = items[:limit]
+                        next_cursor = encode_cursor(items[-1], sort_field)
+                    if extra_columns:
+                        items = [
+                            {k: v for k, v in item.items() if k not in extra_columns} for item in items
+                        ]
+                    return JSONResponse({jsonresponse_prefix or "data": items, "next_cursor": next_cursor})
+
+                query = statements["list_all"]
+                params = None
                 if user_id_session:
 
                     user_id = get_user_id_session(self)
                     if isinstance(user_id, JSONResponse):
                         return user_id
-                    params[user_id_session] = user_id
-                    filters += f" AND {user_id_session}= :{user_id_session}"
-                else:
-                    params = None
+                    params = {user_id_session: user_id}
+                    query = statements["list_all_user"]
 
-                query = f"SELECT {columns} FROM {model_sql.__tablename__} {filters}"
+                track_cache_tags(model_sql.__tablename__)
                 items = await connection.query_async(query=query, params=params, return_rows=True)
                 return (
                     JSONResponse(items)
@@ -692,34 +1116,29 @@ class Router:
             except Exception as e:
                 Logger.error(f"Error rest crud , GET: {str(e)}")
 
-        async def post(self):
-            response = await execute_middleware(self, type="post")
-            if isinstance(response, JSONResponse):
-                return response
-            try:
-                body = await self.json()
-                model = model_pydantic(**body)
-            except ValidationError as e:
-                return self.response_validation_error(e)
-            except Exception as e:
-                Logger.warning(f"Error rest_crud_generate - POST: {str(e)}")
-                return JSONResponse(
-                    {"success": False, "message": "Error general", "msg": "Error general"}, status_code=500
-                )
-            columns_ = (
-                " , ".join(columns)
-                if columns
-                else " , ".join(
-                    (row) for row in list(model_pydantic.model_fields.keys())
-                )
-            )
-            values = (
-                " , ".join(f":{row}" for row in columns)
-                if columns
-                else " , ".join(
-                    f":{row}" for row in list(model_pydantic.model_fields.keys())
+        if paginate:
+            get.openapi_parameters = [
+                {"name": "limit", "in": "query", "required": False,
+                 "schema": {"type": "integer", "default": page_size, "maximum": max_page_size}},
+                {"name": "cursor", "in": "query", "required": False, "schema": {"type": "string"}},
+                {"name": "sort", "in": "query", "required": False,
+                 "schema": {"type": "string", "enum": sorted(sortable | {f"-{f}" for f in sortable})}},
+                {"name": "fields", "in": "query", "required": False, "schema": {"type": "string"}},
+            ] + [
+                {"name": f"filter[{field}]", "in": "query", "required": False, "schema": {"type": "string"}}
+                for field in sorted(filterable)
+            ]
+            if streaming:
+                get.openapi_parameters.append(
+                    {"name": "stream", "in": "query", "required": False,
+                     "schema": {"type": "string", "enum": ["json", "ndjson"]}}
                 )
-            )
+
+        def prepare_insert(self, model, body: dict) -> dict | JSONResponse:
+            """
+            English: Builds the column values for one POST row (tokens, password hash, dates, session user, active).
+            Español: Arma los valores de columnas de una fila de POST (tokens, hash de password, fechas, usuario, active).
+            """
             params = {
                 field: getattr(model, field)
                 for field in model_pydantic.model_fields.keys()
@@ -739,15 +1158,11 @@ class Router:
                 params["created_at"] = datetime.datetime.now().strftime(
                     "%Y-%m-%d %H:%M:%S"
                 )
-                columns_ += ",created_at"
-                values += ",:created_at"
 
             if "created_date" in body:
                 params["created_date"] = datetime.datetime.now().strftime(
                     "%Y-%m-%d %H:%M:%S"
                 )
-                columns_ += ",created_date"
-                values += ",:created_date"
 
             if user_id_session:
                 user_id = get_user_id_session(self)
@@ -755,19 +1170,41 @@ class Router:
                     return user_id
                 if user_id is not None:
                     params[user_id_session] = user_id
-                    columns_ += f", {user_id_session}"
-                    values += f", :{user_id_session}"
 
             if active:
                 params["active"] = 1
-                columns_ += ", active"
-                values += ", :active"
+            return params
 
-           
+        async def post(self):
+            response = await execute_middleware(self, type="post")
+            if isinstance(response, JSONResponse):
+                return response
             try:
-                instance=model_sql(**params)
-                id = await connection.query_orm_async(model=model_sql, operation="insert", instance=instance)
+                body = await self.json()
+                model = model_pydantic(**body)
+            except ValidationError as e:
+                return self.response_validation_error(e)
+            except Exception as e:
+                Logger.warning(f"Error rest_crud_generate - POST: {str(e)}")
+                return JSONResponse(
+                    {"success": False, "message": "Error general", "msg": "Error general"}, status_code=500
+                )
+            params = prepare_insert(self, model, body)
+            if isinstance(params, JSONResponse):
+                return params
+
+            try:
+                try:
+                    inserted = await connection.query_async(
+                        query=statements["insert"], params=params, return_row=connection.engine.dialect.insert_returning
+                    )
+                    id = inserted["id"] if isinstance(inserted, dict) else inserted.inserted_primary_key[0]
+                except IntegrityError as e:
+                    Logger.warning(f"rest_crud_generate , POST integrity error: {str(e)}")
+                    id = 0
                 result = True if id else False
+                if result:
+                    await Cache.invalidate_tags_async(model_sql.__tablename__)
                 status_code = 201 if result else 200
                 return JSONResponse(
                     {"success": result, "id": id}, status_code=status_code
@@ -778,16 +1215,9 @@ class Router:
                 return JSONResponse({"success": False}, status_code=500)
             
         async def search_id(self) -> bool | dict:
-            columns_ = " , ".join(select) if select else "*"
-            filters = "active = 1" if active else ""
-            filters += " AND id = :id" if filters else "id = :id"
-            if "user_id" in model_pydantic.model_fields.keys():
-                filters += " AND user_id = :user_id"
-            elif "id_user" in model_pydantic.model_fields.keys():
-                filters += " AND id_user = :id_user"
-
             id = int(self.path_params["id"])
             params = {"user_id": 0, "id": id}
+            query = statements["get_id"]
 
             if user_id_session:
                 user_id = get_user_id_session(self)
@@ -795,9 +1225,9 @@ class Router:
                     return user_id
                 if user_id is not None:
                     params[user_id_session] = user_id
-                    filters += f" AND {user_id_session} = :{user_id_session}"
+                    query = statements["get_id_user"]
 
-            query = f"SELECT {columns_} FROM {model_sql.__tablename__} WHERE {filters}"
+            track_cache_tags(model_sql.__tablename__)
             results = await connection.query_async(query=query, params=params, return_row=True)
             return results
 
@@ -818,7 +1248,9 @@ class Router:
             response = await execute_middleware(self, type="put")
             if isinstance(response, JSONResponse):
                 return response
-            result = search_id(self)
+            result = await search_id(self)
+            if isinstance(result, JSONResponse):
+                return result
             if result is None:
                 return JSONResponse({"success": False}, status_code=404)
             result_update = False
@@ -828,13 +1260,6 @@ class Router:
             except ValidationError as e:
                 return self.response_validation_error(e)
 
-            values = (
-                " , ".join(f"{row} = :{row}" for row in columns)
-                if columns
-                else " , ".join(
-                    f"{row} = :{row}" for row in list(model_pydantic.model_fields.keys())
-                )
-            )
             params = {
                 field: getattr(model, field)
                 for field in model_pydantic.model_fields.keys()
@@ -853,7 +1278,8 @@ class Router:
             if "hash" in params:
                 params["hash"] = generate_token_value()
 
-            orm_filters = {"id": int(self.path_params["id"])}
+            params["w_id"] = id
+            query = statements["update"]
 
             if user_id_session:
                 user_id = get_user_id_session(self)
@@ -861,14 +1287,18 @@ class Router:
                     return user_id
                 if user_id is not None:
                     params[user_id_session] = user_id
-                    orm_filters[user_id_session] = user_id
+                    params["w_user"] = user_id
+                    query = statements["update_user"]
 
             try:
-                result = await connection.query_orm_async(
-                    model=model_sql, operation="update",
-                    filters=orm_filters, values=params
-                )
+                try:
+                    result = await connection.query_async(query=query, params=params)
+                except IntegrityError as e:
+                    Logger.warning(f"rest_crud_generate , PUT integrity error: {str(e)}")
+                    result = None
                 result_update = True if result else False
+                if result_update:
+                    await Cache.invalidate_tags_async(model_sql.__tablename__)
                 return JSONResponse({"success": result_update})
             except Exception as e:
                 Logger.error(f"Error rest_crud_generate , PUT: {str(e)}")
@@ -884,24 +1314,230 @@ class Router:
 
             id = int(self.path_params["id"])
             params = {"id": id, "user_id": 0}
-            filters = ""
+            query = statements["delete"]
             if user_id_session:
                 user_id = get_user_id_session(self)
                 if isinstance(user_id, JSONResponse):
                     return user_id
                 if user_id is not None:
                     params[user_id_session] = user_id
-                    filters += f" AND {user_id_session} = :{user_id_session}"
-
-            if delete_logic:
-                query = f" UPDATE {model_sql.__tablename__} SET active=0 WHERE id= :id {filters}"
-            else:
-                query = f"DELETE FROM {model_sql.__tablename__} WHERE id=:id {filters}"
+                    query = statements["delete_user"]
 
             result = await connection.query_async(query=query, params=params)
             result_delete = True if result else False
+            if result_delete:
+                await Cache.invalidate_tags_async(model_sql.__tablename__)
             return JSONResponse({"success": result_delete})
 
+        pk_column = model_sql.__table__.c.id if "id" in table_columns else None
+        patch_model = None
+        if bulk:
+            if pk_column is None:
+                raise ValueError(f"rest_crud_generate(bulk=True) requires an 'id' column on {table}")
+            ids_param = sqlalchemy.bindparam("ids", expanding=True)
+            statements["bulk_ids"] = sqlalchemy.select(pk_column).where(pk_column.in_(ids_param))
+            if active:
+                statements["bulk_ids"] = statements["bulk_ids"].where(sql_table.c.active == 1)
+            if user_id_session and user_id_session in table_columns:
+                statements["bulk_ids_user"] = statements["bulk_ids"].where(
+                    sql_table.c[user_id_session] == sqlalchemy.bindparam("w_user")
+                )
+            statements["bulk_insert"] = sqlalchemy.insert(sql_table)
+            if connection.engine.dialect.insert_executemany_returning:
+                statements["bulk_insert"] = statements["bulk_insert"].returning(pk_column, sort_by_parameter_order=True)
+            if delete_logic:
+                statements["bulk_delete"] = sqlalchemy.update(sql_table).values(active=0)
+            else:
+                statements["bulk_delete"] = sqlalchemy.delete(sql_table)
+            statements["bulk_delete"] = statements["bulk_delete"].where(pk_column.in_(ids_param))
+            # English: PATCH items carry "id" plus any subset of the model fields; field constraints are kept.
+            # Español: Los items de PATCH traen "id" y cualquier subconjunto de campos; se mantienen las restricciones.
+            patch_fields = {}
+            for field_name, field_info in model_pydantic.model_fields.items():
+                optional_info = copy.copy(field_info)
+                optional_info.default = None
+                optional_info.default_factory = None
+                patch_fields[field_name] = (field_info.annotation, optional_info)
+            patch_fields["id"] = (int, ...)
+            patch_model = pydantic.create_model(f"{model_pydantic.__name__}BulkPatch", **patch_fields)
+
+        def bulk_validation_error(request, e: ValidationError) -> JSONResponse:
+            language = Translate.lang(request=request)
+            errors_list = []
+            for err in e.errors():
+                index = err["loc"][0] if err["loc"] else None
+                field = err["loc"][-1] if len(err["loc"]) > 1 else "item"
+                errors_list.append({"index": index, str(field): Translate.translate_pydantic_error(err, language)})
+            message = f"{len({err['index'] for err in errors_list})} invalid items"
+            return JSONResponse(
+                {"success": False, "errors": errors_list, "message": message, "msg": message}, status_code=400
+            )
+
+        async def bulk_body(self) -> list | JSONResponse:
+            try:
+                body = await self.json()
+            except Exception:
+                return list_error("Body must be a JSON array")
+            if not isinstance(body, list) or not body:
+                return list_error("Body must be a non-empty JSON array")
+            if len(body) > bulk_max_items:
+                return list_error(f"At most {bulk_max_items} items per request")
+            return body
+
+        def chunks(items: list):
+            for start in range(0, len(items), bulk_chunk_size):
+                yield items[start:start + bulk_chunk_size]
+
+        async def existing_ids(db, ids: list, user_id) -> set:
+            """
+            English: Returns the ids that exist and are visible to this request (active rows, session user).
+            Español: Retorna los ids que existen y son visibles para esta petición (filas activas, usuario de sesión).
+            """
+            found = set()
+            params = {}
+            stmt = statements["bulk_ids"]
+            if user_id_session and user_id is not None:
+                stmt = statements["bulk_ids_user"]
+                params["w_user"] = user_id
+            for chunk in chunks(ids):
+                found.update((await db.execute(stmt, {**params, "ids": chunk})).scalars().all())
+            return found
+
+        def session_user(self):
+            return get_user_id_session(self) if user_id_session else None
+
+        async def bulk_post(self):
+            response = await execute_middleware(self, type="post")
+            if isinstance(response, JSONResponse):
+                return response
+            body = await bulk_body(self)
+            if isinstance(body, JSONResponse):
+                return body
+            try:
+                models = get_type_adapter(List[model_pydantic]).validate_python(body)
+            except ValidationError as e:
+                return bulk_validation_error(self, e)
+
+            rows = []
+            for model, item in zip(models, body):
+                params = prepare_insert(self, model, item if isinstance(item, dict) else {})
+                if isinstance(params, JSONResponse):
+                    return params
+                rows.append(params)
+
+            # English: executemany needs the same columns in every row, so rows are grouped by their key set.
+            # Español: executemany necesita las mismas columnas en cada fila, así que se agrupan por sus claves.
+            groups = {}
+            for index, row in enumerate(rows):
+                groups.setdefault(tuple(sorted(row)), []).append(index)
+            ids = [None] * len(rows)
+            returning = connection.engine.dialect.insert_executemany_returning
+            try:
+                async with connection.transaction() as session:
+                    db = await session.connection()
+                    for indexes in groups.values():
+                        for chunk in chunks(indexes):
+                            result = await db.execute(statements["bulk_insert"], [rows[i] for i in chunk])
+                            if returning:
+                                for i, new_id in zip(chunk, result.scalars().all()):
+                                    ids[i] = new_id
+            except Exception as e:
+                Logger.error(f"Error rest_crud_generate , POST bulk: {str(e)}")
+                return JSONResponse({"success": False}, status_code=500)
+
+            await Cache.invalidate_tags_async(table)
+            # English: Without executemany RETURNING (MySQL, MariaDB) the new ids are unknown, so items carry only the index.
+            # Español: Sin RETURNING en executemany (MySQL, MariaDB) no se conocen los ids, los items solo llevan el índice.
+            if returning:
+                items = [{"index": i, "id": id} for i, id in enumerate(ids)]
+            else:
+                items = [{"index": i} for i in range(len(ids))]
+            return JSONResponse({"success": True, "items": items}, status_code=201)
+
+        async def bulk_patch(self):
+            response = await execute_middleware(self, type="put")
+            if isinstance(response, JSONResponse):
+                return response
+            body = await bulk_body(self)
+            if isinstance(body, JSONResponse):
+                return body
+            try:
+                models = get_type_adapter(List[patch_model]).validate_python(body)
+            except ValidationError as e:
+                return bulk_validation_error(self, e)
+            user_id = session_user(self)
+            if isinstance(user_id, JSONResponse):
+                return user_id
+
+            updates = []
+            for model in models:
+                values = model.model_dump(exclude_unset=True)
+                values.pop("id", None)
+                if "password" in values:
+                    if values["password"]:
+                        values["password"] = ph.hash(values["password"])
+                    else:
+                        del values["password"]
+                if "token" in values:
+                    values["token"] = generate_token_value()
+                if "hash" in values:
+                    values["hash"] = generate_token_value()
+                updates.append((model.id, values))
+
+            results = [{"index": i, "id": id, "success": False} for i, (id, _) in enumerate(updates)]
+            try:
+                async with connection.transaction() as session:
+                    db = await session.connection()
+                    found = await existing_ids(db, [id for id, _ in updates], user_id)
+                    groups = {}
+                    for index, (id, values) in enumerate(updates):
+                        if id in found and values:
+                            groups.setdefault(tuple(sorted(values)), []).append(index)
+                    for indexes in groups.values():
+                        for chunk in chunks(indexes):
+                            await db.execute(
+                                statements["update"], [{**updates[i][1], "w_id": updates[i][0]} for i in chunk]
+                            )
+                            for i in chunk:
+                                results[i]["success"] = True
+            except Exception as e:
+                Logger.error(f"Error rest_crud_generate , PATCH bulk: {str(e)}")
+                return JSONResponse({"success": False}, status_code=500)
+
+            if groups:
+                await Cache.invalidate_tags_async(table)
+            return JSONResponse({"success": all(r["success"] for r in results), "items": results})
+
+        async def bulk_delete(self):
+            response = await execute_middleware(self, type="delete")
+            if isinstance(response, JSONResponse):
+                return response
+            body = await bulk_body(self)
+            if isinstance(body, JSONResponse):
+                return body
+            try:
+                ids = get_type_adapter(List[int]).validate_python(body)
+            except ValidationError as e:
+                return bulk_validation_error(self, e)
+            user_id = session_user(self)
+            if isinstance(user_id, JSONResponse):
+                return user_id
+
+            try:
+                async with connection.transaction() as session:
+                    db = await session.connection()
+                    found = await existing_ids(db, ids, user_id)
+                    for chunk in chunks(sorted(found)):
+                        await db.execute(statements["bulk_delete"], {"ids": chunk})
+            except Exception as e:
+                Logger.error(f"Error rest_crud_generate , DELETE bulk: {str(e)}")
+                return JSONResponse({"success": False}, status_code=500)
+
+            if found:
+                await Cache.invalidate_tags_async(table)
+            results = [{"index": i, "id": id, "success": id in found} for i, id in enumerate(ids)]
+            return JSONResponse({"success": all(r["success"] for r in results), "items": results})
+
         crud_routes += [
             Route(
                 path=self.normalize_path(prefix=self.prefix, path=name),
@@ -915,6 +1551,17 @@ class Router:
                 methods=["POST"],
                 endpoint=post,
             ),
+        ]
+        if bulk:
+            # English: Registered before "/{id}" so "bulk" is not captured as an id.
+            # Español: Se registran antes de "/{id}" para que "bulk" no se tome como un id.
+            bulk_path = f"{self.normalize_path(prefix=self.prefix, path=name)}/bulk"
+            crud_routes += [
+                Route(path=bulk_path, name=f"{name}_bulk_post", methods=["POST"], endpoint=bulk_post),
+                Route(path=bulk_path, name=f"{name}_bulk_patch", methods=["PATCH"], endpoint=bulk_patch),
+                Route(path=bulk_path, name=f"{name}_bulk_delete", methods=["DELETE"], endpoint=bulk_delete),
+            ]
+        crud_routes += [
             Route(
                 path=f"{self.normalize_path(prefix=self.prefix,path=name)}/{{id}}",
                 name=f"{name}_get_id",
@@ -949,7 +1596,8 @@ class Router:
                 model_name=model_sql.__tablename__,
                 columns=columns_html,
                 prefix_path=self.prefix,
-                rewrite_tempalte = rewrite_tempalte
+                rewrite_tempalte = rewrite_tempalte,
+                data_key=(jsonresponse_prefix or "data") if paginate else jsonresponse_prefix,
             )
 
             async def funcHtml(request: Request):
@@ -984,7 +1632,7 @@ class Router:
                     ) 
             )
 
-    def generate_html_template(self, model_name, columns, prefix_path="",rewrite_tempalte : bool=False):
+    def generate_html_template(self, model_name, columns, prefix_path="",rewrite_tempalte : bool=False, data_key: str = "data"):
         template_path = Path(PATH_TEMPLATES_HTML) / model_name / "index.jinja"
         template_path.parent.mkdir(parents=True, exist_ok=True)
         sensitive_fields = {"password", "active", "token", "hash"}
@@ -1024,6 +1672,15 @@ class Router:
       </div>
 
       <div id="datatable-container" class="bg-surface dark:bg-surface-dark border border-slate-200 dark:border-slate-800 rounded-2xl p-6 shadow-material overflow-x-auto"></div>
+
+      <div class="flex justify-end gap-3 mt-4">
+          <button id="prev-page-btn" onclick="prevPage{model_name}()" disabled class="px-4 py-2 bg-surface dark:bg-surface-dark border border-slate-200 dark:border-slate-800 text-slate-700 dark:text-slate-300 font-bold rounded-xl shadow-sm hover:bg-slate-50 dark:hover:bg-slate-800 disabled:opacity-40 transition-all text-xs cursor-pointer">
+            {{{{translate['Previous']}}}}
+          </button>
+          <button id="next-page-btn" onclick="nextPage{model_name}()" disabled class="px-4 py-2 bg-surface dark:bg-surface-dark border border-slate-200 dark:border-slate-800 text-slate-700 dark:text-slate-300 font-bold rounded-xl shadow-sm hover:bg-slate-50 dark:hover:bg-slate-800 disabled:opacity-40 transition-all text-xs cursor-pointer">
+            {{{{translate['Next']}}}}
+          </button>
+      </div>
       
       <dialog id="crud-dialog" class="p-6 rounded-2xl w-full max-w-md bg-surface dark:bg-surface-dark border border-slate-200 dark:border-slate-850 shadow-material-lg backdrop:bg-slate-900/40 backdrop:backdrop-blur-sm">
          <div class="flex flex-col gap-6">
@@ -1067,10 +1724,29 @@ class Router:
         delete: onDelete{model_name}
         }});
 
+        // Keyset pagination: cursors[i] is the cursor that opens page i.
+        const cursors{model_name} = [null];
+        let page{model_name} = 0;
+
         async function fetchData{model_name}() {{
-        const res = await fetch('/{url}');
+        const cursor = cursors{model_name}[page{model_name}];
+        const res = await fetch(cursor ? `/{url}?cursor=${{encodeURIComponent(cursor)}}` : '/{url}');
         const data = await res.json();
-        dt.updateData(data);
+        const rows = Array.isArray(data) ? data : (data['{data_key}'] || []);
+        const next = Array.isArray(data) ? null : data.next_cursor;
+        cursors{model_name}.length = page{model_name} + 1;
+        if (next) cursors{model_name}.push(next);
+        document.getElementById('prev-page-btn').disabled = page{model_name} === 0;
+        document.getElementById('next-page-btn').disabled = !next;
+        dt.updateData(rows);
+        }}
+
+        function nextPage{model_name}() {{
+        if (page{model_name} + 1 < cursors{model_name}.length) {{ page{model_name}++; fetchData{model_name}(); }}
+        }}
+
+        function prevPage{model_name}() {{
+        if (page{model_name} > 0) {{ page{model_name}--; fetchData{model_name}(); }}
         }}
 
         fetchData{model_name}();
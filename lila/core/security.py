@@ -14,6 +14,41 @@ class Security:
         (re.compile(r"expression\s*\(", flags=re.IGNORECASE | re.DOTALL), ""),
     ]
 
+    # English: Every pattern above needs one of these characters, so strings without them are skipped outright.
+    # Español: Todos los patrones anteriores necesitan uno de estos caracteres, así que los strings sin ellos se omiten.
+    _PREFILTER_CHARS = ("<", "=", ":", "(")
+
+    _COMBINED_XSS_PATTERN = re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern, _ in _COMPILED_XSS_PATTERNS),
+        flags=re.IGNORECASE | re.DOTALL,
+    )
+
+    _COMBINED_XSS_PATTERN_BYTES = re.compile(
+        _COMBINED_XSS_PATTERN.pattern.encode(),
+        flags=re.IGNORECASE | re.DOTALL,
+    )
+
+    @staticmethod
+    def is_clean_json(raw: bytes) -> bool:
+        """
+        Returns True when a raw JSON body cannot contain anything sanitization would change.
+        Only ASCII bodies without escape sequences qualify, because then every decoded key and value is a literal
+        slice of the raw bytes and a single regex scan over the bytes covers all of them.
+        """
+        if not raw.isascii() or b"\\" in raw:
+            return False
+        return Security._COMBINED_XSS_PATTERN_BYTES.search(raw) is None
+
+    @staticmethod
+    def might_contain_xss(value: str) -> bool:
+        """
+        Cheap prefilter: returns False when the string cannot match any XSS pattern.
+        """
+        for char in Security._PREFILTER_CHARS:
+            if char in value:
+                return True
+        return False
+
     @staticmethod
     def sanitize_string(value: str) -> str:
         """
@@ -21,6 +56,8 @@ class Security:
         """
         if not isinstance(value, str):
             return value
+        if not Security.might_contain_xss(value) or not Security._COMBINED_XSS_PATTERN.search(value):
+            return value
         
         sanitized = value
         for pattern, replacement in Security._COMPILED_XSS_PATTERNS:
@@ -47,9 +84,40 @@ class Security:
         Checks if a string contains potential XSS patterns using pre-compiled regex.
         Returns True if potential XSS is found.
         """
-        if not text:
+        if not text or not Security.might_contain_xss(text):
             return False
-        for pattern, _ in Security._COMPILED_XSS_PATTERNS:
-            if pattern.search(text):
-                return True
-        return False
+        return Security._COMBINED_XSS_PATTERN.search(text) is not None
+
+    @staticmethod
+    def sanitize_and_check(data: Any) -> tuple[Any, bool]:
+        """
+        Sanitizes and scans parsed JSON in a single traversal.
+        Returns (sanitized_data, xss_found). Keys are scanned, values are sanitized and then re-scanned,
+        and the walk stops at the first residual match. Unchanged strings are not copied.
+        """
+        if isinstance(data, str):
+            if not Security.might_contain_xss(data) or not Security._COMBINED_XSS_PATTERN.search(data):
+                return data, False
+            sanitized = data
+            for pattern, replacement in Security._COMPILED_XSS_PATTERNS:
+                sanitized = pattern.sub(replacement, sanitized)
+            return sanitized, Security.check_xss(sanitized)
+        elif isinstance(data, dict):
+            result = {}
+            for key, value in data.items():
+                if isinstance(key, str) and Security.check_xss(key):
+                    return None, True
+                clean, found = Security.sanitize_and_check(value)
+                if found:
+                    return None, True
+                result[key] = clean
+            return result, False
+        elif isinstance(data, list):
+            result = []
+            for item in data:
+                clean, found = Security.sanitize_and_check(item)
+                if found:
+                    return None, True
+                result.append(clean)
+            return result, False
+        return data, False
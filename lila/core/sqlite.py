@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from lila.core.logger import Logger
+
+# English: Pragmas of config["sqlite_profile"] = "production". WAL lets readers run while one connection writes,
+# synchronous=NORMAL fsyncs at checkpoints instead of on every commit (safe in WAL mode), and busy_timeout makes
+# other workers wait for the write lock instead of failing with "database is locked".
+# Español: Pragmas de config["sqlite_profile"] = "production". WAL permite leer mientras una conexión escribe,
+# synchronous=NORMAL hace fsync en los checkpoints y no en cada commit (seguro en modo WAL), y busy_timeout hace
+# que los demás workers esperen el lock de escritura en lugar de fallar con "database is locked".
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def sqlite_pragmas(config: dict) -> Dict[str, Any]:
+    """Pragmas for a SQLite config: the sqlite_profile defaults with config["pragmas"] on top."""
+    profile = config.get("sqlite_profile")
+    if profile and profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown sqlite_profile '{profile}'. Available: {', '.join(SQLITE_PROFILES)}")
+    return {**SQLITE_PROFILES.get(profile, {}), **config.get("pragmas", {})}
+
+
+def apply_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """Run the pragmas on every new DBAPI connection of engine (sync or async)."""
+    if not pragmas:
+        return
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+class WriteCoordinator:
+    """
+    English: Per-worker single writer for SQLite. Concurrent query_async writes are queued and committed in groups:
+    one connection runs up to max_batch of them in a single transaction with one commit (one fsync), then resolves
+    each caller with its own result. If the group fails, its writes are retried one by one so a bad statement only
+    fails its caller. The same lock serializes transaction() blocks, so writers of one worker never compete for the
+    SQLite write lock; other workers wait on busy_timeout.
+    Español: Escritor único por worker para SQLite. Las escrituras concurrentes de query_async se encolan y se
+    confirman en grupo: una conexión ejecuta hasta max_batch en una sola transacción con un solo commit (un fsync) y
+    luego devuelve a cada llamador su resultado. Si el grupo falla, se reintentan una por una, así una sentencia
+    inválida solo falla a su llamador. El mismo lock serializa los bloques transaction(), así los escritores de un
+    worker nunca compiten por el lock de escritura de SQLite; los demás workers esperan con busy_timeout.
+    """
+
+    def __init__(self, database, max_batch: int = 200) -> None:
+        self.database = database
+        self.max_batch = max_batch
+        self._queue: list = []
+        self._loop = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.commits = 0
+        self.writes = 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        self._start()
+        return self._lock
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        # Clean context: the task outlives the request that started it, so it must not inherit its connection
+        # scope, read routing or query route.
+        self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def execute(self, statement: Any, params: Optional[dict], return_rows: bool, return_row: bool) -> Any:
+        """Queue one write and wait for the group commit that includes it."""
+        self._start()
+        future = self._loop.create_future()
+        self._queue.append((statement, params, return_rows, return_row, future))
+        self._wake.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._queue:
+                batch = self._queue[:self.max_batch]
+                del self._queue[:len(batch)]
+                try:
+                    await self._commit(batch)
+                except Exception as e:
+                    Logger.error(f"SQLite write coordinator failed: {e}")
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+
+    async def _commit(self, batch: list) -> None:
+        async with self._lock:
+            try:
+                results = []
+                async with self.database.engine.connect() as connection:
+                    for statement, params, return_rows, return_row, _ in batch:
+                        result = await connection.execute(statement, params or ())
+                        if return_rows:
+                            result = [dict(row._mapping) for row in result.fetchall()]
+                        elif return_row:
+                            row = result.fetchone()
+                            result = dict(row._mapping) if row else None
+                        results.append(result)
+                    await connection.commit()
+            except Exception as e:
+                if len(batch) == 1:
+                    future = batch[0][-1]
+                    if not future.done():
+                        future.set_exception(e)
+                    return
+                error = e
+            else:
+                error = None
+                self.commits += 1
+                self.writes += len(batch)
+                for (*_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        if error is not None:
+            for item in batch:
+                await self._commit([item])
@@ -4,7 +4,7 @@ from jinja2_htmlmin import minify_loader
 from app.config import VERSION_PROJECT, TITLE_PROJECT, DEBUG, DESCRIPTION_DEFAULT, KEYWORDS_DEFAULT, AUTHOR_DEFAULT, LANG_DEFAULT, MINIFY_HTML, APP_URL, HOST, PORT
 from lila.core.translate import Translate
 from lila.core.request import Request
-from lila.core.responses import HTMLResponse, JSONResponse
+from lila.core.responses import HTMLResponse, JSONResponse, compute_etag, etag_matches, not_modified_response
 from app.config import PATH_TEMPLATES_HTML, PATH_TEMPLATES_MARKDOWN
 from lila.core.csrf import CSRF
 from lila.core.logger import Logger
@@ -237,15 +237,19 @@ def get_base_context(request: Request, files_translate: list[str] = None, lang_d
     }
 
 
-def render(request: Request, template: str, context: dict = None, files_translate: list[str] = None, lang_default: str = None, extension: str = "jinja", csrf: bool = False):
+def render(request: Request, template: str, context: dict = None, files_translate: list[str] = None, lang_default: str = None, extension: str = "jinja", csrf: bool = False, etag: bool = False):
     """
     English: Renders an HTML template with unified context and error handling.
     When csrf=True, generates a CSRF token and injects it into the template context as 'csrf_token'.
     The signed token is also set as a cookie on the response.
+    When etag=True, the response carries a strong ETag of the rendered HTML and a matching
+    If-None-Match is answered with 304 Not Modified, so repeat visitors skip the body download.
 
     Español: Renderiza una plantilla HTML con contexto unificado y manejo de errores.
     Cuando csrf=True, genera un token CSRF y lo inyecta en el contexto de la plantilla como 'csrf_token'.
     El token firmado tambien se establece como cookie en la respuesta.
+    Cuando etag=True, la respuesta lleva un ETag fuerte del HTML renderizado y un If-None-Match
+    coincidente se responde con 304 Not Modified, así los visitantes recurrentes no descargan el cuerpo.
     """
     if context is None:
         context = {}
@@ -263,6 +267,10 @@ def render(request: Request, template: str, context: dict = None, files_translat
         response = HTMLResponse(content=body)
         if csrf and csrfToken:
             CSRF.set_cookie(response, csrfToken)
+        if etag:
+            tag = response.headers["ETag"] = compute_etag(response.body)
+            if etag_matches(request.headers.get("if-none-match"), tag):
+                return not_modified_response(response.headers)
         return response
     except Exception as e:
         return handle_render_error(template, e)
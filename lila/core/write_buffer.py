@@ -0,0 +1,281 @@
+import asyncio
+import contextvars
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import text, insert, update, delete, bindparam
+from lila.core.logger import Logger
+from lila.core.cache import Cache
+
+# Every WriteBuffer of this worker; App flushes them on shutdown through flush_write_buffers().
+_BUFFERS: List["WriteBuffer"] = []
+
+
+class WriteBuffer:
+    """
+    English: Per-worker write-behind buffer for background=True writes when Redis is not available. Writes are
+    coalesced by statement shape (same SQL, or same table, operation and columns) into executemany groups and
+    flushed in one transaction every flush_ms milliseconds or flush_rows rows, whichever comes first. Groups keep
+    the order of writes to the same table. When max_pending writes are waiting, put_* blocks until a flush frees
+    room (backpressure). stats() reports queue depth and flush latency.
+    Español: Buffer write-behind por worker para escrituras background=True cuando Redis no está disponible. Las
+    escrituras se agrupan por forma de sentencia (mismo SQL, o misma tabla, operación y columnas) en grupos
+    executemany y se confirman en una transacción cada flush_ms milisegundos o flush_rows filas, lo que ocurra
+    primero. Los grupos respetan el orden de las escrituras a una misma tabla. Con max_pending escrituras en espera,
+    put_* se bloquea hasta que un flush libere lugar (backpressure). stats() informa profundidad de la cola y
+    latencia de los flush.
+    """
+
+    def __init__(
+        self,
+        database,
+        flush_ms: int = 50,
+        flush_rows: int = 500,
+        max_pending: int = 10000,
+        retries: int = 3,
+    ) -> None:
+        self.database = database
+        self.flush_interval = flush_ms / 1000
+        self.flush_rows = flush_rows
+        self.max_pending = max(max_pending, flush_rows)
+        self.retries = retries
+        self._pending: list = []
+        self._statements: Dict[tuple, Any] = {}
+        self._loop = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Condition] = None
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.errors = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        _BUFFERS.append(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, flush counters and latency (milliseconds) of this worker's buffer."""
+        return {
+            "depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "errors": self.errors,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+    async def put_query(self, query: str, params: Optional[dict] = None) -> None:
+        """Queue a raw SQL write; writes with the same SQL and param names are sent as one executemany."""
+        from lila.core.database import _tables_of
+
+        params = dict(params or {})
+        key = ("sql", query, tuple(sorted(params)))
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = text(query)
+        await self._put(key, _tables_of(query), statement, params)
+
+    async def put_orm(
+        self,
+        model: Type[Any],
+        operation: str,
+        instance_dict: Optional[dict] = None,
+        filters: Optional[dict] = None,
+        values: Optional[dict] = None,
+    ) -> None:
+        """Queue an ORM insert/update/delete as a Core statement on the model's table."""
+        table = model.__table__
+        filters = filters or {}
+        if operation == "insert":
+            # Unset attributes are left out so column defaults and autoincrement keys apply, as with session.add().
+            params = {k: v for k, v in (instance_dict or {}).items() if v is not None}
+            key = ("insert", table.name, tuple(sorted(params)))
+        elif operation == "update":
+            if not values:
+                raise ValueError("Values required for update")
+            params = {**{f"w_{k}": v for k, v in filters.items()}, **{f"v_{k}": v for k, v in values.items()}}
+            key = ("update", table.name, tuple(filters), tuple(values))
+        elif operation == "delete":
+            params = {f"w_{k}": v for k, v in filters.items()}
+            key = ("delete", table.name, tuple(filters))
+        else:
+            raise ValueError(f"Unsupported operation: {operation}")
+
+        statement = self._statements.get(key)
+        if statement is None:
+            if operation == "insert":
+                statement = insert(table)
+            else:
+                statement = update(table) if operation == "update" else delete(table)
+                for k in filters:
+                    statement = statement.where(table.c[k] == bindparam(f"w_{k}"))
+                if operation == "update":
+                    statement = statement.values({table.c[k]: bindparam(f"v_{k}") for k in values})
+            self._statements[key] = statement
+        await self._put(key, (table.name,), statement, params)
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._full = asyncio.Event()
+        self._space = asyncio.Condition()
+        if self._pending:
+            self._wake.set()
+        # Clean context: the task outlives the request that started it, so it must not inherit its connection
+        # scope, read routing or query route.
+        self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _put(self, key: tuple, tables: tuple, statement: Any, params: dict) -> None:
+        self._start()
+        if len(self._pending) >= self.max_pending:
+            self.backpressure_waits += 1
+            self._full.set()
+            # Woken writers re-check the limit and append while holding the condition, one at a time.
+            async with self._space:
+                await self._space.wait_for(lambda: len(self._pending) < self.max_pending)
+                self._pending.append((key, tables, statement, params))
+        else:
+            self._pending.append((key, tables, statement, params))
+        self._wake.set()
+        if len(self._pending) >= self.flush_rows:
+            self._full.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            if len(self._pending) < self.flush_rows:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                Logger.error(f"Write buffer flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Write everything pending now, flush_rows writes per transaction."""
+        if self._lock is None:
+            return
+        async with self._lock:
+            while self._pending:
+                batch = self._pending[:self.flush_rows]
+                started = time.perf_counter()
+                await self._write(self._coalesce(batch))
+                elapsed = (time.perf_counter() - started) * 1000
+                del self._pending[:len(batch)]
+                self.flushes += 1
+                self.rows_flushed += len(batch)
+                self.last_flush_ms = elapsed
+                self._total_flush_ms += elapsed
+                self.max_flush_ms = max(self.max_flush_ms, elapsed)
+                async with self._space:
+                    self._space.notify_all()
+
+    async def close(self) -> None:
+        """Flush what is pending and stop the flush task (called on shutdown)."""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def _coalesce(batch: list) -> list:
+        """
+        English: Groups writes with the same key into (statement, [params...], tables). A write only joins an earlier group
+        if no later group touched its tables, so writes to one table run in the order they were queued.
+        Español: Agrupa las escrituras con la misma clave en (sentencia, [params...], tablas). Una escritura solo se une a
+        un grupo anterior si ningún grupo posterior tocó sus tablas, así se respeta el orden por tabla.
+        """
+        groups: list = []
+        group_of_key: Dict[tuple, int] = {}
+        last_group_of_table: Dict[str, int] = {}
+        for key, tables, statement, params in batch:
+            index = group_of_key.get(key)
+            if index is not None:
+                if tables:
+                    joinable = all(last_group_of_table.get(t, index) == index for t in tables)
+                else:
+                    joinable = index == len(groups) - 1
+                if not joinable:
+                    index = None
+            if index is None:
+                index = group_of_key[key] = len(groups)
+                groups.append((statement, [], tables))
+            groups[index][1].append(params)
+            for t in tables:
+                last_group_of_table[t] = index
+        return groups
+
+    async def _write(self, groups: list) -> None:
+        try:
+            await self._execute(groups)
+            await Cache.invalidate_tags_async(*{t for group in groups for t in group[2]})
+            return
+        except Exception as e:
+            Logger.warning(f"Write buffer batch failed, retrying each group on its own: {e}")
+        for group in groups:
+            for attempt in range(self.retries):
+                try:
+                    await self._execute([group])
+                    await Cache.invalidate_tags_async(*group[2])
+                    break
+                except Exception as e:
+                    if attempt == self.retries - 1:
+                        self.errors += len(group[1])
+                        Logger.error(
+                            f"Failed to execute {len(group[1])} queued writes after {self.retries} attempts: {e}. "
+                            f"Statement: {group[0]}"
+                        )
+                        print(f"Error: Failed to execute queued writes: {e}")
+                    else:
+                        await asyncio.sleep(2 ** attempt)
+
+    async def _execute(self, groups: list) -> None:
+        """Run the groups in one transaction; statements without params run once per queued write."""
+        if self.database.is_async:
+            async with self.database.transaction() as session:
+                for statement, params, _ in groups:
+                    if params[0]:
+                        await session.execute(statement, params)
+                    else:
+                        for _ in params:
+                            await session.execute(statement)
+            return
+
+        def _run():
+            with self.database.transaction_sync() as session:
+                for statement, params, _ in groups:
+                    if params[0]:
+                        session.execute(statement, params)
+                    else:
+                        for _ in params:
+                            session.execute(statement)
+
+        await asyncio.get_running_loop().run_in_executor(None, _run)
+
+
+async def flush_write_buffers() -> None:
+    """Flush and stop every write buffer of this worker."""
+    for buffer in list(_BUFFERS):
+        try:
+            await buffer.close()
+        except Exception as e:
+            Logger.error(f"Write buffer flush on shutdown failed: {e}")
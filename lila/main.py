@@ -67,6 +67,16 @@ middlewares = [
 # Español: Inicializando la aplicación con la depuración activada y las rutas combinadas.
 app = App(debug=DEBUG, routes=all_routes, cors=cors, middleware=middlewares)
 
+# English: With hundreds of routes (locales, rest_crud_generate), radix_routing=True matches by path depth instead of route count.
+# Español: Con cientos de rutas (locales, rest_crud_generate), radix_routing=True resuelve por profundidad del path y no por cantidad de rutas.
+# app = App(debug=DEBUG, routes=all_routes, cors=cors, middleware=middlewares, radix_routing=True)
+# English: edge_cache=True replays responses of routes with cache_ttl before any middleware, compression included.
+# Español: edge_cache=True repite las respuestas de rutas con cache_ttl antes de cualquier middleware, incluida la compresión.
+# app = App(debug=DEBUG, routes=all_routes, cors=cors, middleware=middlewares, edge_cache=True)
+# English: db_scope=True reuses one pooled database connection for all the queries of a request.
+# Español: db_scope=True reutiliza una conexión del pool para todas las consultas de una petición.
+# app = App(debug=DEBUG, routes=all_routes, cors=cors, middleware=middlewares, db_scope=True)
+
 def main():
     if DEBUG:
         uvicorn.run("main:app", host=HOST, port=PORT, reload=True)